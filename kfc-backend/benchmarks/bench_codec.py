@@ -0,0 +1,110 @@
+"""
+Benchmark del codec JSON: stdlib vs backend rápido en el camino de un request
+
+Uso (desde kfc-backend/):
+    python -m benchmarks.bench_codec [--orders 100] [--rounds 200]
+
+Mide, por request, el parseo del body, la respuesta de list_orders con
+Decimal (como los devuelve DynamoDB), una línea de log y un evento de
+EventBridge, con json de la stdlib y con src.utils.codec.
+"""
+import argparse
+import json
+import random
+import time
+from decimal import Decimal
+from src.utils import codec
+from .bench_compression import order_page
+
+
+def to_dynamodb(value):
+    """Floats a Decimal, como los devuelve boto3"""
+    if isinstance(value, float):
+        return Decimal(str(value))
+    if isinstance(value, list):
+        return [to_dynamodb(item) for item in value]
+    if isinstance(value, dict):
+        return {key: to_dynamodb(item) for key, item in value.items()}
+    return value
+
+
+def stdlib_default(value):
+    """Default equivalente al que usaban los call sites antes del codec"""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(type(value).__name__)
+
+
+def measure(operation, rounds: int) -> float:
+    """ms promedio por llamada"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        operation()
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--orders', type=int, default=100)
+    parser.add_argument('--rounds', type=int, default=200)
+    args = parser.parse_args()
+    
+    random.seed(42)
+    page = to_dynamodb(json.loads(order_page(args.orders))['data'])
+    request_body = json.dumps({
+        'items': [{'productId': f'prod_{i:03d}', 'quantity': 2} for i in range(5)],
+        'customerName': 'María Quispe',
+        'customerPhone': '+51987654321',
+        'deliveryAddress': 'Av. Arequipa 1234, Lima'
+    })
+    log_entry = {
+        'level': 'INFO',
+        'message': 'Order created successfully',
+        'service': 'kfc-orders-cloud',
+        'tenant_id': 'tenant_kfc_lima',
+        'order_id': page['orders'][0]['orderId'],
+        'total': page['orders'][0]['totalAmount']
+    }
+    event_detail = {key: page['orders'][0][key] for key in ('tenantId', 'orderId', 'totalAmount', 'items')}
+    
+    operations = [
+        (
+            'parse body',
+            lambda: json.loads(request_body),
+            lambda: codec.loads(request_body)
+        ),
+        (
+            f'response ({args.orders} orders)',
+            lambda: json.dumps({'success': True, 'data': page}, default=stdlib_default),
+            lambda: codec.dumps({'success': True, 'data': page})
+        ),
+        (
+            'log line',
+            lambda: json.dumps(log_entry, default=str),
+            lambda: codec.dumps(log_entry, fallback=str)
+        ),
+        (
+            'event detail',
+            lambda: json.dumps(event_detail, default=stdlib_default),
+            lambda: codec.dumps(event_detail)
+        )
+    ]
+    
+    print(f'backend: {codec.BACKEND}\n')
+    print(f'{"operation":<24}{"stdlib ms":>11}{"codec ms":>10}{"speedup":>9}')
+    total_stdlib = total_codec = 0.0
+    for name, stdlib_operation, codec_operation in operations:
+        stdlib_ms = measure(stdlib_operation, args.rounds)
+        codec_ms = measure(codec_operation, args.rounds)
+        total_stdlib += stdlib_ms
+        total_codec += codec_ms
+        print(f'{name:<24}{stdlib_ms:>11.3f}{codec_ms:>10.3f}{stdlib_ms / codec_ms:>8.1f}x')
+    
+    print(
+        f'\npor request: {total_stdlib:.3f} ms -> {total_codec:.3f} ms '
+        f'({total_stdlib - total_codec:.3f} ms menos)'
+    )
+
+
+if __name__ == '__main__':
+    main()
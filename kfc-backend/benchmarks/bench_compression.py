@@ -0,0 +1,138 @@
+"""
+Benchmark de compresión de respuestas sobre páginas de órdenes realistas
+
+Uso (desde kfc-backend/):
+    python -m benchmarks.bench_compression [--orders 100] [--rounds 20]
+
+Compara tamaño y tiempo de gzip y brotli (si está instalado) en varios
+niveles, y el costo de encode_response con la configuración actual.
+"""
+import argparse
+import gzip
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from src.utils import responses
+from src.utils.responses import success_response, encode_response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+PRODUCTS = [
+    ('Pieza de Pollo Original', 8.9),
+    ('Combo Mega Familiar', 69.9),
+    ('Alitas BBQ x6', 18.5),
+    ('Papas Grandes', 7.5),
+    ('Ensalada de Col', 5.9),
+    ('Gaseosa 500ml', 4.5),
+    ('Twister Clásico', 14.9),
+    ('Sundae de Chocolate', 6.5)
+]
+
+STAGES = ['kitchen', 'packaging', 'delivery']
+
+
+def build_order(tenant_id: str, created: datetime) -> dict:
+    """Orden con items, datos del cliente y traza completa"""
+    items = [
+        {
+            'productId': f'prod_{random.randint(1, 40):03d}',
+            'name': name,
+            'price': price,
+            'quantity': random.randint(1, 4)
+        }
+        for name, price in random.sample(PRODUCTS, random.randint(1, 5))
+    ]
+    
+    trace = [{'timestamp': created.isoformat(), 'event': 'order_created', 'status': 'pending'}]
+    timestamp = created
+    for stage in STAGES[:random.randint(0, 3)]:
+        for phase in ('started', 'completed'):
+            timestamp += timedelta(seconds=random.randint(30, 600))
+            trace.append({
+                'timestamp': timestamp.isoformat(),
+                'event': f'{stage}_{phase}',
+                'status': stage,
+                'details': f'{stage.capitalize()} {phase} by worker'
+            })
+    
+    return {
+        'tenantId': tenant_id,
+        'orderId': f'order_{uuid.uuid4().hex[:16]}',
+        'status': trace[-1]['status'],
+        'items': items,
+        'customerName': random.choice(['Ana Torres', 'Luis Pérez', 'María Quispe', 'Jorge Rojas']),
+        'customerPhone': f'+519{random.randint(10000000, 99999999)}',
+        'deliveryAddress': f'Av. Arequipa {random.randint(100, 4000)}, Lima',
+        'notes': random.choice([None, 'Sin hielo', 'Tocar el timbre']),
+        'totalAmount': round(sum(item['price'] * item['quantity'] for item in items), 2),
+        'createdAt': created.isoformat(),
+        'updatedAt': timestamp.isoformat(),
+        'trace': trace
+    }
+
+
+def order_page(count: int) -> bytes:
+    """Body de list_orders con count órdenes"""
+    now = datetime.utcnow()
+    orders = [build_order('tenant_kfc_lima', now - timedelta(minutes=i)) for i in range(count)]
+    return json.dumps({'success': True, 'data': {'orders': orders, 'count': count}}).encode('utf-8')
+
+
+def measure(compress, body: bytes, rounds: int):
+    """(bytes comprimidos, ms promedio)"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        compressed = compress(body)
+    elapsed = (time.perf_counter() - start) / rounds
+    return len(compressed), elapsed * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--orders', type=int, default=100)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+    
+    random.seed(42)
+    body = order_page(args.orders)
+    
+    codecs = [
+        (f'gzip-{level}', lambda data, level=level: gzip.compress(data, compresslevel=level, mtime=0))
+        for level in (1, 6, 9)
+    ]
+    if brotli:
+        codecs += [
+            (f'br-{quality}', lambda data, quality=quality: brotli.compress(data, quality=quality))
+            for quality in (1, 4, 11)
+        ]
+    else:
+        print('brotli no instalado: solo gzip')
+    
+    print(f'{args.orders} órdenes, {len(body)} bytes sin comprimir\n')
+    print(f'{"codec":<10}{"bytes":>10}{"ratio":>9}{"ms":>9}')
+    for name, compress in codecs:
+        size, ms = measure(compress, body, args.rounds)
+        print(f'{name:<10}{size:>10}{size / len(body):>9.1%}{ms:>9.2f}')
+    
+    # Costo total del encoding tal como lo hacen los handlers
+    response = success_response(json.loads(body)['data'])
+    for accept in ('gzip', 'br, gzip'):
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            encoded = encode_response(response, accept)
+        ms = (time.perf_counter() - start) / args.rounds * 1000
+        print(
+            f'\nencode_response({accept!r}): {encoded["headers"].get("Content-Encoding")}, '
+            f'{len(encoded["body"])} bytes base64, {ms:.2f} ms '
+            f'(umbral {responses.COMPRESSION_MIN_BYTES} bytes)'
+        )
+
+
+if __name__ == '__main__':
+    main()
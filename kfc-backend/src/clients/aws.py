@@ -0,0 +1,188 @@
+"""Fábrica compartida de clientes boto3: reintentos adaptativos, timeouts y métricas"""
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+import boto3
+from botocore.config import Config
+from ..utils import codec
+from ..utils.concurrency import MAX_WORKERS, DeadlineExceeded, remaining_seconds
+
+
+# Intentos totales por llamada (modo adaptive: backoff con jitter y rate
+# limiting del lado del cliente cuando el servicio responde con throttling)
+MAX_ATTEMPTS = int(os.getenv('AWS_MAX_ATTEMPTS', '5'))
+
+# Intentos de las dependencias no críticas (protegidas con un circuit breaker):
+# fallar pronto importa más que insistir
+NON_CRITICAL_MAX_ATTEMPTS = int(os.getenv('AWS_NON_CRITICAL_MAX_ATTEMPTS', '2'))
+
+CONNECT_TIMEOUT_SECONDS = float(os.getenv('AWS_CONNECT_TIMEOUT_SECONDS', '1'))
+READ_TIMEOUT_SECONDS = float(os.getenv('AWS_READ_TIMEOUT_SECONDS', '10'))
+
+# Timeout de lectura mínimo de un intento: con menos tiempo restante el
+# intento no se envía (no podría terminar antes del deadline)
+MIN_READ_TIMEOUT_SECONDS = float(os.getenv('AWS_MIN_READ_TIMEOUT_SECONDS', '0.5'))
+
+# Timeouts de lectura por servicio (DynamoDB responde en ms; S3 sube partes de 8 MB)
+SERVICE_READ_TIMEOUTS = {
+    'dynamodb': float(os.getenv('DYNAMODB_READ_TIMEOUT_SECONDS', '5')),
+    's3': float(os.getenv('S3_READ_TIMEOUT_SECONDS', '30'))
+}
+
+# Una conexión por thread del pool de Parallel más el thread del handler
+MAX_POOL_CONNECTIONS = MAX_WORKERS + 4
+
+METRICS_NAMESPACE = os.getenv('METRICS_NAMESPACE', 'KFC/AWSClients')
+
+# Códigos de error que indican throttling del servicio
+THROTTLE_CODES = frozenset([
+    'Throttling',
+    'ThrottlingException',
+    'ThrottledException',
+    'RequestThrottled',
+    'RequestThrottledException',
+    'TooManyRequestsException',
+    'ProvisionedThroughputExceededException',
+    'RequestLimitExceeded',
+    'LimitExceededException',
+    'SlowDown'
+])
+
+_clients: Dict[Tuple[str, Optional[str], int], Any] = {}
+_clients_lock = threading.Lock()
+
+# Los resources de boto3 no son thread-safe: uno por thread del contenedor
+_local = threading.local()
+
+# Contexto de Lambda de la invocación en curso (una por contenedor a la vez)
+_invocation: Dict[str, Any] = {'context': None}
+
+# Contadores por servicio desde el último flush_metrics
+_metrics: Dict[str, Dict[str, int]] = {}
+_metrics_lock = threading.Lock()
+
+
+def client_config(service: str, max_attempts: int = MAX_ATTEMPTS) -> Config:
+    """Configuración común de los clientes de un servicio"""
+    return Config(
+        retries={'mode': 'adaptive', 'total_max_attempts': max_attempts},
+        connect_timeout=CONNECT_TIMEOUT_SECONDS,
+        read_timeout=SERVICE_READ_TIMEOUTS.get(service, READ_TIMEOUT_SECONDS),
+        max_pool_connections=MAX_POOL_CONNECTIONS,
+        tcp_keepalive=True
+    )
+
+
+def client(service: str, endpoint_url: Optional[str] = None, max_attempts: int = MAX_ATTEMPTS):
+    """
+    Cliente boto3 compartido del servicio (thread-safe, uno por contenedor)
+    
+    Se crea una vez por servicio, endpoint e intentos: las conexiones y el
+    rate limiter del modo adaptive se reutilizan entre invocaciones.
+    """
+    key = (service, endpoint_url, max_attempts)
+    with _clients_lock:
+        if key not in _clients:
+            # Crear clientes desde la sesión por defecto no es thread-safe
+            session = boto3.session.Session()
+            _clients[key] = _instrument(
+                session.client(service, endpoint_url=endpoint_url, config=client_config(service, max_attempts))
+            )
+        return _clients[key]
+
+
+def resource(service: str):
+    """Resource boto3 del thread actual, con la misma configuración que client()"""
+    resources = _local.__dict__.setdefault('resources', {})
+    if service not in resources:
+        instance = boto3.session.Session().resource(service, config=client_config(service))
+        _instrument(instance.meta.client)
+        resources[service] = instance
+    return resources[service]
+
+
+def set_invocation(context: Any) -> None:
+    """Registrar el contexto de la invocación para cortar reintentos en el deadline"""
+    _invocation['context'] = context
+
+
+def _instrument(boto_client):
+    """Registrar los hooks de deadline y métricas en los eventos del cliente"""
+    events = boto_client.meta.events
+    service = boto_client.meta.service_model.service_name
+    
+    read_timeout = boto_client.meta.config.read_timeout
+    
+    def check_deadline(request=None, **kwargs):
+        # Cada intento (incluidos los reintentos) pasa por before-send. El
+        # intento debe terminar antes del deadline: conexión más lectura,
+        # con la lectura acotada al tiempo que queda (override por request)
+        remaining = remaining_seconds(_invocation['context'])
+        if remaining is None:
+            return
+        
+        attempt_read_timeout = remaining - CONNECT_TIMEOUT_SECONDS
+        if attempt_read_timeout < MIN_READ_TIMEOUT_SECONDS:
+            raise DeadlineExceeded(f"Not enough time left in the invocation for a {service} call")
+        
+        context = getattr(request, 'context', None)
+        if context is not None:
+            context['read_timeout'] = min(read_timeout, attempt_read_timeout)
+    
+    def count_throttle(response=None, **kwargs):
+        if response and response[1].get('Error', {}).get('Code') in THROTTLE_CODES:
+            _count(service, 'Throttles')
+    
+    def count_call(parsed=None, exception=None, **kwargs):
+        # after-call recibe también las respuestas de error del servicio;
+        # after-call-error solo las excepciones sin respuesta (timeouts, deadline)
+        parsed = parsed or {}
+        _count(service, 'Calls')
+        _count(service, 'Retries', parsed.get('ResponseMetadata', {}).get('RetryAttempts', 0))
+        if exception is not None or 'Error' in parsed:
+            _count(service, 'Errors')
+    
+    events.register('before-send', check_deadline)
+    events.register('needs-retry', count_throttle)
+    events.register('after-call', count_call)
+    events.register('after-call-error', count_call)
+    return boto_client
+
+
+def _count(service: str, metric: str, amount: int = 1) -> None:
+    with _metrics_lock:
+        counters = _metrics.setdefault(service, {'Calls': 0, 'Retries': 0, 'Throttles': 0, 'Errors': 0})
+        counters[metric] += amount
+
+
+def flush_metrics() -> None:
+    """
+    Emitir los contadores por servicio como Embedded Metric Format
+    
+    CloudWatch Logs extrae las métricas de las líneas con _aws, sin llamadas
+    a PutMetricData. Se escribe directo a stdout para no depender de
+    LOG_LEVEL.
+    """
+    with _metrics_lock:
+        snapshot = dict(_metrics)
+        _metrics.clear()
+    
+    timestamp = int(time.time() * 1000)
+    for service, counters in snapshot.items():
+        document = {
+            '_aws': {
+                'Timestamp': timestamp,
+                'CloudWatchMetrics': [{
+                    'Namespace': METRICS_NAMESPACE,
+                    'Dimensions': [['Service']],
+                    'Metrics': [{'Name': name, 'Unit': 'Count'} for name in counters]
+                }]
+            },
+            'Service': service,
+            'function': os.getenv('FUNCTION_NAME', 'unknown'),
+            **counters
+        }
+        sys.stdout.write(codec.dumps(document) + '\n')
+    sys.stdout.flush()
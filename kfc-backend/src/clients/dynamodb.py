@@ -1,17 +1,63 @@
 """Cliente DynamoDB con métodos helper"""
-import boto3
+import heapq
 import os
-from typing import Dict, List, Optional, Any
+import random
+import threading
+import time
+import zlib
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, Dict, Iterator, List, Optional, Any, Tuple
 from boto3.dynamodb.conditions import Key, Attr
+from boto3.dynamodb.types import TypeDeserializer
+from botocore.exceptions import ClientError
+from ..models.order import (
+    OrderTransition,
+    OrderNotFoundError,
+    InvalidTransitionError,
+    TRACE_INLINE_MAX,
+    TRACE_INLINE_TAIL,
+    trace_entry
+)
+from ..utils.concurrency import Parallel
 from ..utils.logger import logger
+from . import aws
 
-# Inicializar cliente DynamoDB
-dynamodb = boto3.resource('dynamodb')
+# Vigencia del número de shards de escritura leído de cada tenant
+ORDER_SHARDS_CACHE_TTL_SECONDS = int(os.getenv('ORDER_SHARDS_CACHE_TTL_SECONDS', '300'))
+
+# Cache tenantId -> (expiración, número de shards)
+_shards_cache: Dict[str, Tuple[float, int]] = {}
+_shards_lock = threading.Lock()
+
+
+def get_resource():
+    """Obtener el resource DynamoDB del thread actual (ver clients.aws)"""
+    return aws.resource('dynamodb')
 
 
 def get_table(table_name: str):
     """Obtener referencia a tabla DynamoDB"""
-    return dynamodb.Table(table_name)
+    return get_resource().Table(table_name)
+
+
+def _to_dynamodb(value: Any) -> Any:
+    """Convertir floats a Decimal (boto3 no acepta float)"""
+    if isinstance(value, float):
+        return Decimal(str(value))
+    if isinstance(value, dict):
+        return {k: _to_dynamodb(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_to_dynamodb(v) for v in value]
+    return value
+
+
+def deserialize_image(image: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Convertir un NewImage/OldImage de DynamoDB Streams a un dict de Python"""
+    if not image:
+        return None
+    deserializer = TypeDeserializer()
+    return {name: deserializer.deserialize(value) for name, value in image.items()}
 
 
 def get_item(table_name: str, key: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -25,12 +71,37 @@ def get_item(table_name: str, key: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         raise
 
 
-def put_item(table_name: str, item: Dict[str, Any]) -> Dict[str, Any]:
-    """Guardar un item en DynamoDB"""
+def put_item(
+    table_name: str,
+    item: Dict[str, Any],
+    condition_expression: Optional[Any] = None,
+    return_values_on_condition_check_failure: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Guardar un item en DynamoDB
+    
+    condition_expression acepta un string o una condición de boto3 (Attr).
+    """
     try:
         table = get_table(table_name)
-        table.put_item(Item=item)
+        
+        kwargs = {'Item': _to_dynamodb(item)}
+        
+        if condition_expression:
+            kwargs['ConditionExpression'] = condition_expression
+        
+        if return_values_on_condition_check_failure:
+            kwargs['ReturnValuesOnConditionCheckFailure'] = return_values_on_condition_check_failure
+        
+        table.put_item(**kwargs)
         return item
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            # Rechazo esperado de una escritura condicional
+            logger.info(f"Conditional put rejected in {table_name}")
+        else:
+            logger.error(f"Error putting item to {table_name}: {str(e)}", item=item)
+        raise
     except Exception as e:
         logger.error(f"Error putting item to {table_name}: {str(e)}", item=item)
         raise
@@ -40,9 +111,22 @@ def update_item(
     table_name: str,
     key: Dict[str, Any],
     updates: Dict[str, Any],
-    condition_expression: Optional[str] = None
+    condition_expression: Optional[Any] = None,
+    list_appends: Optional[Dict[str, List[Any]]] = None,
+    remove_fields: Optional[List[str]] = None,
+    return_values_on_condition_check_failure: Optional[str] = None,
+    increments: Optional[Dict[str, Any]] = None
 ) -> Dict[str, Any]:
-    """Actualizar un item en DynamoDB"""
+    """
+    Actualizar un item en DynamoDB
+    
+    list_appends agrega elementos al final de atributos tipo lista sin
+    necesidad de leer el item antes (list_append del lado de DynamoDB).
+    remove_fields elimina atributos del item.
+    increments suma valores a atributos numéricos (ADD, crea el atributo
+    si no existe).
+    condition_expression acepta un string o una condición de boto3 (Attr).
+    """
     try:
         table = get_table(table_name)
         
@@ -55,38 +139,275 @@ def update_item(
             placeholder = f":{field}"
             name_placeholder = f"#{field}"
             update_expression_parts.append(f"{name_placeholder} = {placeholder}")
-            expression_attribute_values[placeholder] = value
+            expression_attribute_values[placeholder] = _to_dynamodb(value)
+            expression_attribute_names[name_placeholder] = field
+        
+        for field, values in (list_appends or {}).items():
+            placeholder = f":{field}_append"
+            name_placeholder = f"#{field}"
+            update_expression_parts.append(
+                f"{name_placeholder} = list_append(if_not_exists({name_placeholder}, :empty_list), {placeholder})"
+            )
+            expression_attribute_values[placeholder] = _to_dynamodb(values)
+            expression_attribute_values[':empty_list'] = []
+            expression_attribute_names[name_placeholder] = field
+        
+        add_parts = []
+        for field, amount in (increments or {}).items():
+            placeholder = f":{field}_inc"
+            name_placeholder = f"#{field}"
+            add_parts.append(f"{name_placeholder} {placeholder}")
+            expression_attribute_values[placeholder] = _to_dynamodb(amount)
+            expression_attribute_names[name_placeholder] = field
+        
+        remove_parts = []
+        for field in remove_fields or []:
+            name_placeholder = f"#{field}"
+            remove_parts.append(name_placeholder)
             expression_attribute_names[name_placeholder] = field
         
-        update_expression = "SET " + ", ".join(update_expression_parts)
+        update_expression = " ".join(
+            clause for clause in [
+                "SET " + ", ".join(update_expression_parts) if update_expression_parts else None,
+                "REMOVE " + ", ".join(remove_parts) if remove_parts else None,
+                "ADD " + ", ".join(add_parts) if add_parts else None
+            ] if clause
+        )
         
         kwargs = {
             'Key': key,
             'UpdateExpression': update_expression,
-            'ExpressionAttributeValues': expression_attribute_values,
             'ExpressionAttributeNames': expression_attribute_names,
             'ReturnValues': 'ALL_NEW'
         }
         
+        if expression_attribute_values:
+            kwargs['ExpressionAttributeValues'] = expression_attribute_values
+        
         if condition_expression:
             kwargs['ConditionExpression'] = condition_expression
         
+        if return_values_on_condition_check_failure:
+            kwargs['ReturnValuesOnConditionCheckFailure'] = return_values_on_condition_check_failure
+        
         response = table.update_item(**kwargs)
         return response.get('Attributes', {})
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            # Rechazo esperado de una escritura condicional
+            logger.info(f"Conditional update rejected in {table_name}", key=key)
+        else:
+            logger.error(f"Error updating item in {table_name}: {str(e)}", key=key, updates=updates)
+        raise
     except Exception as e:
         logger.error(f"Error updating item in {table_name}: {str(e)}", key=key, updates=updates)
         raise
 
 
+def update_action(
+    table_name: str,
+    key: Dict[str, Any],
+    increments: Dict[str, Any],
+    updates: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Update para transact_write_items: ADD de increments y SET de updates
+    
+    Los nombres de atributo pueden tener cualquier carácter (se usan
+    placeholders numerados).
+    """
+    names = {}
+    values = {}
+    
+    def placeholders(fields: Dict[str, Any], prefix: str) -> List[str]:
+        pairs = []
+        for field, value in fields.items():
+            index = len(names)
+            names[f"#a{index}"] = field
+            values[f":v{index}"] = _to_dynamodb(value)
+            pairs.append((f"#a{index}", f":v{index}"))
+        return [f"{name}{prefix}{value}" for name, value in pairs]
+    
+    add_parts = placeholders(increments, ' ')
+    set_parts = placeholders(updates or {}, ' = ')
+    
+    update_expression = " ".join(
+        clause for clause in [
+            "SET " + ", ".join(set_parts) if set_parts else None,
+            "ADD " + ", ".join(add_parts) if add_parts else None
+        ] if clause
+    )
+    
+    return {
+        'Update': {
+            'TableName': table_name,
+            'Key': key,
+            'UpdateExpression': update_expression,
+            'ExpressionAttributeNames': names,
+            'ExpressionAttributeValues': values
+        }
+    }
+
+
+def transact_write_items(actions: List[Dict[str, Any]]) -> None:
+    """
+    Aplicar varias escrituras de forma atómica (TransactWriteItems)
+    
+    actions usa valores de Python (Put, Update, ConditionCheck, Delete).
+    Si alguna condición falla se lanza TransactionCanceledException con
+    CancellationReasons en el mismo orden que actions.
+    """
+    try:
+        get_resource().meta.client.transact_write_items(TransactItems=_to_dynamodb(actions))
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'TransactionCanceledException':
+            logger.info("Transaction cancelled", reasons=e.response.get('CancellationReasons'))
+        else:
+            logger.error(f"Error writing transaction: {str(e)}")
+        raise
+
+
+def _batch_write(
+    table_name: str,
+    requests: List[Dict[str, Any]],
+    max_attempts: int
+) -> List[Dict[str, Any]]:
+    """BatchWriteItem en bloques de 25 con reintento de UnprocessedItems"""
+    failed = []
+    
+    for start in range(0, len(requests), 25):
+        pending = requests[start:start + 25]
+        
+        for attempt in range(max_attempts):
+            if attempt:
+                time.sleep(random.uniform(0, min(1.0, 0.05 * 2 ** attempt)))
+            
+            try:
+                response = get_resource().batch_write_item(RequestItems={table_name: pending})
+            except ClientError as e:
+                if e.response['Error']['Code'] not in ('ProvisionedThroughputExceededException', 'ThrottlingException'):
+                    logger.error(f"Error batch writing to {table_name}: {str(e)}")
+                    raise
+                logger.warning(f"Batch write throttled in {table_name}", attempt=attempt + 1)
+                continue
+            
+            pending = response.get('UnprocessedItems', {}).get(table_name, [])
+            if not pending:
+                break
+            
+            logger.warning(
+                f"Retrying unprocessed items in {table_name}",
+                unprocessed=len(pending),
+                attempt=attempt + 1
+            )
+        
+        failed.extend(pending)
+    
+    if failed:
+        logger.error(f"Batch write left {len(failed)} unprocessed items in {table_name}")
+    
+    return failed
+
+
+def batch_write_items(
+    table_name: str,
+    items: List[Dict[str, Any]],
+    max_attempts: int = 5
+) -> List[Dict[str, Any]]:
+    """
+    Guardar varios items con BatchWriteItem en bloques de 25
+    
+    Los UnprocessedItems se reintentan con backoff exponencial.
+    
+    Returns:
+        Items que no se pudieron escribir después de max_attempts
+    """
+    failed = _batch_write(
+        table_name,
+        [{'PutRequest': {'Item': _to_dynamodb(item)}} for item in items],
+        max_attempts
+    )
+    return [request['PutRequest']['Item'] for request in failed]
+
+
+def batch_delete_items(
+    table_name: str,
+    keys: List[Dict[str, Any]],
+    max_attempts: int = 5
+) -> List[Dict[str, Any]]:
+    """
+    Borrar varios items con BatchWriteItem en bloques de 25
+    
+    Returns:
+        Keys que no se pudieron borrar después de max_attempts
+    """
+    failed = _batch_write(
+        table_name,
+        [{'DeleteRequest': {'Key': key}} for key in keys],
+        max_attempts
+    )
+    return [request['DeleteRequest']['Key'] for request in failed]
+
+
+def batch_get_items(
+    table_name: str,
+    keys: List[Dict[str, Any]],
+    max_attempts: int = 5
+) -> List[Dict[str, Any]]:
+    """
+    Obtener varios items con BatchGetItem en bloques de 100
+    
+    Los UnprocessedKeys se reintentan con backoff exponencial. Los items
+    inexistentes simplemente no aparecen en el resultado.
+    """
+    items = []
+    
+    for start in range(0, len(keys), 100):
+        pending = keys[start:start + 100]
+        
+        for attempt in range(max_attempts):
+            if attempt:
+                time.sleep(random.uniform(0, min(1.0, 0.05 * 2 ** attempt)))
+            
+            try:
+                response = get_resource().batch_get_item(
+                    RequestItems={table_name: {'Keys': pending}}
+                )
+            except ClientError as e:
+                if e.response['Error']['Code'] not in ('ProvisionedThroughputExceededException', 'ThrottlingException'):
+                    logger.error(f"Error batch reading from {table_name}: {str(e)}")
+                    raise
+                logger.warning(f"Batch get throttled in {table_name}", attempt=attempt + 1)
+                continue
+            
+            items.extend(response.get('Responses', {}).get(table_name, []))
+            
+            pending = response.get('UnprocessedKeys', {}).get(table_name, {}).get('Keys', [])
+            if not pending:
+                break
+        else:
+            logger.error(f"Batch get left {len(pending)} unprocessed keys in {table_name}")
+            raise RuntimeError(f"Could not read {len(pending)} items from {table_name}")
+    
+    return items
+
+
 def query_items(
     table_name: str,
     key_condition_expression: Any,
     filter_expression: Optional[Any] = None,
     index_name: Optional[str] = None,
     limit: Optional[int] = None,
-    scan_index_forward: bool = True
+    scan_index_forward: bool = True,
+    paginate: bool = False,
+    consistent_read: bool = False
 ) -> List[Dict[str, Any]]:
-    """Query items de DynamoDB"""
+    """
+    Query items de DynamoDB
+    
+    Con paginate=True se siguen las páginas (LastEvaluatedKey) hasta
+    agotar el resultado o alcanzar el limit.
+    """
     try:
         table = get_table(table_name)
         
@@ -104,13 +425,121 @@ def query_items(
         if limit:
             kwargs['Limit'] = limit
         
+        if consistent_read:
+            kwargs['ConsistentRead'] = True
+        
         response = table.query(**kwargs)
-        return response.get('Items', [])
+        items = response.get('Items', [])
+        
+        while paginate and 'LastEvaluatedKey' in response and not (limit and len(items) >= limit):
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+            response = table.query(**kwargs)
+            items.extend(response.get('Items', []))
+        
+        return items[:limit] if limit else items
     except Exception as e:
         logger.error(f"Error querying {table_name}: {str(e)}")
         raise
 
 
+def query_page(
+    table_name: str,
+    key_condition_expression: Any,
+    limit: int,
+    start_key: Optional[Dict[str, Any]] = None,
+    scan_index_forward: bool = True
+) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    Una página de un Query, para paginar hacia el cliente
+    
+    Returns:
+        (items, LastEvaluatedKey o None si no hay más páginas)
+    """
+    try:
+        kwargs = {
+            'KeyConditionExpression': key_condition_expression,
+            'ScanIndexForward': scan_index_forward,
+            'Limit': limit
+        }
+        if start_key:
+            kwargs['ExclusiveStartKey'] = start_key
+        
+        response = get_table(table_name).query(**kwargs)
+        return response.get('Items', []), response.get('LastEvaluatedKey')
+    except Exception as e:
+        logger.error(f"Error querying {table_name}: {str(e)}")
+        raise
+
+
+def scan_items(
+    table_name: str,
+    filter_expression: Optional[Any] = None,
+    projection_expression: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Scan completo (paginado) de una tabla pequeña"""
+    try:
+        table = get_table(table_name)
+        
+        kwargs = {}
+        
+        if filter_expression:
+            kwargs['FilterExpression'] = filter_expression
+        
+        if projection_expression:
+            kwargs['ProjectionExpression'] = projection_expression
+        
+        response = table.scan(**kwargs)
+        items = response.get('Items', [])
+        
+        while 'LastEvaluatedKey' in response:
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+            response = table.scan(**kwargs)
+            items.extend(response.get('Items', []))
+        
+        return items
+    except Exception as e:
+        logger.error(f"Error scanning {table_name}: {str(e)}")
+        raise
+
+
+def scan_segment(
+    table_name: str,
+    segment: int,
+    total_segments: int,
+    filter_expression: Optional[Any] = None,
+    page_size: int = 1000
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Recorrer un segmento de un Scan paralelo página por página
+    
+    Generador: solo hay una página en memoria a la vez, así que sirve
+    para tablas de cualquier tamaño (cada segmento en su propio thread).
+    """
+    table = get_table(table_name)
+    
+    kwargs = {
+        'Segment': segment,
+        'TotalSegments': total_segments,
+        'Limit': page_size
+    }
+    
+    if filter_expression:
+        kwargs['FilterExpression'] = filter_expression
+    
+    while True:
+        try:
+            response = table.scan(**kwargs)
+        except Exception as e:
+            logger.error(f"Error scanning {table_name}: {str(e)}", segment=segment)
+            raise
+        
+        yield response.get('Items', [])
+        
+        if 'LastEvaluatedKey' not in response:
+            return
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
 def delete_item(table_name: str, key: Dict[str, Any]) -> None:
     """Eliminar un item de DynamoDB"""
     try:
@@ -128,10 +557,268 @@ def get_tenant(tenant_id: str) -> Optional[Dict[str, Any]]:
     return get_item(table_name, {'tenantId': tenant_id})
 
 
+def order_shards(tenant_id: str) -> int:
+    """
+    Número de shards de escritura de las órdenes del tenant
+    
+    Se configura con el atributo orderShards del tenant (por defecto 1,
+    sin sharding). Solo debe pasar de 1 a N una vez: las órdenes escritas
+    antes siguen en la partición sin shard, que las lecturas también
+    consultan.
+    """
+    now = time.monotonic()
+    with _shards_lock:
+        entry = _shards_cache.get(tenant_id)
+        if entry and entry[0] > now:
+            return entry[1]
+    
+    tenant = get_tenant(tenant_id) or {}
+    shards = max(int(tenant.get('orderShards', 1)), 1)
+    
+    with _shards_lock:
+        _shards_cache[tenant_id] = (now + ORDER_SHARDS_CACHE_TTL_SECONDS, shards)
+    return shards
+
+
+def order_key(tenant_id: str, order_id: str) -> Dict[str, str]:
+    """
+    Key de una orden en la tabla Orders
+    
+    En un tenant con sharding la partition key es tenantId#shard, con el
+    shard derivado del orderId: las escrituras de un tenant con mucho
+    volumen se reparten entre varias particiones (tabla y GSIs) y una
+    lectura por ID sigue siendo un único GetItem.
+    """
+    shards = order_shards(tenant_id)
+    if shards == 1:
+        return {'tenantId': tenant_id, 'orderId': order_id}
+    shard = zlib.crc32(order_id.encode('utf-8')) % shards
+    return {'tenantId': f"{tenant_id}#{shard}", 'orderId': order_id}
+
+
+def order_partitions(tenant_id: str) -> List[str]:
+    """Partition keys de las órdenes del tenant (incluye la partición sin shard)"""
+    shards = order_shards(tenant_id)
+    if shards == 1:
+        return [tenant_id]
+    return [tenant_id] + [f"{tenant_id}#{shard}" for shard in range(shards)]
+
+
+def tenant_of(partition_key: str) -> str:
+    """tenantId de una partition key de Orders (sin el sufijo de shard)"""
+    return partition_key.split('#', 1)[0]
+
+
+def unshard_order(order: Dict[str, Any]) -> Dict[str, Any]:
+    """Orden leída de la tabla con el tenantId sin sufijo de shard"""
+    if order and '#' in order.get('tenantId', ''):
+        order['tenantId'] = tenant_of(order['tenantId'])
+    return order
+
+
+def sharded_order(order: Dict[str, Any]) -> Dict[str, Any]:
+    """Copia de la orden con la partition key que le corresponde, para escribirla"""
+    return {**order, **order_key(order['tenantId'], order['orderId'])}
+
+
+def fallback_order_key(tenant_id: str, key: Dict[str, str]) -> Optional[Dict[str, str]]:
+    """
+    Otra key posible de una orden que no se encontró en key
+    
+    Con sharding la orden puede estar en la partición sin shard (escrita
+    antes de activarlo o por un contenedor con orderShards en cache); sin
+    sharding, el cache puede estar vencido respecto del tenant.
+    """
+    if key['tenantId'] != tenant_id:
+        return {'tenantId': tenant_id, 'orderId': key['orderId']}
+    
+    with _shards_lock:
+        _shards_cache.pop(tenant_id, None)
+    
+    fresh = order_key(tenant_id, key['orderId'])
+    return fresh if fresh != key else None
+
+
+def query_orders(
+    tenant_id: str,
+    key_condition: Callable[[Any], Any],
+    sort_key: str,
+    scan_index_forward: bool = True,
+    limit: Optional[int] = None,
+    parallel: bool = True,
+    unshard: bool = True,
+    **kwargs
+) -> List[Dict[str, Any]]:
+    """
+    Query sobre la tabla Orders o un GSI en todas las particiones del tenant
+    
+    key_condition recibe la condición sobre la partition key y devuelve la
+    condición completa, p.ej. lambda pk: pk & Key('status').eq('pending').
+    Con varias particiones las queries se hacen en paralelo (scatter-gather)
+    y los resultados, ya ordenados en cada partición, se combinan por
+    sort_key; limit se aplica por partición y al resultado combinado.
+    
+    Desde una función que ya corre en el pool de Parallel usar
+    parallel=False (las queries se hacen en secuencia).
+    
+    Con unshard=False las órdenes conservan la partition key con la que
+    están guardadas (para escribirlas o borrarlas después).
+    
+    kwargs se pasan a query_items (index_name, filter_expression, paginate).
+    """
+    def query_partition(partition: str) -> List[Dict[str, Any]]:
+        return query_items(
+            os.getenv('ORDERS_TABLE'),
+            key_condition_expression=key_condition(Key('tenantId').eq(partition)),
+            scan_index_forward=scan_index_forward,
+            limit=limit,
+            **kwargs
+        )
+    
+    partitions = order_partitions(tenant_id)
+    if len(partitions) == 1:
+        results = [query_partition(partitions[0])]
+    elif parallel:
+        results = Parallel().map(query_partition, partitions)
+    else:
+        results = [query_partition(partition) for partition in partitions]
+    
+    orders = heapq.merge(
+        *results,
+        key=lambda order: order.get(sort_key, ''),
+        reverse=not scan_index_forward
+    )
+    if limit:
+        orders = (order for _, order in zip(range(limit), orders))
+    
+    if not unshard:
+        return list(orders)
+    return [unshard_order(order) for order in orders]
+
+
 def get_order(tenant_id: str, order_id: str) -> Optional[Dict[str, Any]]:
     """Obtener orden por ID"""
     table_name = os.getenv('ORDERS_TABLE')
-    return get_item(table_name, {'tenantId': tenant_id, 'orderId': order_id})
+    key = order_key(tenant_id, order_id)
+    
+    order = get_item(table_name, key)
+    if not order:
+        fallback = fallback_order_key(tenant_id, key)
+        if fallback:
+            order = get_item(table_name, fallback)
+    
+    return unshard_order(order)
+
+
+def put_order(order: Dict[str, Any]) -> Dict[str, Any]:
+    """Guardar una orden en la partición que le corresponde"""
+    put_item(os.getenv('ORDERS_TABLE'), sharded_order(order))
+    return order
+
+
+def transition_order(
+    tenant_id: str,
+    order_id: str,
+    transition: OrderTransition,
+    updates: Optional[Dict[str, Any]] = None,
+    trace_fields: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Aplicar una transición de estado con una única escritura condicional
+    
+    No se lee la orden antes: si la condición falla se usa el item
+    devuelto por DynamoDB (ALL_OLD) para distinguir entre orden
+    inexistente y transición no permitida. Si no hay item se reintenta
+    en la otra partición posible de la orden (ver fallback_order_key).
+    
+    Raises:
+        OrderNotFoundError: La orden no existe
+        InvalidTransitionError: El estado actual no permite la transición
+    """
+    now = datetime.utcnow()
+    
+    fields = transition.updates(now.isoformat())
+    fields.update(updates or {})
+    
+    key = order_key(tenant_id, order_id)
+    tried = [key]
+    
+    while True:
+        try:
+            order = update_item(
+                os.getenv('ORDERS_TABLE'),
+                key,
+                fields,
+                condition_expression=transition.condition,
+                list_appends={'trace': [trace_entry(transition.name, now, **(trace_fields or {}))]},
+                return_values_on_condition_check_failure='ALL_OLD'
+            )
+            break
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+            
+            current = e.response.get('Item')
+            if current:
+                # El item de error viene en formato DynamoDB JSON
+                current = unshard_order(deserialize_image(current))
+                duplicate = bool(transition.marks) and transition.marks in current
+                raise InvalidTransitionError(
+                    transition.name,
+                    current.get('status'),
+                    duplicate=duplicate,
+                    order=current
+                )
+            
+            # La orden puede estar en otra partición (sharding activado después)
+            key = fallback_order_key(tenant_id, key)
+            if not key or key in tried:
+                raise OrderNotFoundError(order_id)
+            tried.append(key)
+    
+    order = unshard_order(order)
+    if len(order.get('trace', [])) > TRACE_INLINE_MAX:
+        _spill_trace(key, order)
+    
+    return order
+
+
+def _spill_trace(key: Dict[str, Any], order: Dict[str, Any]) -> None:
+    """
+    Mover las entradas más viejas de la traza a TracesTable
+    
+    Se escribe un chunk con seq = cantidad de entradas ya movidas y luego se
+    quitan del item con una escritura condicionada a que la traza no haya
+    cambiado. Si otra escritura ganó, el siguiente intento re-escribe el
+    mismo seq; el chunk solo puede crecer y al leer se toman las entradas
+    hasta traceSpilled, así que nunca se pierden ni se duplican entradas.
+    El fallo no afecta a la transición, que ya quedó aplicada.
+    """
+    trace = order['trace']
+    spilled = int(order.get('traceSpilled', 0))
+    count = len(trace) - TRACE_INLINE_TAIL
+    
+    try:
+        put_item(os.getenv('TRACES_TABLE'), {
+            'orderKey': f"{order['tenantId']}#{order['orderId']}",
+            'seq': spilled,
+            'entries': trace[:count]
+        }, condition_expression=Attr('orderKey').not_exists() | Attr('entries').size().lte(count))
+        
+        get_table(os.getenv('ORDERS_TABLE')).update_item(
+            Key=key,
+            UpdateExpression='REMOVE ' + ', '.join(f'#trace[{index}]' for index in range(count))
+            + ' SET #spilled = :spilled',
+            ConditionExpression=Attr('trace').size().eq(len(trace)) & (
+                Attr('traceSpilled').eq(spilled) if spilled else Attr('traceSpilled').not_exists()
+            ),
+            ExpressionAttributeNames={'#trace': 'trace', '#spilled': 'traceSpilled'},
+            ExpressionAttributeValues={':spilled': spilled + count}
+        )
+        order['trace'] = trace[count:]
+        order['traceSpilled'] = spilled + count
+    except Exception as e:
+        logger.warning(f"Trace spill skipped: {str(e)}", order_id=order['orderId'])
 
 
 def list_orders_by_tenant(
@@ -139,28 +826,85 @@ def list_orders_by_tenant(
     status: Optional[str] = None,
     limit: int = 100
 ) -> List[Dict[str, Any]]:
-    """Listar órdenes de un tenant"""
-    table_name = os.getenv('ORDERS_TABLE')
+    """
+    Listar órdenes de un tenant (en todas sus particiones)
     
+    Con filtro de estado se usa tenant-created-index con un filtro sobre
+    status: en status-index todas las órdenes de la consulta comparten el
+    sort key, así que no hay un orden por el cual combinar particiones.
+    """
     if status:
-        # Query usando el índice status-index
-        return query_items(
-            table_name,
-            key_condition_expression=Key('tenantId').eq(tenant_id) & Key('status').eq(status),
-            index_name='status-index',
+        # Query por fecha de creación filtrando por estado
+        return query_orders(
+            tenant_id,
+            lambda partition: partition,
+            sort_key='createdAt',
+            index_name='tenant-created-index',
+            filter_expression=Attr('status').eq(status),
             limit=limit,
+            paginate=True,
             scan_index_forward=False  # Orden descendente por fecha
         )
     else:
         # Query por tenantId solamente
-        return query_items(
-            table_name,
-            key_condition_expression=Key('tenantId').eq(tenant_id),
+        return query_orders(
+            tenant_id,
+            lambda partition: partition,
+            sort_key='orderId',
             limit=limit,
             scan_index_forward=False
         )
 
 
+def list_orders_updated_since(
+    tenant_id: str,
+    since: str,
+    limit: int = 100
+) -> Tuple[List[Dict[str, Any]], str, bool]:
+    """
+    Órdenes modificadas después de `since` (índice board-updated-index)
+    
+    Se devuelven en orden ascendente de boardUpdatedAt. Si la página se
+    corta en medio de órdenes con el mismo timestamp, esas órdenes se dejan
+    para la página siguiente para que el watermark no las salte.
+    
+    El índice solo proyecta los campos públicos de la orden (sin traza ni
+    task tokens): las órdenes devueltas no sirven para escribirlas de vuelta.
+    
+    Returns:
+        (órdenes, nuevo watermark, hay más páginas)
+    """
+    orders = query_orders(
+        tenant_id,
+        lambda partition: partition & Key('boardUpdatedAt').gt(since),
+        sort_key='boardUpdatedAt',
+        index_name='board-updated-index',
+        limit=limit + 1,
+        paginate=True
+    )
+    
+    has_more = len(orders) > limit
+    if has_more:
+        boundary = orders[limit]['boardUpdatedAt']
+        page = [order for order in orders[:limit] if order['boardUpdatedAt'] < boundary]
+        
+        if not page:
+            # Toda la página comparte el mismo timestamp: devolverlas todas
+            page = query_orders(
+                tenant_id,
+                lambda partition: partition & Key('boardUpdatedAt').eq(boundary),
+                sort_key='boardUpdatedAt',
+                index_name='board-updated-index',
+                paginate=True
+            )
+        
+        orders = page
+    
+    watermark = orders[-1]['boardUpdatedAt'] if orders else since
+    
+    return orders, watermark, has_more
+
+
 def get_user_by_email(tenant_id: str, email: str) -> Optional[Dict[str, Any]]:
     """Obtener usuario por email"""
     table_name = os.getenv('USERS_TABLE')
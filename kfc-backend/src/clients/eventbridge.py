@@ -1,13 +1,18 @@
 """Cliente EventBridge para publicar eventos"""
-import boto3
-import json
 import os
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 from ..utils.logger import logger
+from ..utils import codec
+from ..utils.circuit_breaker import CircuitOpenError, get_breaker
+from . import aws
 
-# Inicializar cliente EventBridge
-events_client = boto3.client('events')
+# Presupuesto de latencia de un PutEvents antes de contarlo como fallo
+EVENTS_LATENCY_BUDGET_MS = float(os.getenv('EVENTS_LATENCY_BUDGET_MS', '1000'))
+
+# Inicializar cliente EventBridge (no crítico: pocos intentos y circuit breaker)
+events_client = aws.client('events', max_attempts=aws.NON_CRITICAL_MAX_ATTEMPTS)
+_breaker = get_breaker('eventbridge', latency_budget_ms=EVENTS_LATENCY_BUDGET_MS)
 
 
 def publish_event(
@@ -36,12 +41,13 @@ def publish_event(
         if 'timestamp' not in detail:
             detail['timestamp'] = datetime.utcnow().isoformat()
         
-        response = events_client.put_events(
+        response = _breaker.call(
+            events_client.put_events,
             Entries=[
                 {
                     'Source': source,
                     'DetailType': detail_type,
-                    'Detail': json.dumps(detail),
+                    'Detail': codec.dumps(detail),
                     'EventBusName': event_bus_name
                 }
             ]
@@ -65,6 +71,9 @@ def publish_event(
         )
         
         return response
+    except CircuitOpenError:
+        logger.warning(f"EventBridge circuit open, event not published", detail_type=detail_type)
+        raise
     except Exception as e:
         logger.exception(
             f"Error publishing event: {str(e)}",
@@ -74,6 +83,68 @@ def publish_event(
         raise
 
 
+def publish_events(
+    source: str,
+    detail_type: str,
+    details: List[Dict[str, Any]],
+    event_bus_name: str = None
+) -> List[Optional[str]]:
+    """
+    Publicar varios eventos del mismo tipo con PutEvents en bloques de 10
+    
+    Returns:
+        Por cada evento (mismo orden), None si se publicó o el código
+        de error de EventBridge
+    """
+    if not event_bus_name:
+        event_bus_name = os.getenv('EVENT_BUS_NAME')
+    
+    errors = []
+    
+    for start in range(0, len(details), 10):
+        chunk = details[start:start + 10]
+        
+        entries = []
+        for detail in chunk:
+            if 'timestamp' not in detail:
+                detail['timestamp'] = datetime.utcnow().isoformat()
+            
+            entries.append({
+                'Source': source,
+                'DetailType': detail_type,
+                'Detail': codec.dumps(detail),
+                'EventBusName': event_bus_name
+            })
+        
+        try:
+            response = _breaker.call(events_client.put_events, Entries=entries)
+        except CircuitOpenError:
+            logger.warning(f"EventBridge circuit open, events not published", detail_type=detail_type)
+            errors.extend('CIRCUIT_OPEN' for _ in chunk)
+            continue
+        except Exception as e:
+            logger.exception(
+                f"Error publishing events: {str(e)}",
+                source=source,
+                detail_type=detail_type
+            )
+            errors.extend('PUT_EVENTS_FAILED' for _ in chunk)
+            continue
+        
+        # Entries viene en el mismo orden que el request
+        errors.extend(entry.get('ErrorCode') for entry in response.get('Entries', []))
+    
+    failed = sum(1 for error in errors if error)
+    if failed:
+        logger.error(
+            f"Failed to publish {failed} of {len(details)} events",
+            source=source,
+            detail_type=detail_type
+        )
+    
+    return errors
+
+
 # Helper functions para eventos específicos
 def publish_order_created(tenant_id: str, order_id: str, order_data: Dict[str, Any]):
     """Publicar evento de orden creada"""
@@ -88,6 +159,15 @@ def publish_order_created(tenant_id: str, order_id: str, order_data: Dict[str, A
     )
 
 
+def publish_orders_created(tenant_id: str, orders: List[Dict[str, Any]]) -> List[Optional[str]]:
+    """Publicar eventos de orden creada en lote (cada dict con orderId y datos)"""
+    return publish_events(
+        source='kfc.orders',
+        detail_type='order.created',
+        details=[{'tenantId': tenant_id, **order} for order in orders]
+    )
+
+
 def publish_order_stage_started(tenant_id: str, order_id: str, stage: str):
     """Publicar evento de inicio de etapa"""
     return publish_event(
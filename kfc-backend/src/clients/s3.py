@@ -0,0 +1,183 @@
+"""Cliente S3 para el bucket de media"""
+import os
+from typing import Dict, Optional
+from botocore.exceptions import ClientError
+from ..utils.logger import logger
+from . import aws
+
+# Inicializar cliente S3
+s3_client = aws.client('s3')
+
+# Tamaño de cada parte de una subida multipart (mínimo de S3: 5 MB)
+MULTIPART_PART_SIZE = int(os.getenv('MULTIPART_PART_SIZE', str(8 * 1024 * 1024)))
+
+
+def put_object(
+    key: str,
+    body: bytes,
+    content_type: str,
+    content_encoding: Optional[str] = None,
+    cache_control: Optional[str] = None,
+    metadata: Optional[Dict[str, str]] = None,
+    bucket: str = None
+) -> str:
+    """
+    Subir un objeto al bucket
+    
+    Returns:
+        ETag asignado por S3
+    """
+    if not bucket:
+        bucket = os.getenv('MEDIA_BUCKET_NAME')
+    
+    kwargs = {
+        'Bucket': bucket,
+        'Key': key,
+        'Body': body,
+        'ContentType': content_type
+    }
+    
+    if content_encoding:
+        kwargs['ContentEncoding'] = content_encoding
+    
+    if cache_control:
+        kwargs['CacheControl'] = cache_control
+    
+    if metadata:
+        kwargs['Metadata'] = metadata
+    
+    try:
+        response = s3_client.put_object(**kwargs)
+        return response.get('ETag')
+    except Exception as e:
+        logger.error(f"Error uploading object to S3: {str(e)}", key=key)
+        raise
+
+
+def object_exists(key: str, bucket: str = None) -> bool:
+    """Verificar si un objeto existe (HEAD)"""
+    if not bucket:
+        bucket = os.getenv('MEDIA_BUCKET_NAME')
+    
+    try:
+        s3_client.head_object(Bucket=bucket, Key=key)
+        return True
+    except ClientError as e:
+        if e.response['Error']['Code'] in ('404', 'NoSuchKey', 'NotFound'):
+            return False
+        logger.error(f"Error checking object in S3: {str(e)}", key=key)
+        raise
+
+
+def get_object_range(key: str, offset: int, length: int, bucket: str = None) -> bytes:
+    """Leer un rango de bytes de un objeto (GET con Range)"""
+    if not bucket:
+        bucket = os.getenv('MEDIA_BUCKET_NAME')
+    
+    try:
+        response = s3_client.get_object(
+            Bucket=bucket,
+            Key=key,
+            Range=f"bytes={offset}-{offset + length - 1}"
+        )
+        return response['Body'].read()
+    except Exception as e:
+        logger.error(f"Error reading object range from S3: {str(e)}", key=key)
+        raise
+
+
+def presigned_get_url(key: str, expires_in: int = 300, bucket: str = None) -> str:
+    """Generar una URL prefirmada de lectura (el bucket es privado)"""
+    if not bucket:
+        bucket = os.getenv('MEDIA_BUCKET_NAME')
+    
+    return s3_client.generate_presigned_url(
+        'get_object',
+        Params={'Bucket': bucket, 'Key': key},
+        ExpiresIn=expires_in
+    )
+
+
+class MultipartUpload:
+    """
+    Objeto de S3 escrito en streaming con una subida multipart
+    
+    write() acumula hasta part_size bytes y sube esa parte, así la
+    memoria usada no depende del tamaño del objeto. Se puede usar como
+    fileobj (p.ej. de gzip.GzipFile).
+    
+    Uso:
+        upload = MultipartUpload(key, 'application/x-ndjson')
+        try:
+            upload.write(data)
+            upload.close()
+        except Exception:
+            upload.abort()
+            raise
+    """
+    
+    def __init__(
+        self,
+        key: str,
+        content_type: str,
+        content_encoding: Optional[str] = None,
+        bucket: str = None,
+        part_size: int = MULTIPART_PART_SIZE
+    ):
+        self.bucket = bucket or os.getenv('MEDIA_BUCKET_NAME')
+        self.key = key
+        self.part_size = part_size
+        self.buffer = bytearray()
+        self.parts = []
+        self.size = 0
+        
+        kwargs = {'Bucket': self.bucket, 'Key': key, 'ContentType': content_type}
+        if content_encoding:
+            kwargs['ContentEncoding'] = content_encoding
+        
+        self.upload_id = s3_client.create_multipart_upload(**kwargs)['UploadId']
+    
+    def write(self, data: bytes) -> int:
+        """Agregar bytes al objeto (sube una parte cuando se llena el buffer)"""
+        self.buffer.extend(data)
+        self.size += len(data)
+        if len(self.buffer) >= self.part_size:
+            self._upload_part()
+        return len(data)
+    
+    def _upload_part(self):
+        part_number = len(self.parts) + 1
+        response = s3_client.upload_part(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+            PartNumber=part_number,
+            Body=bytes(self.buffer)
+        )
+        self.parts.append({'PartNumber': part_number, 'ETag': response['ETag']})
+        self.buffer.clear()
+    
+    def close(self) -> int:
+        """
+        Subir lo que queda y completar el objeto
+        
+        Returns:
+            Tamaño del objeto en bytes
+        """
+        if self.buffer or not self.parts:
+            self._upload_part()
+        
+        s3_client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+            MultipartUpload={'Parts': self.parts}
+        )
+        return self.size
+    
+    def abort(self):
+        """Descartar la subida y las partes ya subidas"""
+        try:
+            s3_client.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id)
+        except Exception as e:
+            logger.error(f"Error aborting multipart upload: {str(e)}", key=self.key)
@@ -1,11 +1,42 @@
 """Cliente Step Functions"""
-import boto3
-import json
+import os
 from typing import Dict, Any
+from botocore.exceptions import ClientError
 from ..utils.logger import logger
+from ..utils import codec
+from ..utils.circuit_breaker import CircuitOpenError, get_breaker
+from . import aws
 
 # Inicializar cliente Step Functions
-sfn_client = boto3.client('stepfunctions')
+sfn_client = aws.client('stepfunctions')
+
+# Los callbacks de tareas (success/failure/heartbeat) no son críticos para
+# quien los envía: cliente con pocos intentos y circuit breaker
+callback_client = aws.client('stepfunctions', max_attempts=aws.NON_CRITICAL_MAX_ATTEMPTS)
+
+CALLBACK_LATENCY_BUDGET_MS = float(os.getenv('SFN_CALLBACK_LATENCY_BUDGET_MS', '1000'))
+
+# Errores de un token ya cerrado: la dependencia responde bien
+CLOSED_TASK_ERRORS = {'TaskTimedOut', 'TaskDoesNotExist', 'InvalidToken'}
+
+
+def is_task_closed(error: Exception) -> bool:
+    """El error indica que la tarea ya se cerró (completada, expirada o inexistente)"""
+    return (
+        isinstance(error, ClientError)
+        and error.response.get('Error', {}).get('Code') in CLOSED_TASK_ERRORS
+    )
+
+
+def _is_callback_failure(error: Exception) -> bool:
+    return not is_task_closed(error)
+
+
+_callback_breaker = get_breaker(
+    'stepfunctions-callbacks',
+    latency_budget_ms=CALLBACK_LATENCY_BUDGET_MS,
+    is_failure=_is_callback_failure
+)
 
 
 def start_execution(
@@ -27,7 +58,7 @@ def start_execution(
     try:
         kwargs = {
             'stateMachineArn': state_machine_arn,
-            'input': json.dumps(input_data)
+            'input': codec.dumps(input_data)
         }
         
         if name:
@@ -62,14 +93,18 @@ def send_task_success(task_token: str, output: Dict[str, Any]) -> Dict[str, Any]
         Respuesta de Step Functions
     """
     try:
-        response = sfn_client.send_task_success(
+        response = _callback_breaker.call(
+            callback_client.send_task_success,
             taskToken=task_token,
-            output=json.dumps(output)
+            output=codec.dumps(output)
         )
         
         logger.info("Task success sent to Step Functions", task_token=task_token[:50])
         
         return response
+    except CircuitOpenError:
+        # Falla rápido sin llamar: quien llama decide cómo registrarlo
+        raise
     except Exception as e:
         logger.exception(
             f"Error sending task success: {str(e)}",
@@ -99,7 +134,7 @@ def send_task_failure(task_token: str, error: str, cause: str = None) -> Dict[st
         if cause:
             kwargs['cause'] = cause
         
-        response = sfn_client.send_task_failure(**kwargs)
+        response = _callback_breaker.call(callback_client.send_task_failure, **kwargs)
         
         logger.warning(
             "Task failure sent to Step Functions",
@@ -108,6 +143,9 @@ def send_task_failure(task_token: str, error: str, cause: str = None) -> Dict[st
         )
         
         return response
+    except CircuitOpenError:
+        # Falla rápido sin llamar: quien llama decide cómo registrarlo
+        raise
     except Exception as e:
         logger.exception(
             f"Error sending task failure: {str(e)}",
@@ -116,7 +154,7 @@ def send_task_failure(task_token: str, error: str, cause: str = None) -> Dict[st
         raise
 
 
-def send_task_heartbeat(task_token: str) -> Dict[str, Any]:
+def send_task_heartbeat(task_token: str) -> bool:
     """
     Enviar heartbeat para mantener la tarea activa
     
@@ -124,14 +162,27 @@ def send_task_heartbeat(task_token: str) -> Dict[str, Any]:
         task_token: Token de la tarea
     
     Returns:
-        Respuesta de Step Functions
+        True si la tarea sigue activa, False si ya expiró o fue cerrada
     """
     try:
-        response = sfn_client.send_task_heartbeat(taskToken=task_token)
+        _callback_breaker.call(callback_client.send_task_heartbeat, taskToken=task_token)
         
         logger.debug("Task heartbeat sent", task_token=task_token[:50])
         
-        return response
+        return True
+    
+    except (
+        callback_client.exceptions.TaskTimedOut,
+        callback_client.exceptions.TaskDoesNotExist,
+        callback_client.exceptions.InvalidToken
+    ):
+        logger.warning("Task already closed, heartbeat ignored", task_token=task_token[:50])
+        return False
+    
+    except CircuitOpenError:
+        # Falla rápido sin llamar: quien llama decide cómo registrarlo
+        raise
+    
     except Exception as e:
         logger.exception(
             f"Error sending task heartbeat: {str(e)}",
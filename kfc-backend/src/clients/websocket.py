@@ -1,10 +1,31 @@
 """Cliente WebSocket API Gateway"""
-import boto3
-import json
 import os
 from typing import Dict, Any, List, Optional
 from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
 from ..utils.logger import logger
+from ..utils import codec
+from ..utils.circuit_breaker import CircuitOpenError, get_breaker
+from . import aws
+
+
+# Presupuesto de latencia de un envío antes de contarlo como fallo
+WEBSOCKET_LATENCY_BUDGET_MS = float(os.getenv('WEBSOCKET_LATENCY_BUDGET_MS', '1000'))
+
+
+def _is_post_failure(error: Exception) -> bool:
+    # Una conexión que ya se cerró no indica que la API esté caída
+    return not (
+        isinstance(error, ClientError)
+        and error.response.get('Error', {}).get('Code') == 'GoneException'
+    )
+
+
+_breaker = get_breaker(
+    'websocket',
+    latency_budget_ms=WEBSOCKET_LATENCY_BUDGET_MS,
+    is_failure=_is_post_failure
+)
 
 # Inicializar cliente API Gateway Management
 def get_api_client():
@@ -13,9 +34,11 @@ def get_api_client():
     if not endpoint_url:
         raise ValueError("WEBSOCKET_API_ENDPOINT environment variable not set")
     
-    return boto3.client(
+    # Compartido por endpoint: se reutilizan las conexiones entre envíos
+    return aws.client(
         'apigatewaymanagementapi',
-        endpoint_url=endpoint_url
+        endpoint_url=endpoint_url,
+        max_attempts=aws.NON_CRITICAL_MAX_ATTEMPTS
     )
 
 
@@ -29,13 +52,17 @@ def post_to_connection(connection_id: str, data: Dict[str, Any]) -> bool:
     
     Returns:
         True si exitoso, False si la conexión está cerrada
+    
+    Raises:
+        CircuitOpenError: La API de WebSocket está fallando (no se intentó)
     """
     try:
         client = get_api_client()
         
-        client.post_to_connection(
+        _breaker.call(
+            client.post_to_connection,
             ConnectionId=connection_id,
-            Data=json.dumps(data).encode('utf-8')
+            Data=codec.dumps_bytes(data)
         )
         
         logger.debug(f"Message sent to connection {connection_id}")
@@ -47,6 +74,9 @@ def post_to_connection(connection_id: str, data: Dict[str, Any]) -> bool:
         _cleanup_connection(connection_id)
         return False
     
+    except CircuitOpenError:
+        raise
+    
     except Exception as e:
         logger.error(
             f"Error posting to connection {connection_id}: {str(e)}",
@@ -98,10 +128,16 @@ def broadcast_to_tenant(
         }
         
         # Enviar a cada conexión
-        for conn in connections:
+        for index, conn in enumerate(connections):
             connection_id = conn.get('connectionId')
             if connection_id:
-                success = post_to_connection(connection_id, data)
+                try:
+                    success = post_to_connection(connection_id, data)
+                except CircuitOpenError:
+                    # La API está caída: no esperar en el resto de las conexiones
+                    logger.warning(f"WebSocket circuit open, broadcast aborted", tenant_id=tenant_id)
+                    stats['failed'] += len(connections) - index
+                    break
                 if success:
                     stats['sent'] += 1
                 else:
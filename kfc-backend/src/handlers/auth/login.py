@@ -2,8 +2,8 @@
 import bcrypt
 from datetime import datetime, timedelta
 from jose import jwt
-from ...utils.responses import success_response, error_response, unauthorized_response
-from ...utils.decorators import with_logging, with_error_handling, parse_json_body, validate_tenant
+from ...utils.responses import success_response, unauthorized_response
+from ...utils.decorators import with_logging, with_error_handling, parse_json_body, validate_tenant_and_body
 from ...utils.validators import LoginRequest
 from ...clients.dynamodb import get_user_by_email
 from ...utils.logger import logger
@@ -17,7 +17,7 @@ JWT_ALGORITHM = "HS256"
 @with_logging
 @with_error_handling
 @parse_json_body
-@validate_tenant
+@validate_tenant_and_body(LoginRequest)
 def handler(event, context):
     """
     Login de usuario
@@ -30,13 +30,8 @@ def handler(event, context):
     """
     tenant_id = event['pathParameters']['tenantId']
     
-    # Validar request
-    try:
-        body = event.get('parsedBody', {})
-        login_request = LoginRequest(**body)
-    except Exception as e:
-        logger.error(f"Validation error: {str(e)}")
-        return error_response(f"Validation error: {str(e)}", status_code=422)
+    # Request validado en paralelo con la consulta del tenant
+    login_request = event['validatedBody']
     
     # Buscar usuario por email
     user = get_user_by_email(tenant_id, login_request.email)
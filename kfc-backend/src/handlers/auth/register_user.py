@@ -4,7 +4,7 @@ import os
 import bcrypt
 from datetime import datetime
 from ...utils.responses import created_response, error_response
-from ...utils.decorators import with_logging, with_error_handling, parse_json_body, validate_tenant
+from ...utils.decorators import with_logging, with_error_handling, parse_json_body, validate_tenant_and_body
 from ...utils.validators import RegisterUserRequest
 from ...clients.dynamodb import put_item, get_user_by_email
 from ...utils.logger import logger
@@ -13,7 +13,7 @@ from ...utils.logger import logger
 @with_logging
 @with_error_handling
 @parse_json_body
-@validate_tenant
+@validate_tenant_and_body(RegisterUserRequest)
 def handler(event, context):
     """
     Registra un nuevo usuario para un tenant
@@ -28,13 +28,8 @@ def handler(event, context):
     """
     tenant_id = event['pathParameters']['tenantId']
     
-    # Validar request
-    try:
-        body = event.get('parsedBody', {})
-        user_request = RegisterUserRequest(**body)
-    except Exception as e:
-        logger.error(f"Validation error: {str(e)}")
-        return error_response(f"Validation error: {str(e)}", status_code=422)
+    # Request validado en paralelo con la consulta del tenant
+    user_request = event['validatedBody']
     
     # Verificar que el email no esté ya registrado
     existing_user = get_user_by_email(tenant_id, user_request.email)
@@ -0,0 +1,113 @@
+"""Job de archivo: mueve órdenes terminadas y antiguas de DynamoDB a S3"""
+import os
+import time
+from datetime import datetime, timedelta
+from boto3.dynamodb.conditions import Key, Attr
+from ...utils.concurrency import remaining_seconds
+from ...utils.logger import logger
+from ...utils.decorators import track_invocation
+from ...clients.dynamodb import query_orders, scan_items
+from ...models.order import TERMINAL_STATUSES
+from ...clients.s3 import object_exists
+from ...models.archive import archive_orders
+from .export_orders import export_prefix
+
+
+# Días desde la última actualización para archivar una orden terminada
+# (más que el desfase del export mensual, que corre el día 1)
+ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', '35'))
+
+# Órdenes por lote (un objeto por fecha de creación dentro del lote)
+ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', '500'))
+
+# Tiempo mínimo restante para empezar otro lote
+MIN_REMAINING_SECONDS = 60
+
+# Espera cuando status-index solo devuelve órdenes ya archivadas
+INDEX_LAG_SECONDS = 1
+
+
+def archive_cutoff(now: datetime) -> str:
+    """
+    updatedAt máximo de las órdenes a archivar
+    
+    export_orders solo lee la tabla caliente: no se archivan órdenes de un
+    mes sin export. Como createdAt <= updatedAt, acotar el cutoff al inicio
+    del mes actual deja solo meses anteriores, y si el export del mes
+    pasado todavía no escribió su manifest, al inicio del mes pasado.
+    """
+    cutoff = now - timedelta(days=ARCHIVE_AFTER_DAYS)
+    
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    previous_month_start = (month_start - timedelta(days=1)).replace(day=1)
+    if not object_exists(f"{export_prefix(previous_month_start.strftime('%Y-%m'))}manifest.json"):
+        month_start = previous_month_start
+    
+    return min(cutoff, month_start).isoformat()
+
+
+@track_invocation
+def handler(event, context):
+    """
+    Archiva las órdenes delivered/failed/cancelled sin cambios hace más
+    de ARCHIVE_AFTER_DAYS días y de meses ya exportados (ver archive_cutoff)
+    
+    Recorre los tenants y, por cada estado terminal, consulta status-index
+    en lotes de ARCHIVE_BATCH_SIZE. Cada lote se escribe en S3
+    particionado por tenant y fecha, se indexa y se borra de la tabla
+    caliente. Si la invocación se queda sin tiempo, el resto queda para
+    la próxima ejecución.
+    """
+    cutoff = archive_cutoff(datetime.utcnow())
+    tenants = scan_items(os.getenv('TENANTS_TABLE'), projection_expression='tenantId')
+    
+    logger.info(f"Archiving orders older than {cutoff}", tenants=len(tenants))
+    
+    archived = 0
+    for tenant in tenants:
+        tenant_id = tenant['tenantId']
+        
+        for status in TERMINAL_STATUSES:
+            # El GSI es eventualmente consistente: puede volver a devolver
+            # órdenes recién borradas en la consulta siguiente
+            seen = set()
+            
+            while True:
+                remaining = remaining_seconds(context)
+                if remaining is not None and remaining < MIN_REMAINING_SECONDS:
+                    logger.warning(f"Stopping archive run before timeout", archived=archived)
+                    return {'archived': archived, 'completed': False}
+                
+                page = query_orders(
+                    tenant_id,
+                    lambda partition: partition & Key('status').eq(status.value),
+                    sort_key='status',
+                    filter_expression=Attr('updatedAt').lt(cutoff),
+                    index_name='status-index',
+                    limit=ARCHIVE_BATCH_SIZE,
+                    paginate=True,
+                    unshard=False
+                )
+                orders = [order for order in page if order['orderId'] not in seen]
+                
+                if orders:
+                    seen.update(order['orderId'] for order in orders)
+                    moved = archive_orders(tenant_id, orders)
+                    archived += len(moved)
+                    
+                    logger.info(
+                        f"Archived {len(moved)} orders",
+                        tenant_id=tenant_id,
+                        status=status.value
+                    )
+                elif page:
+                    # Página con solo órdenes ya borradas: esperar a que el GSI se ponga al día
+                    time.sleep(INDEX_LAG_SECONDS)
+                
+                # Solo la página completa (antes de descartar las ya vistas) indica si quedan órdenes
+                if len(page) < ARCHIVE_BATCH_SIZE:
+                    break
+    
+    logger.info(f"Archive run finished", archived=archived)
+    
+    return {'archived': archived, 'completed': True}
@@ -0,0 +1,119 @@
+"""Job de exportación mensual de órdenes a S3 (NDJSON comprimido)"""
+import gzip
+import os
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from boto3.dynamodb.conditions import Attr
+from ...utils import codec
+from ...utils.concurrency import Parallel
+from ...utils.logger import logger
+from ...utils.decorators import track_invocation
+from ...clients.dynamodb import scan_segment, unshard_order
+from ...clients.s3 import MultipartUpload, put_object
+
+
+# Segmentos del Scan paralelo (uno por thread, cada uno con su archivo)
+EXPORT_SEGMENTS = int(os.getenv('EXPORT_SEGMENTS', '8'))
+
+# Ítems por página del Scan (una página por segmento en memoria)
+EXPORT_PAGE_SIZE = int(os.getenv('EXPORT_PAGE_SIZE', '1000'))
+
+
+def export_prefix(month: str, tenant_id: Optional[str] = None) -> str:
+    """Prefijo de los archivos de un export en el bucket de media"""
+    prefix = f"exports/orders/{month}/"
+    return f"{prefix}tenant={tenant_id}/" if tenant_id else prefix
+
+
+def _export_segment(segment: int, total_segments: int, month: str, tenant_id: Optional[str]) -> Dict[str, Any]:
+    """Escanear un segmento y escribirlo como un archivo NDJSON gzip"""
+    condition = Attr('createdAt').begins_with(month)
+    if tenant_id:
+        # Incluye las particiones con shard (tenantId#N) del tenant
+        condition = condition & (Attr('tenantId').eq(tenant_id) | Attr('tenantId').begins_with(f"{tenant_id}#"))
+    
+    key = f"{export_prefix(month, tenant_id)}part-{segment:04d}.ndjson.gz"
+    upload = MultipartUpload(key, 'application/x-ndjson', content_encoding='gzip')
+    count = 0
+    
+    try:
+        with gzip.GzipFile(fileobj=upload, mode='wb', mtime=0) as stream:
+            for page in scan_segment(
+                os.getenv('ORDERS_TABLE'),
+                segment,
+                total_segments,
+                filter_expression=condition,
+                page_size=EXPORT_PAGE_SIZE
+            ):
+                for order in page:
+                    stream.write(codec.dumps_bytes(unshard_order(order)) + b'\n')
+                count += len(page)
+        size = upload.close()
+    except Exception:
+        upload.abort()
+        raise
+    
+    logger.info(f"Export segment finished", segment=segment, orders=count, bytes=size)
+    
+    return {'key': key, 'orders': count, 'bytes': size}
+
+
+def _previous_month() -> str:
+    """Mes anterior al actual (YYYY-MM, UTC)"""
+    first_of_month = datetime.utcnow().replace(day=1)
+    return (first_of_month - timedelta(days=1)).strftime('%Y-%m')
+
+
+@track_invocation
+def handler(event, context):
+    """
+    Exporta las órdenes creadas en un mes a archivos NDJSON gzip en S3
+    
+    Se ejecuta el día 1 de cada mes para el mes anterior, o a demanda con
+    el evento {"month": "2026-09", "tenantId": "..."} (tenantId opcional).
+    
+    Cada segmento del Scan paralelo corre en un thread del pool y escribe
+    su propio archivo part-NNNN.ndjson.gz con una subida multipart: scan,
+    compresión y subida avanzan página a página, así la memoria queda
+    acotada a una página y una parte por segmento sin importar el tamaño
+    de la tabla. Al final se escribe manifest.json con los archivos.
+    """
+    event = event or {}
+    month = event.get('month') or _previous_month()
+    tenant_id = event.get('tenantId')
+    total_segments = int(event.get('segments') or EXPORT_SEGMENTS)
+    
+    if not re.fullmatch(r'\d{4}-\d{2}', month):
+        raise ValueError(f"Invalid month {month}, expected YYYY-MM")
+    
+    logger.info(
+        f"Exporting orders for {month}",
+        tenant_id=tenant_id,
+        segments=total_segments
+    )
+    
+    parts = Parallel(context).map(
+        lambda segment: _export_segment(segment, total_segments, month, tenant_id),
+        range(total_segments)
+    )
+    
+    manifest = {
+        'month': month,
+        'tenantId': tenant_id,
+        'format': 'ndjson',
+        'compression': 'gzip',
+        'exportedAt': datetime.utcnow().isoformat(),
+        'orders': sum(part['orders'] for part in parts),
+        'parts': parts
+    }
+    
+    put_object(
+        f"{export_prefix(month, tenant_id)}manifest.json",
+        codec.dumps_bytes(manifest),
+        content_type='application/json'
+    )
+    
+    logger.info(f"Orders export finished", month=month, orders=manifest['orders'])
+    
+    return manifest
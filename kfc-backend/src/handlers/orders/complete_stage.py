@@ -1,11 +1,13 @@
 """Handler para completar una etapa del workflow"""
-import os
 from datetime import datetime
 from ...utils.responses import success_response, not_found_response, error_response
 from ...utils.decorators import with_logging, with_error_handling, parse_json_body, validate_tenant
-from ...clients.dynamodb import get_order, update_item
-from ...clients.stepfunctions import send_task_success
+from ...utils.concurrency import Parallel
+from ...clients.dynamodb import transition_order
+from ...clients.stepfunctions import send_task_success, is_task_closed
 from ...clients.eventbridge import publish_order_stage_completed
+from ...models.order import WORKFLOW_STAGES, OrderNotFoundError, InvalidTransitionError, stage_transition
+from ...models.trace import public_order
 from ...utils.logger import logger
 
 
@@ -22,6 +24,11 @@ def handler(event, context):
         "taskToken": "...",
         "notes": "Completed successfully"
     }
+    
+    Sin taskToken se usa el token guardado por el worker de la etapa. Si
+    Step Functions no recibe el callback se responde 503: la etapa ya
+    quedó completada y el reintento (409 STAGE_ALREADY_COMPLETED) vuelve
+    a enviar el callback.
     """
     tenant_id = event['pathParameters']['tenantId']
     order_id = event['pathParameters']['orderId']
@@ -38,74 +45,107 @@ def handler(event, context):
         stage=stage
     )
     
-    # Verificar que la orden existe
-    order = get_order(tenant_id, order_id)
-    if not order:
-        return not_found_response(f"Order {order_id} not found")
-    
     # Validar que el stage es válido
-    valid_stages = ['kitchen', 'packaging', 'delivery']
-    if stage not in valid_stages:
+    transition = stage_transition(stage, 'completed')
+    if not transition:
         return error_response(
-            f"Invalid stage. Must be one of: {', '.join(valid_stages)}",
+            f"Invalid stage. Must be one of: {', '.join(WORKFLOW_STAGES)}",
             status_code=400
         )
     
-    # Actualizar estado en DynamoDB
+    # Transición condicional en DynamoDB (sin leer la orden antes)
+    io = Parallel(context)
     try:
-        # Agregar evento al trace
-        new_trace_event = {
-            'timestamp': datetime.utcnow().isoformat(),
-            'event': f'{stage}_completed',
-            'status': stage,
-            'notes': notes
-        }
-        
-        current_trace = order.get('trace', [])
-        current_trace.append(new_trace_event)
-        
-        updates = {
-            'status': stage,
-            'updatedAt': datetime.utcnow().isoformat(),
-            'trace': current_trace
-        }
-        
-        updated_order = update_item(
-            os.getenv('ORDERS_TABLE'),
-            {'tenantId': tenant_id, 'orderId': order_id},
-            updates
+        updated_order = transition_order(
+            tenant_id,
+            order_id,
+            transition,
+            trace_fields={'notes': notes}
         )
         
-        logger.info(f"Order status updated", order_id=order_id, status=stage)
+        logger.info(f"Order status updated", order_id=order_id, status=updated_order.get('status'))
+    except OrderNotFoundError:
+        return not_found_response(f"Order {order_id} not found")
+    except InvalidTransitionError as e:
+        logger.warning(f"Invalid stage transition: {str(e)}", order_id=order_id)
+        if e.duplicate:
+            # Un reintento puede venir de un callback que falló: re-enviarlo
+            # (si la tarea ya se cerró, Step Functions lo rechaza sin efecto)
+            task_token = task_token or (e.order or {}).get(f'{stage}TaskToken')
+            if task_token:
+                notify = io.submit(_notify, task_token, tenant_id, order_id, stage)
+                if not _notified(io, notify, order_id):
+                    return _notify_failed_response(stage)
+            
+            return error_response(
+                f"Stage {stage} already completed",
+                status_code=409,
+                error_code='STAGE_ALREADY_COMPLETED'
+            )
+        return error_response(
+            f"Stage {stage} cannot be completed while order is {e.current_status}",
+            status_code=409,
+            error_code='INVALID_TRANSITION'
+        )
     except Exception as e:
         logger.error(f"Failed to update order: {str(e)}")
         return error_response("Failed to update order", status_code=500)
     
-    # Publicar evento de stage completado
+    # Publicar evento y notificar a Step Functions en paralelo
+    publish = io.submit(publish_order_stage_completed, tenant_id, order_id, stage)
+    
+    # Sin taskToken en el body se usa el guardado por el worker de la etapa
+    task_token = task_token or updated_order.get(f'{stage}TaskToken')
+    notify = io.submit(_notify, task_token, tenant_id, order_id, stage) if task_token else None
+    
     try:
-        publish_order_stage_completed(tenant_id, order_id, stage)
+        io.result(publish)
         logger.info(f"Stage completed event published", order_id=order_id, stage=stage)
     except Exception as e:
         logger.error(f"Failed to publish event: {str(e)}")
     
-    # Si hay taskToken, notificar a Step Functions
-    if task_token:
-        try:
-            send_task_success(
-                task_token=task_token,
-                output={
-                    'orderId': order_id,
-                    'tenantId': tenant_id,
-                    'stage': stage,
-                    'completedAt': datetime.utcnow().isoformat()
-                }
-            )
-            logger.info(f"Task success sent to Step Functions", order_id=order_id)
-        except Exception as e:
-            logger.error(f"Failed to send task success: {str(e)}")
-            # No fallar si esto falla
+    if notify and not _notified(io, notify, order_id):
+        # La etapa ya quedó registrada: el reintento del cliente re-envía
+        # el callback por el camino de etapa ya completada
+        return _notify_failed_response(stage)
     
     return success_response({
         'message': f'Stage {stage} completed successfully',
-        'order': updated_order
+        'order': public_order(updated_order)
     })
+
+
+def _notify(task_token: str, tenant_id: str, order_id: str, stage: str):
+    """Enviar task success de la etapa a Step Functions"""
+    return send_task_success(
+        task_token=task_token,
+        output={
+            'orderId': order_id,
+            'tenantId': tenant_id,
+            'stage': stage,
+            'completedAt': datetime.utcnow().isoformat()
+        }
+    )
+
+
+def _notified(io: Parallel, notify, order_id: str) -> bool:
+    """Esperar el callback; una tarea ya cerrada cuenta como notificada"""
+    try:
+        io.result(notify)
+        logger.info(f"Task success sent to Step Functions", order_id=order_id)
+        return True
+    except Exception as e:
+        if is_task_closed(e):
+            logger.info(f"Task already closed in Step Functions", order_id=order_id)
+            return True
+        logger.error(f"Failed to send task success: {str(e)}", order_id=order_id)
+        return False
+
+
+def _notify_failed_response(stage: str):
+    """503 para que el cliente reintente y se re-envíe el callback"""
+    return error_response(
+        f"Stage {stage} was completed but the workflow could not be notified, retry the request",
+        status_code=503,
+        error_code='WORKFLOW_NOTIFICATION_FAILED'
+    )
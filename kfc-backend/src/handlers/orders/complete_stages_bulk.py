@@ -0,0 +1,168 @@
+"""Handler para completar una etapa en varias órdenes a la vez"""
+from datetime import datetime
+from ...utils.responses import success_response, error_response
+from ...utils.decorators import with_logging, with_error_handling, parse_json_body, validate_tenant_and_body
+from ...utils.validators import CompleteStagesRequest
+from ...utils.concurrency import Parallel
+from ...clients.dynamodb import transition_order
+from ...clients.stepfunctions import send_task_success, is_task_closed
+from ...clients.eventbridge import publish_order_stage_completed
+from ...models.order import (
+    WORKFLOW_STAGES,
+    OrderTransition,
+    OrderNotFoundError,
+    InvalidTransitionError,
+    stage_transition
+)
+from ...utils.logger import logger
+
+
+@with_logging
+@with_error_handling
+@parse_json_body
+@validate_tenant_and_body(CompleteStagesRequest)
+def handler(event, context):
+    """
+    Completa una etapa del workflow para varias órdenes en un solo request
+    
+    POST /tenants/{tenantId}/stages/{stage}/complete
+    Body: {
+        "orderIds": ["order_...", "order_..."],
+        "notes": "Rack completo",
+        "taskTokens": {"order_...": "..."}
+    }
+    
+    Si no se envía taskToken para una orden se usa el token guardado
+    por el worker de la etapa ({stage}TaskToken). Las órdenes con
+    taskNotified=false ya quedaron completadas: reintentarlas re-envía
+    el callback.
+    """
+    tenant_id = event['pathParameters']['tenantId']
+    stage = event['pathParameters']['stage']
+    
+    # Validar que el stage es válido
+    transition = stage_transition(stage, 'completed')
+    if not transition:
+        return error_response(
+            f"Invalid stage. Must be one of: {', '.join(WORKFLOW_STAGES)}",
+            status_code=400
+        )
+    
+    bulk_request = event['validatedBody']
+    order_ids = bulk_request.orderIds
+    task_tokens = bulk_request.taskTokens or {}
+    notes = bulk_request.notes or ''
+    
+    logger.info(
+        f"Completing stage for {len(order_ids)} orders",
+        tenant_id=tenant_id,
+        stage=stage,
+        count=len(order_ids)
+    )
+    
+    io = Parallel(context)
+    
+    # Fase 1: actualizar todas las órdenes en paralelo
+    results = io.map(
+        lambda order_id: _update_order(tenant_id, order_id, transition, notes),
+        order_ids
+    )
+    
+    # Fase 2: eventos y task success en paralelo para las órdenes actualizadas.
+    # Las ya completadas solo re-envían el callback (un reintento puede venir
+    # de un callback que falló; si la tarea ya se cerró no tiene efecto)
+    side_effects = []
+    for result, order in results:
+        if not order:
+            continue
+        
+        order_id = result['orderId']
+        if result['success']:
+            side_effects.append((
+                result,
+                'eventPublished',
+                io.submit(publish_order_stage_completed, tenant_id, order_id, stage)
+            ))
+        
+        task_token = task_tokens.get(order_id) or order.get(f'{stage}TaskToken')
+        if task_token:
+            side_effects.append((
+                result,
+                'taskNotified',
+                io.submit(
+                    send_task_success,
+                    task_token=task_token,
+                    output={
+                        'orderId': order_id,
+                        'tenantId': tenant_id,
+                        'stage': stage,
+                        'completedAt': datetime.utcnow().isoformat()
+                    }
+                )
+            ))
+    
+    for result, flag, future in side_effects:
+        try:
+            io.result(future)
+            result[flag] = True
+        except Exception as e:
+            # Una tarea ya cerrada cuenta como notificada
+            if flag == 'taskNotified' and is_task_closed(e):
+                result[flag] = True
+                continue
+            
+            # No fallar la orden si la notificación falla
+            logger.error(
+                f"Failed side effect for order: {str(e)}",
+                order_id=result['orderId'],
+                side_effect=flag
+            )
+            result[flag] = False
+    
+    order_results = [result for result, _ in results]
+    completed = sum(1 for result in order_results if result['success'])
+    
+    logger.info(
+        f"Bulk stage completion finished",
+        tenant_id=tenant_id,
+        stage=stage,
+        completed=completed,
+        failed=len(order_results) - completed
+    )
+    
+    return success_response({
+        'stage': stage,
+        'completed': completed,
+        'failed': len(order_results) - completed,
+        'results': order_results
+    })
+
+
+def _update_order(tenant_id: str, order_id: str, transition: OrderTransition, notes: str):
+    """Marca la etapa como completada con una escritura condicional"""
+    try:
+        updated_order = transition_order(
+            tenant_id,
+            order_id,
+            transition,
+            trace_fields={'notes': notes}
+        )
+    except OrderNotFoundError:
+        logger.warning(f"Order not found", order_id=order_id)
+        return {'orderId': order_id, 'success': False, 'error': 'ORDER_NOT_FOUND'}, None
+    except InvalidTransitionError as e:
+        logger.warning(f"Invalid stage transition: {str(e)}", order_id=order_id)
+        return {
+            'orderId': order_id,
+            'success': False,
+            'error': 'STAGE_ALREADY_COMPLETED' if e.duplicate else 'INVALID_TRANSITION',
+            'currentStatus': e.current_status
+        }, e.order if e.duplicate else None
+    except Exception as e:
+        logger.error(f"Failed to update order: {str(e)}", order_id=order_id)
+        return {'orderId': order_id, 'success': False, 'error': 'UPDATE_FAILED'}, None
+    
+    status = updated_order.get('status')
+    logger.info(f"Order status updated", order_id=order_id, status=status)
+    
+    return {'orderId': order_id, 'success': True, 'status': status}, updated_order
@@ -1,32 +1,35 @@
 """Handler para crear pedidos"""
-import uuid
 import os
-from datetime import datetime
 from ...utils.responses import created_response, error_response
-from ...utils.decorators import with_logging, with_error_handling, parse_json_body, validate_tenant
+from ...utils.decorators import with_logging, with_error_handling, parse_json_body, validate_tenant_and_body, idempotent_request
 from ...utils.validators import CreateOrderRequest
-from ...clients.dynamodb import put_item
+from ...utils.concurrency import Parallel
+from ...clients.dynamodb import put_order, batch_write_items
 from ...clients.eventbridge import publish_order_created
-from ...models.order import Order
+from ...models.order import new_order
+from ...models.catalog import CatalogError, resolve_items
+from ...models.tickets import next_ticket_numbers
+from ...models.search import index_entries
+from ...models.trace import public_order
 from ...utils.logger import logger
 
 
 @with_logging
 @with_error_handling
 @parse_json_body
-@validate_tenant
+@validate_tenant_and_body(CreateOrderRequest)
+@idempotent_request('create_order')
 def handler(event, context):
     """
     Crea un pedido y dispara el workflow
     
     POST /tenants/{tenantId}/orders
+    Headers (opcional): Idempotency-Key: <uuid generado por el cliente>
     Body: {
         "items": [
             {
                 "productId": "prod_123",
-                "quantity": 2,
-                "price": 15.99,
-                "name": "Bucket Original"
+                "quantity": 2
             }
         ],
         "customerName": "Juan Pérez",
@@ -34,68 +37,72 @@ def handler(event, context):
         "deliveryAddress": "Av. Larco 123",
         "notes": "Sin picante"
     }
-    """
-    tenant_id = event['pathParameters']['tenantId']
     
-    # Validar request
-    try:
-        body = event.get('parsedBody', {})
-        order_request = CreateOrderRequest(**body)
-    except Exception as e:
-        logger.error(f"Validation error: {str(e)}")
-        return error_response(f"Validation error: {str(e)}", status_code=422)
+    El nombre y el precio de cada item se toman del catálogo del tenant;
+    los productos inexistentes o no disponibles se rechazan con 422.
     
-    # Generar ID único para la order
-    order_id = f"order_{uuid.uuid4().hex[:16]}"
+    Los reintentos con el mismo Idempotency-Key devuelven la respuesta
+    original sin crear otra orden ni iniciar otro workflow.
+    """
+    tenant_id = event['pathParameters']['tenantId']
     
-    # Crear objeto Order
-    order_data = {
-        'tenantId': tenant_id,
-        'orderId': order_id,
-        'status': 'pending',
-        'items': [item.dict() for item in order_request.items],
-        'customerName': order_request.customerName,
-        'customerPhone': order_request.customerPhone,
-        'deliveryAddress': order_request.deliveryAddress,
-        'notes': order_request.notes,
-        'createdAt': datetime.utcnow().isoformat(),
-        'updatedAt': datetime.utcnow().isoformat(),
-        'trace': []
-    }
+    # Request validado en paralelo con la consulta del tenant
+    order_request = event['validatedBody']
     
-    order = Order(order_data)
+    # Resolver precios contra el catálogo (un BatchGetItem, con cache)
+    try:
+        items = resolve_items(tenant_id, order_request.items)
+    except CatalogError as e:
+        logger.warning(f"Rejected order items: {str(e)}", tenant_id=tenant_id)
+        return error_response(str(e), status_code=422, error_code=e.code)
     
-    # Calcular total
-    total = order.calculate_total()
+    # Número de ticket del día (desde el rango reservado por el contenedor)
+    ticket_number, = next_ticket_numbers(tenant_id)
     
-    # Agregar evento de creación al trace
-    order.add_trace_event('order_created', f'Order created by {order_request.customerName}')
+    # Construir la orden (ID, total y evento de creación en el trace)
+    order = new_order(tenant_id, order_request, items, ticket_number)
+    order_id = order.order_id
+    total = order.total_amount
     
-    # Guardar en DynamoDB
-    table_name = os.getenv('ORDERS_TABLE')
-    put_item(table_name, order.to_dict())
+    # Guardar la orden antes de publicar: el evento inicia el workflow y
+    # no debe existir un workflow para una orden que no se guardó
+    io = Parallel(context)
+    io.result(io.submit(put_order, order.to_dict()))
     
     logger.info(
         f"Order created successfully",
         tenant_id=tenant_id,
         order_id=order_id,
+        ticket_number=ticket_number,
         total=total
     )
     
-    # Publicar evento a EventBridge para iniciar workflow
+    # Índice de búsqueda y evento son independientes entre sí
+    index = io.submit(batch_write_items, os.getenv('SEARCH_TABLE'), index_entries(order.to_dict()))
+    publish = io.submit(
+        publish_order_created,
+        tenant_id=tenant_id,
+        order_id=order_id,
+        order_data={
+            'ticketNumber': ticket_number,
+            'customerName': order_request.customerName,
+            'totalAmount': total,
+            'itemCount': len(order_request.items)
+        }
+    )
+    
     try:
-        publish_order_created(
-            tenant_id=tenant_id,
-            order_id=order_id,
-            order_data={
-                'customerName': order_request.customerName,
-                'totalAmount': total,
-                'itemCount': len(order_request.items)
-            }
-        )
+        if io.result(index):
+            logger.error(f"Some search index entries were not written", order_id=order_id)
+    except Exception as e:
+        logger.error(f"Failed to index order for search: {str(e)}", order_id=order_id)
+        # No fallar la creación si la indexación falla
+    
+    try:
+        io.result(publish)
         logger.info(f"Order created event published", order_id=order_id)
     except Exception as e:
         logger.error(f"Failed to publish order created event: {str(e)}")
         # No fallar la creación si el evento falla
     
-    return created_response(order.to_dict())
+    return created_response(public_order(order.to_dict()))
@@ -0,0 +1,163 @@
+"""Handler para crear varias órdenes en un solo request (sincronización del POS)"""
+import os
+from pydantic import ValidationError
+from ...utils.responses import success_response
+from ...utils.decorators import with_logging, with_error_handling, parse_json_body, validate_tenant_and_body, idempotent_request
+from ...utils.validators import CreateOrderRequest, CreateOrdersBatchRequest
+from ...clients.dynamodb import batch_write_items, sharded_order
+from ...clients.eventbridge import publish_orders_created
+from ...models.order import new_order
+from ...models.catalog import CatalogError, get_products, price_items
+from ...models.tickets import next_ticket_numbers
+from ...models.search import index_entries
+from ...utils.logger import logger
+
+
+@with_logging
+@with_error_handling
+@parse_json_body
+@validate_tenant_and_body(CreateOrdersBatchRequest)
+@idempotent_request('create_orders_batch')
+def handler(event, context):
+    """
+    Crea varias órdenes y dispara sus workflows
+    
+    POST /tenants/{tenantId}/orders/batch
+    Headers (opcional): Idempotency-Key: <uuid generado por el POS>
+    Body: {
+        "orders": [
+            {"items": [...], "customerName": "...", ...},
+            ...
+        ]
+    }
+    
+    Cada orden se valida con CreateOrderRequest y sus items se resuelven
+    contra el catálogo del tenant (un solo lookup para todo el lote). Las
+    órdenes válidas se escriben con BatchWriteItem y sus eventos
+    order.created se publican con PutEvents. El resultado se reporta por
+    orden (en el mismo orden del request).
+    """
+    tenant_id = event['pathParameters']['tenantId']
+    batch_request = event['validatedBody']
+    
+    logger.info(
+        f"Creating {len(batch_request.orders)} orders in batch",
+        tenant_id=tenant_id,
+        count=len(batch_request.orders)
+    )
+    
+    results = []
+    orders = []
+    requests = []
+    
+    # Validar cada orden
+    for index, raw_order in enumerate(batch_request.orders):
+        try:
+            requests.append((index, CreateOrderRequest(**raw_order)))
+        except ValidationError as e:
+            results.append({
+                'index': index,
+                'success': False,
+                'error': 'VALIDATION_ERROR',
+                'details': [
+                    {'field': '.'.join(str(part) for part in error['loc']), 'message': error['msg']}
+                    for error in e.errors()
+                ]
+            })
+    
+    # Un solo lookup del catálogo para todos los productos del lote
+    products = get_products(
+        tenant_id,
+        (item.productId for _, order_request in requests for item in order_request.items)
+    )
+    
+    # Resolver precios de cada orden
+    priced = []
+    for index, order_request in requests:
+        try:
+            items = price_items(order_request.items, products)
+        except CatalogError as e:
+            results.append({
+                'index': index,
+                'success': False,
+                'error': e.code,
+                'productIds': e.product_ids
+            })
+            continue
+        
+        priced.append((index, order_request, items))
+    
+    # Números de ticket de todas las órdenes válidas en una sola reserva
+    ticket_numbers = next_ticket_numbers(tenant_id, len(priced)) if priced else []
+    
+    for (index, order_request, items), ticket_number in zip(priced, ticket_numbers):
+        order = new_order(tenant_id, order_request, items, ticket_number)
+        orders.append(order)
+        results.append({
+            'index': index,
+            'orderId': order.order_id,
+            'ticketNumber': ticket_number,
+            'success': True
+        })
+    
+    results.sort(key=lambda result: result['index'])
+    
+    # Guardar todas las órdenes válidas (bloques de 25)
+    unprocessed = batch_write_items(
+        os.getenv('ORDERS_TABLE'),
+        [sharded_order(order.to_dict()) for order in orders]
+    )
+    unprocessed_ids = {item['orderId'] for item in unprocessed}
+    
+    written = [order for order in orders if order.order_id not in unprocessed_ids]
+    
+    # Índice de búsqueda de las órdenes guardadas (no falla el lote)
+    try:
+        unindexed = batch_write_items(
+            os.getenv('SEARCH_TABLE'),
+            [entry for order in written for entry in index_entries(order.to_dict())]
+        )
+        if unindexed:
+            logger.error(f"{len(unindexed)} search index entries were not written", tenant_id=tenant_id)
+    except Exception as e:
+        logger.error(f"Failed to index orders for search: {str(e)}", tenant_id=tenant_id)
+    
+    # Publicar order.created solo para las órdenes guardadas (bloques de 10)
+    publish_errors = publish_orders_created(tenant_id, [
+        {
+            'orderId': order.order_id,
+            'ticketNumber': order.ticket_number,
+            'customerName': order.customer_name,
+            'totalAmount': order.total_amount,
+            'itemCount': len(order.items)
+        }
+        for order in written
+    ])
+    publish_errors = dict(zip((order.order_id for order in written), publish_errors))
+    
+    for result in results:
+        order_id = result.get('orderId')
+        if not order_id:
+            continue
+        
+        if order_id in unprocessed_ids:
+            result.update({'success': False, 'error': 'WRITE_FAILED'})
+            del result['orderId']
+            continue
+        
+        result['eventPublished'] = publish_errors.get(order_id) is None
+    
+    created = sum(1 for result in results if result['success'])
+    
+    logger.info(
+        f"Batch order creation finished",
+        tenant_id=tenant_id,
+        created=created,
+        failed=len(results) - created
+    )
+    
+    return success_response({
+        'created': created,
+        'failed': len(results) - created,
+        'results': results
+    })
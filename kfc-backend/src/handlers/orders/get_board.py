@@ -0,0 +1,32 @@
+"""Handler para obtener el tablero de cocina del tenant"""
+from ...utils.responses import success_response, not_modified_response, item_etag, etag_matches
+from ...utils.decorators import with_logging, with_error_handling, compress_response, validate_tenant
+from ...models.board import get_board
+from ...utils.logger import logger
+
+
+@with_logging
+@with_error_handling
+@compress_response
+@validate_tenant
+def handler(event, context):
+    """
+    Obtiene el tablero: órdenes abiertas por etapa, cantidad de cada
+    producto a preparar por etapa y contadores por estado
+    
+    GET /tenants/{tenantId}/board
+    
+    Es un único GetItem sobre la vista que mantiene el proyector del
+    stream de Orders. El ETag deriva de la versión del tablero.
+    """
+    tenant_id = event['pathParameters']['tenantId']
+    
+    board = get_board(tenant_id)
+    
+    etag = item_etag(board, tenant_id, 'board')
+    if etag_matches(event, etag):
+        return not_modified_response(etag, {'Cache-Control': 'no-cache'})
+    
+    logger.info(f"Board retrieved", tenant_id=tenant_id, version=board['version'])
+    
+    return success_response(board, headers={'ETag': etag, 'Cache-Control': 'no-cache'})
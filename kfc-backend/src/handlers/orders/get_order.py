@@ -1,31 +1,54 @@
 """Handler para obtener detalle de un pedido"""
-from ...utils.responses import success_response, not_found_response
-from ...utils.decorators import with_logging, with_error_handling, validate_tenant
+from ...utils.responses import success_response, not_found_response, not_modified_response, item_etag, etag_matches
+from ...utils.decorators import with_logging, with_error_handling, compress_response, validate_tenant
 from ...clients.dynamodb import get_order
+from ...models.archive import get_archived_order
+from ...models.trace import public_order
 from ...utils.logger import logger
 
 
 @with_logging
 @with_error_handling
+@compress_response
 @validate_tenant
 def handler(event, context):
     """
     Obtiene el detalle completo de un pedido
     
     GET /tenants/{tenantId}/orders/{orderId}
+    GET /tenants/{tenantId}/orders/{orderId}?include=trace
+    
+    La traza solo se incluye (expandida) con include=trace; si la orden
+    movió entradas viejas a TracesTable se leen con una query adicional.
+    
+    Si la orden no está en la tabla caliente se busca en el archivo de S3
+    (órdenes terminadas antiguas, ver archive_orders).
+    
+    Responde 304 sin body si el If-None-Match coincide con el ETag de la
+    orden (derivado de updatedAt).
     """
     tenant_id = event['pathParameters']['tenantId']
     order_id = event['pathParameters']['orderId']
     
+    query_params = event.get('queryStringParameters') or {}
+    include_trace = 'trace' in (query_params.get('include') or '').split(',')
+    
     logger.info(f"Getting order details", tenant_id=tenant_id, order_id=order_id)
     
-    # Obtener orden de DynamoDB
-    order = get_order(tenant_id, order_id)
+    # Obtener orden de DynamoDB (o del archivo si ya se movió a S3)
+    order = get_order(tenant_id, order_id) or get_archived_order(tenant_id, order_id)
     
     if not order:
         logger.warning(f"Order not found", tenant_id=tenant_id, order_id=order_id)
         return not_found_response(f"Order {order_id} not found")
     
+    etag = item_etag(order, tenant_id, order_id, include_trace)
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    
+    if etag_matches(event, etag):
+        logger.info(f"Order not modified", order_id=order_id)
+        return not_modified_response(etag, {'Cache-Control': 'no-cache'})
+    
     logger.info(f"Order found", order_id=order_id, status=order.get('status'))
     
-    return success_response(order)
+    return success_response(public_order(order, include_trace), headers=headers)
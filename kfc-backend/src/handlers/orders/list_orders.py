@@ -1,18 +1,42 @@
 """Handler para listar pedidos"""
-from ...utils.responses import success_response
-from ...utils.decorators import with_logging, with_error_handling, validate_tenant
-from ...clients.dynamodb import list_orders_by_tenant
+import base64
+import binascii
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+from ...utils import codec
+from ...utils.responses import success_response, error_response, not_modified_response, collection_etag, etag_matches
+from ...utils.decorators import with_logging, with_error_handling, compress_response, validate_tenant
+from ...clients.dynamodb import list_orders_by_tenant, list_orders_updated_since
+from ...models.trace import public_order
 from ...utils.logger import logger
 
 
+# Solapamiento de la sincronización incremental: cubre escrituras con reloj
+# levemente atrasado y la consistencia eventual del índice (los clientes
+# reemplazan por orderId, así que repetir una orden no tiene efecto)
+SYNC_OVERLAP_SECONDS = 2
+
+
 @with_logging
 @with_error_handling
+@compress_response
 @validate_tenant
 def handler(event, context):
     """
     Lista pedidos de un tenant con filtro opcional por estado
     
     GET /tenants/{tenantId}/orders?status=pending&limit=50
+    GET /tenants/{tenantId}/orders?updatedSince=2024-01-01T12:00:00.000000
+    
+    GET /tenants/{tenantId}/orders?cursor=<cursor de la página anterior>
+    
+    Con updatedSince solo se devuelven las órdenes modificadas después del
+    watermark, junto con el nuevo watermark para el siguiente poll. Si
+    hasMore es true, las páginas siguientes se piden con el cursor
+    devuelto (exclusivo, sin el solapamiento del poll).
+    
+    Responde 304 sin body si el If-None-Match coincide con el ETag de la
+    lista (IDs y updatedAt de las órdenes devueltas).
     """
     tenant_id = event['pathParameters']['tenantId']
     
@@ -25,6 +49,11 @@ def handler(event, context):
     if limit > 100:
         limit = 100
     
+    updated_since = query_params.get('updatedSince')
+    cursor = query_params.get('cursor')
+    if updated_since or cursor:
+        return _list_updated_since(tenant_id, updated_since, limit, cursor)
+    
     logger.info(
         f"Listing orders for tenant",
         tenant_id=tenant_id,
@@ -45,11 +74,83 @@ def handler(event, context):
         count=len(orders)
     )
     
+    etag = collection_etag(orders, 'orderId', tenant_id, status, limit)
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    
+    if etag_matches(event, etag):
+        logger.info(f"Order list not modified", tenant_id=tenant_id)
+        return not_modified_response(etag, {'Cache-Control': 'no-cache'})
+    
     return success_response({
-        'orders': orders,
+        'orders': [public_order(order) for order in orders],
         'count': len(orders),
         'limit': limit,
         'filters': {
             'status': status
         } if status else None
+    }, headers=headers)
+
+
+def _encode_cursor(after: str, watermark: str) -> str:
+    position = {'after': after, 'watermark': watermark}
+    return base64.urlsafe_b64encode(codec.dumps_bytes(position)).decode('ascii')
+
+
+def _decode_cursor(cursor: str) -> Tuple[str, str]:
+    """(boardUpdatedAt exclusivo de la página siguiente, watermark del poll)"""
+    try:
+        position = codec.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return str(position['after']), str(position['watermark'])
+    except (binascii.Error, UnicodeEncodeError, codec.DecodeError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def _list_updated_since(tenant_id: str, updated_since: Optional[str], limit: int, cursor: Optional[str] = None):
+    """
+    Sincronización incremental a partir de un watermark
+    
+    El solapamiento solo se aplica a un poll nuevo: una página de
+    continuación empieza justo después del cursor, si no con más de limit
+    órdenes en los segundos solapados se devolvería siempre la misma página.
+    """
+    if cursor:
+        try:
+            query_since, watermark = _decode_cursor(cursor)
+        except ValueError:
+            return error_response("Invalid cursor", status_code=400, error_code='INVALID_CURSOR')
+    else:
+        try:
+            since = datetime.fromisoformat(updated_since.replace('Z', '+00:00'))
+        except ValueError:
+            return error_response(
+                "updatedSince must be an ISO 8601 timestamp",
+                status_code=400,
+                error_code='INVALID_WATERMARK'
+            )
+        
+        # Los timestamps de las órdenes son UTC sin zona
+        if since.tzinfo:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        
+        watermark = since.isoformat()
+        query_since = (since - timedelta(seconds=SYNC_OVERLAP_SECONDS)).isoformat()
+    
+    orders, last_seen, has_more = list_orders_updated_since(tenant_id, query_since, limit)
+    
+    logger.info(
+        f"Found {len(orders)} orders updated since watermark",
+        tenant_id=tenant_id,
+        since=query_since,
+        continuation=bool(cursor),
+        count=len(orders)
+    )
+    
+    watermark = max(watermark, last_seen)
+    
+    return success_response({
+        'orders': [public_order(order) for order in orders],
+        'count': len(orders),
+        'watermark': watermark,
+        'hasMore': has_more,
+        'cursor': _encode_cursor(last_seen, watermark) if has_more else None
     })
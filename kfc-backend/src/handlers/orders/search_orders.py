@@ -0,0 +1,57 @@
+"""Handler para buscar pedidos por teléfono o nombre del cliente"""
+from ...utils.responses import success_response, error_response
+from ...utils.decorators import with_logging, with_error_handling, compress_response, validate_tenant
+from ...models.search import SEARCH_FIELDS, InvalidSearchError, search_orders
+from ...utils.logger import logger
+
+
+@with_logging
+@with_error_handling
+@compress_response
+@validate_tenant
+def handler(event, context):
+    """
+    Busca pedidos por prefijo del teléfono o del nombre del cliente
+    
+    GET /tenants/{tenantId}/orders/search?phone=999-888&limit=20
+    GET /tenants/{tenantId}/orders/search?name=juan%20p&cursor=...
+    
+    El teléfono se compara solo por dígitos (número completo o local) y el
+    nombre sin mayúsculas ni tildes, desde el inicio de cualquier palabra.
+    Devuelve un resumen de cada orden y un cursor para la página siguiente.
+    """
+    tenant_id = event['pathParameters']['tenantId']
+    query_params = event.get('queryStringParameters') or {}
+    
+    fields = [field for field in SEARCH_FIELDS if query_params.get(field)]
+    if len(fields) != 1:
+        return error_response(
+            f"Provide exactly one of: {', '.join(SEARCH_FIELDS)}",
+            status_code=400,
+            error_code='INVALID_SEARCH'
+        )
+    field = fields[0]
+    
+    try:
+        limit = int(query_params.get('limit', 20))
+    except ValueError:
+        return error_response("limit must be an integer", status_code=400, error_code='INVALID_SEARCH')
+    
+    try:
+        orders, cursor = search_orders(
+            tenant_id,
+            field,
+            query_params[field],
+            limit=limit,
+            cursor=query_params.get('cursor')
+        )
+    except InvalidSearchError as e:
+        return error_response(str(e), status_code=400, error_code='INVALID_SEARCH')
+    
+    logger.info(f"Order search returned {len(orders)} results", tenant_id=tenant_id, field=field)
+    
+    return success_response({
+        'orders': orders,
+        'count': len(orders),
+        'cursor': cursor
+    })
@@ -2,17 +2,19 @@
 import uuid
 import os
 from datetime import datetime
-from ...utils.responses import created_response, error_response
-from ...utils.decorators import with_logging, with_error_handling, parse_json_body, validate_tenant
+from ...utils.responses import created_response
+from ...utils.decorators import with_logging, with_error_handling, parse_json_body, validate_tenant_and_body
 from ...utils.validators import CreateProductRequest
 from ...clients.dynamodb import put_item
+from ...models.catalog import bump_catalog_version, build_menu_snapshot
+from ...models.menu import publish_menu_documents
 from ...utils.logger import logger
 
 
 @with_logging
 @with_error_handling
 @parse_json_body
-@validate_tenant
+@validate_tenant_and_body(CreateProductRequest)
 def handler(event, context):
     """
     Crea un producto para un tenant
@@ -29,13 +31,8 @@ def handler(event, context):
     """
     tenant_id = event['pathParameters']['tenantId']
     
-    # Validar request
-    try:
-        body = event.get('parsedBody', {})
-        product_request = CreateProductRequest(**body)
-    except Exception as e:
-        logger.error(f"Validation error: {str(e)}")
-        return error_response(f"Validation error: {str(e)}", status_code=422)
+    # Request validado en paralelo con la consulta del tenant
+    product_request = event['validatedBody']
     
     # Generar ID único para el producto
     product_id = f"prod_{uuid.uuid4().hex[:12]}"
@@ -58,6 +55,15 @@ def handler(event, context):
     table_name = os.getenv('PRODUCTS_TABLE')
     put_item(table_name, product)
     
+    # Nueva versión del catálogo: invalida los menús cacheados, deja
+    # compilado el de esta versión y publica sus documentos en S3
+    try:
+        version = bump_catalog_version(tenant_id)
+        snapshot = build_menu_snapshot(tenant_id, version)
+        publish_menu_documents(tenant_id, snapshot)
+    except Exception as e:
+        logger.error(f"Failed to refresh menu: {str(e)}", tenant_id=tenant_id)
+    
     logger.info(
         f"Product created successfully",
         tenant_id=tenant_id,
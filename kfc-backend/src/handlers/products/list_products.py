@@ -1,10 +1,24 @@
 """Handler para listar productos"""
-from boto3.dynamodb.conditions import Key
-from ...utils.responses import success_response
+from ...utils.responses import (
+    success_response,
+    gzip_json_response,
+    redirect_response,
+    not_modified_response,
+    etag_matches,
+    accepts_encoding
+)
 from ...utils.decorators import with_logging, with_error_handling, validate_tenant
-from ...clients.dynamodb import query_items
+from ...models.catalog import get_menu_snapshot
+from ...models.menu import document_name, document_key, document_etag, get_document, ensure_published
+from ...clients.s3 import presigned_get_url
 from ...utils.logger import logger
-import os
+
+
+# Los clientes revalidan siempre: la versión del catálogo puede cambiar
+MENU_CACHE_CONTROL = 'no-cache'
+
+# Vigencia de la URL prefirmada en el modo redirect
+REDIRECT_URL_TTL_SECONDS = 300
 
 
 @with_logging
@@ -14,7 +28,18 @@ def handler(event, context):
     """
     Lista productos de un tenant
     
-    GET /tenants/{tenantId}/products?category=Buckets&available=true
+    GET /tenants/{tenantId}/products?category=Buckets&available=true&redirect=true
+    
+    Los filtros se resuelven sobre el menú compilado del tenant, cacheado
+    por catalogVersion: mientras el catálogo no cambie no se consulta
+    la tabla de productos.
+    
+    El menú (completo o por categoría, con o sin available=true) se
+    responde como documento pre-serializado y comprimido con un ETag
+    fuerte por versión y codificación (304 si If-None-Match coincide); a
+    los clientes que no aceptan gzip se les responde el JSON sin
+    comprimir, con otro ETag. Con redirect=true se redirige al documento
+    publicado en el bucket de media.
     """
     tenant_id = event['pathParameters']['tenantId']
     
@@ -22,6 +47,7 @@ def handler(event, context):
     query_params = event.get('queryStringParameters') or {}
     category = query_params.get('category')
     available_str = query_params.get('available')
+    redirect = (query_params.get('redirect') or '').lower() == 'true'
     
     logger.info(
         f"Listing products for tenant",
@@ -29,29 +55,52 @@ def handler(event, context):
         category=category
     )
     
-    # Query productos del tenant
-    table_name = os.getenv('PRODUCTS_TABLE')
-    products = query_items(
-        table_name,
-        key_condition_expression=Key('tenantId').eq(tenant_id)
-    )
+    # Menú compilado para la versión actual del catálogo
+    snapshot = get_menu_snapshot(tenant_id, int(event['tenant'].get('catalogVersion', 0)))
+    
+    available = available_str.lower() == 'true' if available_str else None
+    
+    # Los productos no disponibles (uso interno) no tienen documento publicado
+    if available is False:
+        products = snapshot.select(category=category, available=available)
+        return success_response({
+            'products': products,
+            'count': len(products)
+        })
+    
+    # El documento se sirve comprimido solo si el cliente acepta gzip
+    request_headers = {key.lower(): value for key, value in (event.get('headers') or {}).items()}
+    encoding = 'gzip' if accepts_encoding(request_headers.get('accept-encoding'), 'gzip') else 'identity'
+    
+    name = document_name(category, available)
+    etag = document_etag(tenant_id, snapshot.version, name, encoding)
+    headers = {'ETag': etag, 'Cache-Control': MENU_CACHE_CONTROL, 'Vary': 'Accept-Encoding'}
+    
+    if etag_matches(event, etag):
+        logger.info(f"Menu not modified", tenant_id=tenant_id, catalog_version=snapshot.version)
+        return not_modified_response(etag, {'Cache-Control': MENU_CACHE_CONTROL, 'Vary': 'Accept-Encoding'})
     
-    # Filtrar por categoría si se especifica
-    if category:
-        products = [p for p in products if p.get('category') == category]
+    # Solo las categorías existentes tienen documento en S3
+    if redirect and (not category or category in snapshot.categories):
+        ensure_published(tenant_id, snapshot)
+        url = presigned_get_url(
+            document_key(tenant_id, snapshot.version, name),
+            expires_in=REDIRECT_URL_TTL_SECONDS
+        )
+        return redirect_response(url, headers)
     
-    # Filtrar por disponibilidad si se especifica
-    if available_str:
-        available = available_str.lower() == 'true'
-        products = [p for p in products if p.get('available') == available]
+    if encoding == 'identity':
+        products = snapshot.select(category=category, available=available)
+        return success_response({
+            'products': products,
+            'count': len(products)
+        }, headers=headers)
     
     logger.info(
-        f"Found {len(products)} products",
+        f"Serving menu document",
         tenant_id=tenant_id,
-        count=len(products)
+        catalog_version=snapshot.version,
+        document=name
     )
     
-    return success_response({
-        'products': products,
-        'count': len(products)
-    })
+    return gzip_json_response(get_document(tenant_id, snapshot, category, available), headers=headers)
@@ -0,0 +1,43 @@
+"""Handler para el reporte de latencias por etapa del workflow"""
+from ...utils.responses import success_response, error_response
+from ...utils.decorators import with_logging, with_error_handling, compress_response, validate_tenant
+from ...models.rollups import InvalidReportRangeError, report_range, get_latency_buckets
+from ...utils.logger import logger
+
+
+@with_logging
+@with_error_handling
+@compress_response
+@validate_tenant
+def handler(event, context):
+    """
+    Devuelve p50/p90/p99 (segundos) de cada tramo del workflow por ventana
+    
+    GET /tenants/{tenantId}/reports/latency?granularity=hour&from=2026-10-19
+    
+    Tramos: queue (creación a inicio de cocina), kitchen, packaging,
+    delivery y total. Se calculan de los histogramas que acumula el
+    consumidor del stream para las órdenes entregadas (error relativo
+    de ~4%); overall combina todas las ventanas del rango.
+    """
+    tenant_id = event['pathParameters']['tenantId']
+    
+    try:
+        granularity, start, end = report_range(event.get('queryStringParameters') or {})
+    except InvalidReportRangeError as e:
+        return error_response(str(e), status_code=400, error_code='INVALID_RANGE')
+    
+    report = get_latency_buckets(tenant_id, granularity, start, end)
+    
+    logger.info(
+        f"Latency report with {len(report['buckets'])} buckets",
+        tenant_id=tenant_id,
+        granularity=granularity
+    )
+    
+    return success_response({
+        'granularity': granularity,
+        'from': start,
+        'to': end,
+        **report
+    })
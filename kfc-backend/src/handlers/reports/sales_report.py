@@ -0,0 +1,46 @@
+"""Handler para el reporte de ventas por producto (hora o día)"""
+from ...utils.responses import success_response, error_response
+from ...utils.decorators import with_logging, with_error_handling, compress_response, validate_tenant
+from ...models.rollups import InvalidReportRangeError, report_range, get_sales_buckets
+from ...utils.logger import logger
+
+
+@with_logging
+@with_error_handling
+@compress_response
+@validate_tenant
+def handler(event, context):
+    """
+    Devuelve ingresos, órdenes y unidades por producto en un rango de fechas
+    
+    GET /tenants/{tenantId}/reports/sales?granularity=day&from=2026-10-01&to=2026-10-19
+    
+    Lee directamente los buckets pre-agregados por el consumidor del
+    stream (solo órdenes entregadas, por fecha de creación en UTC). to es
+    opcional (por defecto igual a from); granularity es 'hour' o 'day'.
+    """
+    tenant_id = event['pathParameters']['tenantId']
+    
+    try:
+        granularity, start, end = report_range(event.get('queryStringParameters') or {})
+    except InvalidReportRangeError as e:
+        return error_response(str(e), status_code=400, error_code='INVALID_RANGE')
+    
+    buckets = get_sales_buckets(tenant_id, granularity, start, end)
+    
+    logger.info(
+        f"Sales report with {len(buckets)} buckets",
+        tenant_id=tenant_id,
+        granularity=granularity
+    )
+    
+    return success_response({
+        'granularity': granularity,
+        'from': start,
+        'to': end,
+        'buckets': buckets,
+        'totals': {
+            metric: sum(bucket[metric] for bucket in buckets)
+            for metric in ('revenue', 'orders', 'units')
+        }
+    })
@@ -0,0 +1,100 @@
+"""Proyector del tablero de cocina: consume el stream de la tabla Orders"""
+import os
+from typing import Any, Dict, List
+from ...utils import codec
+from ...utils.logger import logger
+from ...utils.decorators import track_invocation
+from ...clients.dynamodb import deserialize_image, tenant_of
+from ...clients.websocket import broadcast_to_tenant
+from ...models.board import get_board, apply_change
+
+
+# Límite de un mensaje WebSocket (128 KB) con margen; sobre esto solo se avisa
+BOARD_PUSH_MAX_BYTES = int(os.getenv('BOARD_PUSH_MAX_BYTES', '100000'))
+
+
+class RecordFailed(Exception):
+    """Un registro del stream no se pudo aplicar (se reintenta desde él)"""
+    
+    def __init__(self, record: Dict[str, Any]):
+        self.record = record
+        super().__init__(record['dynamodb']['SequenceNumber'])
+
+
+def _project_tenant(tenant_id: str, records: List[Dict[str, Any]]) -> None:
+    """Aplicar en orden los registros de un tenant a su tablero y notificar"""
+    changed = 0
+    failed = None
+    for record in records:
+        # apply_change descarta por orden los registros ya aplicados (re-entregas)
+        try:
+            changed += apply_change(
+                tenant_id,
+                deserialize_image(record['dynamodb'].get('OldImage')),
+                deserialize_image(record['dynamodb'].get('NewImage'))
+            )
+        except Exception as e:
+            failed = RecordFailed(record)
+            failed.__cause__ = e
+            break
+    
+    # Lo ya aplicado se notifica aunque un registro posterior falle
+    if changed:
+        logger.info(f"Board updated", tenant_id=tenant_id, records=changed)
+        _push_board(tenant_id)
+    
+    if failed:
+        raise failed
+
+
+def _push_board(tenant_id: str) -> None:
+    """Enviar el tablero a las pantallas del tenant (si no cabe, solo la versión)"""
+    try:
+        board = get_board(tenant_id)
+        message = {'type': 'board_update', 'data': board}
+        if len(codec.dumps_bytes(message)) > BOARD_PUSH_MAX_BYTES:
+            message = {'type': 'board_update', 'data': {'version': board['version'], 'refresh': True}}
+        
+        broadcast_to_tenant(tenant_id, message)
+    except Exception as e:
+        # El tablero ya quedó guardado: los clientes lo leen con GET /board
+        logger.error(f"Failed to push board: {str(e)}", tenant_id=tenant_id)
+
+
+@track_invocation
+def handler(event, context):
+    """
+    Mantiene el tablero por tenant a partir del stream de Orders
+    
+    DynamoDB Streams solo garantiza el orden por item: las órdenes de un
+    tenant (y de una misma partición con sharding) pueden llegar por shards
+    del stream distintos y en paralelo. Cada registro se aplica con una
+    transacción sobre la entrada de su orden y los contadores del tenant;
+    el updatedAt de cada entrada hace que re-procesar un batch no cuente
+    dos veces.
+    
+    Usa ReportBatchItemFailures: si un registro falla se reporta ese
+    registro para que Lambda reintente desde ahí. Los batches descartados
+    tras los reintentos van a BoardProjectorDLQ y boardRebuilder
+    reconstruye el tablero desde la tabla Orders.
+    """
+    records_by_tenant: Dict[str, List[Dict[str, Any]]] = {}
+    for record in event['Records']:
+        # Las particiones con shard (tenantId#N) van al tablero del tenant
+        tenant_id = tenant_of(record['dynamodb']['Keys']['tenantId']['S'])
+        records_by_tenant.setdefault(tenant_id, []).append(record)
+    
+    logger.info(
+        f"Board projector processing {len(event['Records'])} records",
+        tenants=len(records_by_tenant)
+    )
+    
+    failures = []
+    for tenant_id, records in records_by_tenant.items():
+        try:
+            _project_tenant(tenant_id, records)
+        except RecordFailed as e:
+            logger.exception(f"Error projecting board: {str(e.__cause__)}", tenant_id=tenant_id)
+            failures.append({'itemIdentifier': e.record['dynamodb']['SequenceNumber']})
+    
+    return {'batchItemFailures': failures}
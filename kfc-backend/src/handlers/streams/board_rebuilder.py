@@ -0,0 +1,39 @@
+"""Reconstrucción del tablero de cocina desde la tabla Orders"""
+import os
+from ...utils.logger import logger
+from ...utils.decorators import track_invocation
+from ...utils.concurrency import Parallel
+from ...clients.dynamodb import scan_items
+from ...models.board import rebuild_board
+
+
+@track_invocation
+def handler(event, context):
+    """
+    Reconstruye el tablero de los tenants desde los estados abiertos
+    
+    Consume BoardProjectorDLQ: cuando boardProjector agota los reintentos
+    de un batch, Lambda envía ahí solo la ubicación del batch en el stream
+    (shard y números de secuencia), no los registros, así que se
+    reconstruyen los tableros de todos los tenants. Invocado a mano con
+    {"tenantId": "..."} reconstruye solo ese tenant.
+    """
+    if event.get('tenantId'):
+        tenant_ids = [event['tenantId']]
+    else:
+        for record in event.get('Records', []):
+            logger.warning("Board projector batch discarded", batch=record.get('body'))
+        
+        tenants = scan_items(os.getenv('TENANTS_TABLE'), projection_expression='tenantId')
+        tenant_ids = [tenant['tenantId'] for tenant in tenants]
+    
+    stats = {'tenants': len(tenant_ids), 'written': 0, 'removed': 0}
+    
+    # Un fallo lanza la excepción: SQS re-entrega el mensaje y se reintenta
+    for tenant_stats in Parallel(context).map(rebuild_board, tenant_ids):
+        stats['written'] += tenant_stats['written']
+        stats['removed'] += tenant_stats['removed']
+    
+    logger.info("Board rebuild completed", stats=stats)
+    
+    return stats
@@ -0,0 +1,52 @@
+"""Consumidor del stream de Orders que acumula los rollups de ventas"""
+from botocore.exceptions import ClientError
+from ...utils.logger import logger
+from ...utils.decorators import track_invocation
+from ...utils.idempotency import claim_action, stream_key
+from ...clients.dynamodb import deserialize_image, transact_write_items, unshard_order
+from ...models.rollups import is_sale, sale_actions
+
+
+@track_invocation
+def handler(event, context):
+    """
+    Suma cada orden entregada a sus buckets de ventas (hora y día)
+    
+    Los buckets se actualizan con ADD, que no es idempotente: el registro
+    de idempotencia (por eventID del stream) y los ADD se escriben en una
+    misma transacción, así un registro re-entregado se descarta sin
+    contar dos veces.
+    
+    Usa ReportBatchItemFailures: ante un error se reporta ese registro y
+    Lambda reintenta desde ahí (los ya aplicados se descartan).
+    """
+    applied = 0
+    
+    for record in event['Records']:
+        old_image = deserialize_image(record['dynamodb'].get('OldImage'))
+        new_image = unshard_order(deserialize_image(record['dynamodb'].get('NewImage')))
+        
+        if not is_sale(old_image, new_image):
+            continue
+        
+        key = stream_key('sales_rollup', record['eventID'])
+        
+        try:
+            transact_write_items([claim_action(key), *sale_actions(new_image)])
+            applied += 1
+        except ClientError as e:
+            reasons = e.response.get('CancellationReasons') or []
+            if reasons and reasons[0].get('Code') == 'ConditionalCheckFailed':
+                logger.info(f"Skipping duplicate stream record", event_id=record['eventID'])
+                continue
+            
+            logger.exception(
+                f"Error applying sales rollup: {str(e)}",
+                order_id=new_image.get('orderId'),
+                event_id=record['eventID']
+            )
+            return {'batchItemFailures': [{'itemIdentifier': record['dynamodb']['SequenceNumber']}]}
+    
+    logger.info(f"Sales rollup processed {len(event['Records'])} records", applied=applied)
+    
+    return {'batchItemFailures': []}
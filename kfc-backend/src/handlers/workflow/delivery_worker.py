@@ -1,12 +1,14 @@
 """Worker para procesar delivery de pedidos"""
-import json
-import os
-from datetime import datetime
 from ...utils.logger import logger
-from ...clients.dynamodb import update_item, get_order
+from ...utils.decorators import track_invocation
+from ...utils import codec
+from ...clients.dynamodb import transition_order
 from ...clients.eventbridge import publish_order_stage_started
+from ...utils.idempotency import idempotent, message_key
+from ...models.order import ORDER_TRANSITIONS, OrderNotFoundError, InvalidTransitionError
 
 
+@track_invocation
 def handler(event, context):
     """
     Procesa mensajes SQS de la cola de delivery
@@ -18,7 +20,7 @@ def handler(event, context):
     
     for record in event['Records']:
         try:
-            message_body = json.loads(record['body'])
+            message_body = codec.loads(record['body'])
             
             task_token = message_body.get('taskToken')
             order_id = message_body.get('orderId')
@@ -31,39 +33,36 @@ def handler(event, context):
                 tenant_id=tenant_id
             )
             
-            # Actualizar orden a estado 'delivery'
-            table_name = os.getenv('ORDERS_TABLE')
-            
-            order = get_order(tenant_id, order_id)
-            if not order:
-                logger.error(f"Order not found", order_id=order_id)
-                continue
-            
-            current_trace = order.get('trace', [])
-            current_trace.append({
-                'timestamp': datetime.utcnow().isoformat(),
-                'event': 'delivery_started',
-                'status': 'delivery'
-            })
-            
-            update_item(
-                table_name,
-                {'tenantId': tenant_id, 'orderId': order_id},
-                {
-                    'status': 'delivery',
-                    'updatedAt': datetime.utcnow().isoformat(),
-                    'trace': current_trace,
-                    'deliveryTaskToken': task_token
-                }
-            )
-            
-            logger.info(f"Order moved to delivery", order_id=order_id)
-            
-            # Publicar evento
-            publish_order_stage_started(tenant_id, order_id, 'delivery')
-            
-            logger.info(f"Delivery processing initiated", order_id=order_id)
+            # Saltar re-entregas del mismo mensaje antes de escribir o publicar
+            key = message_key(stage, tenant_id, order_id, task_token or record['messageId'])
             
+            with idempotent(key, {'messageId': record['messageId']}) as duplicate:
+                if duplicate:
+                    logger.info(f"Skipping duplicate delivery message", order_id=order_id)
+                    continue
+                
+                # Mover la orden a 'delivery' con una escritura condicional
+                try:
+                    transition_order(
+                        tenant_id,
+                        order_id,
+                        ORDER_TRANSITIONS['delivery_started'],
+                        updates={'deliveryTaskToken': task_token}
+                    )
+                except OrderNotFoundError:
+                    logger.error(f"Order not found", order_id=order_id)
+                    continue
+                except InvalidTransitionError as e:
+                    logger.warning(f"Skipping delivery task: {str(e)}", order_id=order_id)
+                    continue
+                
+                logger.info(f"Order moved to delivery", order_id=order_id)
+                
+                # Publicar evento
+                publish_order_stage_started(tenant_id, order_id, 'delivery')
+                
+                logger.info(f"Delivery processing initiated", order_id=order_id)
+        
         except Exception as e:
             logger.exception(f"Error processing delivery message: {str(e)}")
             raise
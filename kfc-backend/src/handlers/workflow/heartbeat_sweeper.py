@@ -0,0 +1,124 @@
+"""Sweeper programado que envía heartbeats a las tareas en curso de Step Functions"""
+import os
+from boto3.dynamodb.conditions import Key, Attr
+from ...utils.logger import logger
+from ...utils.decorators import track_invocation
+from ...utils.concurrency import Parallel, RateLimiter
+from ...clients.dynamodb import query_orders, scan_items, update_item
+from ...clients.stepfunctions import send_task_heartbeat
+
+
+# Etapas que esperan un task token (waitForTaskToken)
+IN_FLIGHT_STAGES = ['kitchen', 'packaging', 'delivery']
+
+# Tasa máxima de heartbeats por ejecución
+MAX_RPS = float(os.getenv('HEARTBEAT_MAX_RPS', '25'))
+
+# Margen para no exceder el timeout de la Lambda
+DEADLINE_MARGIN_MS = 2000
+
+
+@track_invocation
+def handler(event, context):
+    """
+    Renueva los heartbeats de las órdenes en curso
+    
+    Busca órdenes en kitchen/packaging/delivery con task token guardado
+    y envía send_task_heartbeat en paralelo a una tasa acotada. Los tokens
+    que ya expiraron se eliminan de la orden para no volver a procesarlos.
+    """
+    tenants = scan_items(os.getenv('TENANTS_TABLE'), projection_expression='tenantId')
+    
+    # Buscar tareas en curso por tenant y etapa en paralelo
+    lookups = [
+        (tenant['tenantId'], stage)
+        for tenant in tenants
+        for stage in IN_FLIGHT_STAGES
+    ]
+    
+    io = Parallel(context)
+    
+    tasks = []
+    for found in io.map(lambda lookup: _find_in_flight(*lookup), lookups):
+        tasks.extend(found)
+    
+    logger.info(
+        f"Heartbeat sweep found {len(tasks)} in-flight tasks",
+        tenants=len(tenants),
+        tasks=len(tasks)
+    )
+    
+    stats = {
+        'tenants': len(tenants),
+        'tasks': len(tasks),
+        'refreshed': 0,
+        'expired': 0,
+        'failed': 0,
+        'skipped': 0
+    }
+    
+    limiter = RateLimiter(MAX_RPS)
+    
+    def beat(task):
+        # No iniciar nuevos heartbeats si la Lambda está por expirar
+        if context.get_remaining_time_in_millis() < DEADLINE_MARGIN_MS:
+            return 'skipped'
+        
+        limiter.acquire()
+        return _heartbeat(*task)
+    
+    for outcome in io.map(beat, tasks):
+        stats[outcome] += 1
+    
+    logger.info("Heartbeat sweep completed", stats=stats)
+    
+    return stats
+
+
+def _find_in_flight(tenant_id: str, stage: str):
+    """Órdenes de un tenant con la etapa en curso y task token guardado"""
+    token_field = f'{stage}TaskToken'
+    
+    # Corre dentro de io.map: las particiones del tenant se consultan en secuencia
+    orders = query_orders(
+        tenant_id,
+        lambda partition: partition & Key('status').eq(stage),
+        sort_key='status',
+        filter_expression=Attr(token_field).exists() & Attr(f'{stage}CompletedAt').not_exists(),
+        index_name='status-index',
+        paginate=True,
+        parallel=False,
+        unshard=False
+    )
+    
+    # Se conserva la partition key guardada para limpiar el token en ese item
+    return [
+        (order['tenantId'], order['orderId'], stage, order[token_field])
+        for order in orders
+    ]
+
+
+def _heartbeat(partition_key: str, order_id: str, stage: str, task_token: str) -> str:
+    """Envía un heartbeat y limpia el token si la tarea ya expiró"""
+    try:
+        if send_task_heartbeat(task_token):
+            return 'refreshed'
+    except Exception as e:
+        logger.error(f"Failed to send heartbeat: {str(e)}", order_id=order_id, stage=stage)
+        return 'failed'
+    
+    token_field = f'{stage}TaskToken'
+    
+    try:
+        # Solo borrar si el worker no guardó un token nuevo mientras tanto
+        update_item(
+            os.getenv('ORDERS_TABLE'),
+            {'tenantId': partition_key, 'orderId': order_id},
+            {},
+            condition_expression=Attr(token_field).eq(task_token),
+            remove_fields=[token_field]
+        )
+    except Exception as e:
+        logger.warning(f"Could not clear expired task token: {str(e)}", order_id=order_id)
+    
+    return 'expired'
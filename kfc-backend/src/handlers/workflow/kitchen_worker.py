@@ -1,12 +1,14 @@
 """Worker para procesar pedidos en cocina"""
-import json
-import os
-from datetime import datetime
 from ...utils.logger import logger
-from ...clients.dynamodb import update_item
+from ...utils.decorators import track_invocation
+from ...utils import codec
+from ...clients.dynamodb import transition_order
 from ...clients.eventbridge import publish_order_stage_started
+from ...utils.idempotency import idempotent, message_key
+from ...models.order import ORDER_TRANSITIONS, OrderNotFoundError, InvalidTransitionError
 
 
+@track_invocation
 def handler(event, context):
     """
     Procesa mensajes SQS de la cola de cocina
@@ -26,7 +28,7 @@ def handler(event, context):
     for record in event['Records']:
         try:
             # Parsear mensaje SQS
-            message_body = json.loads(record['body'])
+            message_body = codec.loads(record['body'])
             
             # El cuerpo del mensaje contiene los datos enviados por Step Functions
             task_token = message_body.get('taskToken')
@@ -41,51 +43,40 @@ def handler(event, context):
                 task_token=task_token[:50] if task_token else None
             )
             
-            # Actualizar orden a estado 'kitchen'
-            table_name = os.getenv('ORDERS_TABLE')
-            
-            # Agregar evento al trace
-            trace_event = {
-                'timestamp': datetime.utcnow().isoformat(),
-                'event': 'kitchen_started',
-                'status': 'kitchen',
-                'taskToken': task_token[:20] + '...' if task_token else None
-            }
-            
-            # Obtener trace actual y agregar nuevo evento
-            from ...clients.dynamodb import get_order
-            order = get_order(tenant_id, order_id)
-            
-            if not order:
-                logger.error(f"Order not found", order_id=order_id)
-                continue
-            
-            current_trace = order.get('trace', [])
-            current_trace.append(trace_event)
-            
-            # Actualizar orden
-            update_item(
-                table_name,
-                {'tenantId': tenant_id, 'orderId': order_id},
-                {
-                    'status': 'kitchen',
-                    'updatedAt': datetime.utcnow().isoformat(),
-                    'trace': current_trace,
-                    'kitchenTaskToken': task_token  # Guardar para usar después
-                }
-            )
-            
-            logger.info(f"Order moved to kitchen", order_id=order_id)
-            
-            # Publicar evento de inicio de cocina
-            publish_order_stage_started(tenant_id, order_id, 'kitchen')
-            
-            logger.info(f"Kitchen processing initiated", order_id=order_id)
-            
-            # NOTA: NO enviamos task_success aquí
-            # El workflow quedará en espera hasta que el endpoint
-            # /orders/{orderId}/stages/kitchen/complete sea llamado
+            # Saltar re-entregas del mismo mensaje antes de escribir o publicar
+            key = message_key(stage, tenant_id, order_id, task_token or record['messageId'])
             
+            with idempotent(key, {'messageId': record['messageId']}) as duplicate:
+                if duplicate:
+                    logger.info(f"Skipping duplicate kitchen message", order_id=order_id)
+                    continue
+                
+                # Mover la orden a 'kitchen' con una escritura condicional
+                try:
+                    transition_order(
+                        tenant_id,
+                        order_id,
+                        ORDER_TRANSITIONS['kitchen_started'],
+                        updates={'kitchenTaskToken': task_token}  # Guardar para usar después
+                    )
+                except OrderNotFoundError:
+                    logger.error(f"Order not found", order_id=order_id)
+                    continue
+                except InvalidTransitionError as e:
+                    logger.warning(f"Skipping kitchen task: {str(e)}", order_id=order_id)
+                    continue
+                
+                logger.info(f"Order moved to kitchen", order_id=order_id)
+                
+                # Publicar evento de inicio de cocina
+                publish_order_stage_started(tenant_id, order_id, 'kitchen')
+                
+                logger.info(f"Kitchen processing initiated", order_id=order_id)
+                
+                # NOTA: NO enviamos task_success aquí
+                # El workflow quedará en espera hasta que el endpoint
+                # /orders/{orderId}/stages/kitchen/complete sea llamado
+        
         except Exception as e:
             logger.exception(f"Error processing kitchen message: {str(e)}")
             # La excepción hará que el mensaje sea reintentado o enviado a DLQ
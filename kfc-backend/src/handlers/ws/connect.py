@@ -3,8 +3,10 @@ import os
 from datetime import datetime, timedelta
 from ...clients.dynamodb import put_item
 from ...utils.logger import logger
+from ...utils.decorators import track_invocation
 
 
+@track_invocation
 def handler(event, context):
     """
     Registra una nueva conexión WebSocket
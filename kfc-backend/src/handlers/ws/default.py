@@ -1,7 +1,9 @@
 """Handler para mensajes WebSocket no soportados"""
 from ...utils.logger import logger
+from ...utils.decorators import track_invocation
 
 
+@track_invocation
 def handler(event, context):
     """
     Maneja mensajes WebSocket que no coinciden con ninguna ruta
@@ -3,8 +3,10 @@ import os
 from boto3.dynamodb.conditions import Key
 from ...clients.dynamodb import delete_item, query_items
 from ...utils.logger import logger
+from ...utils.decorators import track_invocation
 
 
+@track_invocation
 def handler(event, context):
     """
     Limpia una conexión WebSocket cuando se desconecta
@@ -4,8 +4,10 @@ from datetime import datetime, timedelta
 from boto3.dynamodb.conditions import Key
 from ...clients.dynamodb import update_item, query_items
 from ...utils.logger import logger
+from ...utils.decorators import track_invocation
 
 
+@track_invocation
 def handler(event, context):
     """
     Renueva el TTL de una conexión WebSocket activa
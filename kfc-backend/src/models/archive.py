@@ -0,0 +1,128 @@
+"""Archivo frío de órdenes terminadas en S3 con un índice por orden en DynamoDB"""
+import gzip
+import os
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from ..utils import codec
+from ..clients.dynamodb import get_item, batch_write_items, batch_delete_items, unshard_order
+from ..clients.s3 import put_object, get_object_range
+from ..utils.logger import logger
+from .trace import trace_chunks, full_trace
+
+
+def archive_key(tenant_id: str, date: str, run_id: str) -> str:
+    """Key de un objeto del archivo, particionado por tenant y fecha de creación"""
+    return f"archive/orders/tenant={tenant_id}/date={date}/{run_id}.ndjson.gz"
+
+
+def encode_orders(orders: List[Dict[str, Any]]) -> Tuple[bytes, List[Tuple[int, int]]]:
+    """
+    Serializar órdenes como NDJSON gzip con un miembro gzip por orden
+    
+    El objeto completo sigue siendo un gzip válido (los miembros se
+    concatenan), y cada orden se puede leer sola con un GET por rango.
+    
+    Returns:
+        (bytes del objeto, [(offset, length)] de cada orden)
+    """
+    body = bytearray()
+    ranges = []
+    for order in orders:
+        member = gzip.compress(codec.dumps_bytes(order) + b'\n', mtime=0)
+        ranges.append((len(body), len(member)))
+        body.extend(member)
+    return bytes(body), ranges
+
+
+def archive_orders(tenant_id: str, orders: List[Dict[str, Any]]) -> List[str]:
+    """
+    Mover órdenes del tenant de la tabla caliente al archivo
+    
+    Orden de escritura: objetos en S3, luego el índice y recién después
+    el borrado, así una orden siempre es legible en alguno de los dos
+    lados. Solo se borran las órdenes cuya entrada de índice se guardó.
+    
+    Las órdenes deben venir con la partition key con la que están
+    guardadas (query_orders con unshard=False): se borran con esa key.
+    La traza movida a TracesTable se incluye en el registro archivado y
+    sus chunks se borran junto con la orden.
+    
+    Returns:
+        IDs de las órdenes archivadas y borradas de la tabla caliente
+    """
+    run_id = f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    archived_at = datetime.utcnow().isoformat()
+    
+    stored_keys = {
+        order['orderId']: {'tenantId': order['tenantId'], 'orderId': order['orderId']}
+        for order in orders
+    }
+    orders = [unshard_order(dict(order)) for order in orders]
+    
+    # La traza se archiva completa: los chunks de TracesTable se borran después
+    chunk_keys = {}
+    for order in orders:
+        chunks = trace_chunks(order)
+        if chunks:
+            order['trace'] = full_trace(order, chunks)
+            del order['traceSpilled']
+            chunk_keys[order['orderId']] = [
+                {'orderKey': chunk['orderKey'], 'seq': chunk['seq']} for chunk in chunks
+            ]
+    
+    by_date: Dict[str, List[Dict[str, Any]]] = {}
+    for order in orders:
+        by_date.setdefault(order['createdAt'][:10], []).append(order)
+    
+    index_entries = []
+    for date, date_orders in by_date.items():
+        key = archive_key(tenant_id, date, run_id)
+        body, ranges = encode_orders(date_orders)
+        put_object(key, body, content_type='application/x-ndjson', content_encoding='gzip')
+        
+        index_entries.extend(
+            {
+                'tenantId': tenant_id,
+                'orderId': order['orderId'],
+                'archiveKey': key,
+                'offset': offset,
+                'length': length,
+                'status': order.get('status'),
+                'createdAt': order.get('createdAt'),
+                'archivedAt': archived_at
+            }
+            for order, (offset, length) in zip(date_orders, ranges)
+        )
+    
+    unindexed = {entry['orderId'] for entry in batch_write_items(os.getenv('ARCHIVE_INDEX_TABLE'), index_entries)}
+    indexed = [entry['orderId'] for entry in index_entries if entry['orderId'] not in unindexed]
+    
+    undeleted = {
+        key['orderId'] for key in batch_delete_items(
+            os.getenv('ORDERS_TABLE'),
+            [stored_keys[order_id] for order_id in indexed]
+        )
+    }
+    
+    moved = [order_id for order_id in indexed if order_id not in undeleted]
+    
+    # TracesTable no tiene TTL: sin esto los chunks quedarían para siempre
+    unremoved = batch_delete_items(
+        os.getenv('TRACES_TABLE'),
+        [key for order_id in moved for key in chunk_keys.get(order_id, [])]
+    )
+    if unremoved:
+        logger.warning(f"Could not delete {len(unremoved)} trace chunks", tenant_id=tenant_id, keys=unremoved)
+    
+    return moved
+
+
+def get_archived_order(tenant_id: str, order_id: str) -> Optional[Dict[str, Any]]:
+    """Leer una orden archivada (GetItem del índice + GET por rango en S3)"""
+    entry = get_item(os.getenv('ARCHIVE_INDEX_TABLE'), {'tenantId': tenant_id, 'orderId': order_id})
+    if not entry:
+        return None
+    
+    member = get_object_range(entry['archiveKey'], int(entry['offset']), int(entry['length']))
+    return codec.loads(gzip.decompress(member))
@@ -0,0 +1,339 @@
+"""Vista materializada del tablero de cocina (proyectada desde el stream de Orders)"""
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+from boto3.dynamodb.conditions import Key, Attr
+from botocore.exceptions import ClientError
+from ..clients.dynamodb import query_items, query_orders, transact_write_items, update_action, update_item
+from .order import OPEN_STATUSES
+
+
+# Item de contadores del tablero: versión y cantidad de órdenes por estado
+BOARD_VIEW_ID = 'board'
+
+# Una entrada por orden abierta (board#<orderId>) y una marca por orden que
+# salió del tablero (closed#<orderId>, con TTL): el tablero no vive en un
+# único item, así que no lo limita el tamaño máximo de un item (400 KB)
+ENTRY_PREFIX = 'board#'
+CLOSED_PREFIX = 'closed#'
+
+# Contadores por estado como atributos de primer nivel (ADD no admite mapas)
+COUNT_PREFIX = 'count#'
+
+# Estados con órdenes visibles en el tablero
+BOARD_STAGES = [status.value for status in OPEN_STATUSES]
+
+# Retención de DynamoDB Streams: un registro re-entregado nunca es más viejo
+STREAM_RETENTION = timedelta(hours=24)
+
+
+def empty_board(tenant_id: str) -> Dict[str, Any]:
+    """Tablero de un tenant sin órdenes proyectadas"""
+    return {
+        'tenantId': tenant_id,
+        'viewId': BOARD_VIEW_ID,
+        'version': 0,
+        'updatedAt': None,
+        'stages': {stage: {} for stage in BOARD_STAGES},
+        'itemCounts': {stage: {} for stage in BOARD_STAGES},
+        'statusCounts': {}
+    }
+
+
+def order_summary(order: Dict[str, Any]) -> Dict[str, Any]:
+    """Datos mínimos de una orden que necesitan las pantallas del tablero"""
+    return {
+        'ticketNumber': order.get('ticketNumber'),
+        'customerName': order.get('customerName'),
+        'createdAt': order.get('createdAt'),
+        'stageCompletedAt': order.get(f"{order.get('status')}CompletedAt"),
+        'items': [
+            {
+                'productId': item.get('productId'),
+                'name': item.get('name'),
+                'quantity': item.get('quantity', 1)
+            }
+            for item in order.get('items', [])
+        ]
+    }
+
+
+def _count_items(orders: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Cantidad total a preparar de cada producto"""
+    counts = {}
+    for order in orders:
+        for item in order['items']:
+            entry = counts.setdefault(item['productId'], {'name': item['name'], 'quantity': 0})
+            entry['quantity'] += item['quantity']
+    return counts
+
+
+def _counters_key(tenant_id: str) -> Dict[str, str]:
+    return {'tenantId': tenant_id, 'viewId': BOARD_VIEW_ID}
+
+
+def _counters_action(tenant_id: str, old_status: Optional[str], new_status: Optional[str]) -> Dict[str, Any]:
+    """Update del item de contadores: mover la orden de estado y subir la versión"""
+    increments = {'version': 1}
+    if old_status != new_status:
+        if old_status:
+            increments[f"{COUNT_PREFIX}{old_status}"] = -1
+        if new_status:
+            increments[f"{COUNT_PREFIX}{new_status}"] = 1
+    
+    return update_action(
+        os.getenv('VIEWS_TABLE'),
+        _counters_key(tenant_id),
+        increments,
+        updates={'updatedAt': datetime.utcnow().isoformat()}
+    )
+
+
+def change_actions(
+    tenant_id: str,
+    old_image: Optional[Dict[str, Any]],
+    new_image: Optional[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Escrituras (transact_write_items) que aplican un cambio de una orden
+    
+    Devuelve [] si el cambio no afecta al tablero. Las condiciones hacen
+    que un registro re-entregado o más viejo que el último aplicado de la
+    orden cancele la transacción: DynamoDB Streams solo garantiza el orden
+    por item, así que se deduplica por orden (updatedAt) y no por posición
+    en el stream.
+    """
+    order = new_image or old_image
+    order_id = order['orderId']
+    old_status = old_image.get('status') if old_image else None
+    new_status = new_image.get('status') if new_image else None
+    updated_at = order.get('updatedAt') or ''
+    
+    was_open = old_status in BOARD_STAGES
+    is_open = new_status in BOARD_STAGES
+    
+    # El borrado de una orden terminada es el archivo a S3: no cambia contadores
+    if not new_image and not was_open:
+        return []
+    
+    if old_status == new_status and (
+        not is_open or order_summary(old_image) == order_summary(new_image)
+    ):
+        return []
+    
+    table_name = os.getenv('VIEWS_TABLE')
+    entry_key = {'tenantId': tenant_id, 'viewId': f"{ENTRY_PREFIX}{order_id}"}
+    closed_key = {'tenantId': tenant_id, 'viewId': f"{CLOSED_PREFIX}{order_id}"}
+    not_newer = 'attribute_not_exists(viewId) OR updatedAt < :updatedAt'
+    
+    if is_open:
+        actions = [
+            {
+                'ConditionCheck': {
+                    'TableName': table_name,
+                    'Key': closed_key,
+                    'ConditionExpression': 'attribute_not_exists(viewId)'
+                }
+            },
+            {
+                'Put': {
+                    'TableName': table_name,
+                    'Item': {
+                        **entry_key,
+                        'orderId': order_id,
+                        'status': new_status,
+                        'updatedAt': updated_at,
+                        'summary': order_summary(new_image)
+                    },
+                    'ConditionExpression': not_newer,
+                    'ExpressionAttributeValues': {':updatedAt': updated_at}
+                }
+            }
+        ]
+    else:
+        actions = [
+            {
+                'Delete': {
+                    'TableName': table_name,
+                    'Key': entry_key,
+                    'ConditionExpression': not_newer,
+                    'ExpressionAttributeValues': {':updatedAt': updated_at}
+                }
+            },
+            {
+                'Put': {
+                    'TableName': table_name,
+                    'Item': {
+                        **closed_key,
+                        'updatedAt': updated_at,
+                        'expiresAt': int(time.time() + STREAM_RETENTION.total_seconds())
+                    },
+                    'ConditionExpression': 'attribute_not_exists(viewId)'
+                }
+            }
+        ]
+    
+    return actions + [_counters_action(tenant_id, old_status, new_status)]
+
+
+def apply_change(
+    tenant_id: str,
+    old_image: Optional[Dict[str, Any]],
+    new_image: Optional[Dict[str, Any]]
+) -> bool:
+    """
+    Aplicar al tablero un cambio de una orden (INSERT, MODIFY o REMOVE)
+    
+    Returns:
+        True si el tablero cambió (False si no lo afecta o ya estaba aplicado)
+    """
+    actions = change_actions(tenant_id, old_image, new_image)
+    if not actions:
+        return False
+    
+    try:
+        transact_write_items(actions)
+    except ClientError as e:
+        reasons = e.response.get('CancellationReasons') or []
+        if any(reason.get('Code') == 'ConditionalCheckFailed' for reason in reasons):
+            return False
+        raise
+    
+    return True
+
+
+def get_board(tenant_id: str) -> Dict[str, Any]:
+    """
+    Leer el tablero del tenant (vacío si todavía no se proyectó nada)
+    
+    Una query por tenant: el item de contadores y las entradas de las
+    órdenes abiertas comparten el prefijo 'board'.
+    """
+    items = query_items(
+        os.getenv('VIEWS_TABLE'),
+        key_condition_expression=Key('tenantId').eq(tenant_id) & Key('viewId').begins_with(BOARD_VIEW_ID),
+        paginate=True
+    )
+    
+    board = empty_board(tenant_id)
+    for item in items:
+        if item['viewId'] == BOARD_VIEW_ID:
+            board['version'] = item.get('version', 0)
+            board['updatedAt'] = item.get('updatedAt')
+            board['statusCounts'] = {
+                field[len(COUNT_PREFIX):]: max(value, 0)
+                for field, value in item.items() if field.startswith(COUNT_PREFIX)
+            }
+        elif item.get('status') in BOARD_STAGES:
+            board['stages'][item['status']][item['orderId']] = item['summary']
+    
+    for stage in BOARD_STAGES:
+        board['itemCounts'][stage] = _count_items(board['stages'][stage].values())
+    
+    return board
+
+
+def rebuild_board(tenant_id: str) -> Dict[str, int]:
+    """
+    Reconstruir las entradas del tablero desde la tabla Orders
+    
+    Se usa cuando el proyector descartó registros del stream. Consulta las
+    órdenes en estados abiertos, re-escribe sus entradas (salvo que el
+    proyector haya aplicado un cambio más nuevo), borra las entradas de
+    órdenes que ya no están abiertas y fija los contadores de los estados
+    abiertos. Los contadores de estados terminales (totales acumulados)
+    no se recalculan.
+    """
+    table_name = os.getenv('VIEWS_TABLE')
+    
+    # Corre dentro de Parallel.map del rebuilder: particiones en secuencia
+    open_orders = {}
+    for stage in BOARD_STAGES:
+        for order in query_orders(
+            tenant_id,
+            lambda partition: partition & Key('status').eq(stage),
+            sort_key='status',
+            index_name='status-index',
+            paginate=True,
+            parallel=False
+        ):
+            open_orders[order['orderId']] = order
+    
+    entries = query_items(
+        table_name,
+        key_condition_expression=Key('tenantId').eq(tenant_id) & Key('viewId').begins_with(ENTRY_PREFIX),
+        paginate=True
+    )
+    
+    stats = {'written': 0, 'removed': 0}
+    
+    for order_id, order in open_orders.items():
+        try:
+            update_item(
+                table_name,
+                {'tenantId': tenant_id, 'viewId': f"{ENTRY_PREFIX}{order_id}"},
+                {
+                    'orderId': order_id,
+                    'status': order['status'],
+                    'updatedAt': order.get('updatedAt') or '',
+                    'summary': order_summary(order)
+                },
+                condition_expression=(
+                    Attr('viewId').not_exists() | Attr('updatedAt').lte(order.get('updatedAt') or '')
+                )
+            )
+            stats['written'] += 1
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+    
+    for entry in entries:
+        if entry['orderId'] in open_orders:
+            continue
+        try:
+            # Solo si el proyector no la actualizó desde la lectura
+            transact_write_items([
+                {
+                    'Delete': {
+                        'TableName': table_name,
+                        'Key': {'tenantId': tenant_id, 'viewId': entry['viewId']},
+                        'ConditionExpression': 'updatedAt = :updatedAt',
+                        'ExpressionAttributeValues': {':updatedAt': entry.get('updatedAt')}
+                    }
+                },
+                {
+                    'Put': {
+                        'TableName': table_name,
+                        'Item': {
+                            'tenantId': tenant_id,
+                            'viewId': f"{CLOSED_PREFIX}{entry['orderId']}",
+                            'updatedAt': entry.get('updatedAt'),
+                            'expiresAt': int(time.time() + STREAM_RETENTION.total_seconds())
+                        }
+                    }
+                }
+            ])
+            stats['removed'] += 1
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'TransactionCanceledException':
+                raise
+    
+    counts = {stage: 0 for stage in BOARD_STAGES}
+    for order in open_orders.values():
+        counts[order['status']] += 1
+    
+    # update_action admite '#' en los nombres de atributo (count#<estado>)
+    transact_write_items([
+        update_action(
+            table_name,
+            _counters_key(tenant_id),
+            {'version': 1},
+            updates={
+                **{f"{COUNT_PREFIX}{stage}": count for stage, count in counts.items()},
+                'updatedAt': datetime.utcnow().isoformat()
+            }
+        )
+    ])
+    
+    return stats
@@ -0,0 +1,212 @@
+"""Catálogo de productos por tenant (precios autoritativos para las órdenes)"""
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from boto3.dynamodb.conditions import Key, Attr
+from ..clients.dynamodb import batch_get_items, query_items, update_item
+
+
+# Tiempo que un producto leído queda en la cache del contenedor
+CATALOG_CACHE_TTL_SECONDS = int(os.getenv('CATALOG_CACHE_TTL_SECONDS', '60'))
+
+
+class CatalogError(Exception):
+    """Items de una orden que no se pueden resolver contra el catálogo"""
+    
+    code = 'CATALOG_ERROR'
+    
+    def __init__(self, message: str, product_ids: List[str]):
+        self.product_ids = product_ids
+        super().__init__(message)
+
+
+class UnknownProductError(CatalogError):
+    """La orden referencia productos que no existen en el catálogo del tenant"""
+    
+    code = 'UNKNOWN_PRODUCT'
+    
+    def __init__(self, product_ids: List[str]):
+        super().__init__(f"Unknown products: {', '.join(product_ids)}", product_ids)
+
+
+class ProductUnavailableError(CatalogError):
+    """La orden referencia productos marcados como no disponibles"""
+    
+    code = 'PRODUCT_UNAVAILABLE'
+    
+    def __init__(self, product_ids: List[str]):
+        super().__init__(f"Products not available: {', '.join(product_ids)}", product_ids)
+
+
+# Cache (tenantId, productId) -> (expiración, producto)
+_cache: Dict[Tuple[str, str], Tuple[float, Dict[str, Any]]] = {}
+_cache_lock = threading.Lock()
+
+
+def get_products(tenant_id: str, product_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Obtener productos del catálogo por ID
+    
+    Los productos en cache se devuelven sin ir a DynamoDB; el resto se lee
+    con un único BatchGetItem. Los IDs inexistentes no aparecen en el
+    resultado (no se cachean, para no rechazar productos recién creados).
+    """
+    now = time.monotonic()
+    products = {}
+    missing = []
+    
+    with _cache_lock:
+        for product_id in dict.fromkeys(product_ids):
+            entry = _cache.get((tenant_id, product_id))
+            if entry and entry[0] > now:
+                products[product_id] = entry[1]
+            else:
+                missing.append(product_id)
+    
+    if missing:
+        items = batch_get_items(
+            os.getenv('PRODUCTS_TABLE'),
+            [{'tenantId': tenant_id, 'productId': product_id} for product_id in missing]
+        )
+        
+        expires = time.monotonic() + CATALOG_CACHE_TTL_SECONDS
+        with _cache_lock:
+            for product in items:
+                _cache[(tenant_id, product['productId'])] = (expires, product)
+                products[product['productId']] = product
+    
+    return products
+
+
+def price_items(order_items: Iterable[Any], products: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Construir los items de una orden con nombre y precio del catálogo
+    
+    Raises:
+        UnknownProductError: Algún producto no existe
+        ProductUnavailableError: Algún producto no está disponible
+    """
+    order_items = list(order_items)
+    
+    unknown = [item.productId for item in order_items if item.productId not in products]
+    if unknown:
+        raise UnknownProductError(unknown)
+    
+    unavailable = [
+        item.productId for item in order_items
+        if not products[item.productId].get('available', True)
+    ]
+    if unavailable:
+        raise ProductUnavailableError(unavailable)
+    
+    return [
+        {
+            'productId': item.productId,
+            'quantity': item.quantity,
+            'price': products[item.productId]['price'],
+            'name': products[item.productId]['name']
+        }
+        for item in order_items
+    ]
+
+
+def resolve_items(tenant_id: str, order_items: Iterable[Any]) -> List[Dict[str, Any]]:
+    """Resolver los items de una orden contra el catálogo del tenant"""
+    order_items = list(order_items)
+    products = get_products(tenant_id, (item.productId for item in order_items))
+    return price_items(order_items, products)
+
+
+class MenuSnapshot:
+    """
+    Menú compilado de un tenant para una versión del catálogo
+    
+    Los productos se indexan por posición: cada categoría y la
+    disponibilidad se guardan como bitmaps (int), así que un filtro es un
+    AND de bitmaps y recorrer solo los bits del resultado.
+    """
+    
+    def __init__(self, version: int, products: List[Dict[str, Any]]):
+        self.version = version
+        self.products = products
+        self.all_mask = (1 << len(products)) - 1
+        self.available_mask = 0
+        self.category_masks: Dict[str, int] = {}
+        
+        for position, product in enumerate(products):
+            bit = 1 << position
+            if product.get('available', True):
+                self.available_mask |= bit
+            category = product.get('category')
+            self.category_masks[category] = self.category_masks.get(category, 0) | bit
+    
+    @property
+    def categories(self) -> List[str]:
+        """Categorías presentes en el menú"""
+        return sorted(category for category in self.category_masks if category)
+    
+    def select(self, category: Optional[str] = None, available: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """Productos que cumplen los filtros, en el orden del catálogo"""
+        mask = self.category_masks.get(category, 0) if category else self.all_mask
+        
+        if available is True:
+            mask &= self.available_mask
+        elif available is False:
+            mask &= ~self.available_mask
+        
+        selected = []
+        while mask:
+            lowest = mask & -mask
+            selected.append(self.products[lowest.bit_length() - 1])
+            mask ^= lowest
+        
+        return selected
+
+
+# Último snapshot compilado por tenant: tenantId -> MenuSnapshot
+_snapshots: Dict[str, MenuSnapshot] = {}
+
+
+def build_menu_snapshot(tenant_id: str, version: int) -> MenuSnapshot:
+    """Compilar el menú del tenant (lectura consistente) y dejarlo en cache"""
+    products = query_items(
+        os.getenv('PRODUCTS_TABLE'),
+        key_condition_expression=Key('tenantId').eq(tenant_id),
+        paginate=True,
+        consistent_read=True
+    )
+    
+    snapshot = MenuSnapshot(version, products)
+    
+    with _cache_lock:
+        current = _snapshots.get(tenant_id)
+        if not current or current.version <= version:
+            _snapshots[tenant_id] = snapshot
+    
+    return snapshot
+
+
+def get_menu_snapshot(tenant_id: str, version: int) -> MenuSnapshot:
+    """
+    Menú del tenant para la versión indicada (catalogVersion del tenant)
+    
+    Sin consultas a DynamoDB mientras la versión no cambie.
+    """
+    snapshot = _snapshots.get(tenant_id)
+    if snapshot and snapshot.version == version:
+        return snapshot
+    
+    return build_menu_snapshot(tenant_id, version)
+
+
+def bump_catalog_version(tenant_id: str) -> int:
+    """Incrementar la versión del catálogo del tenant (invalida los snapshots)"""
+    tenant = update_item(
+        os.getenv('TENANTS_TABLE'),
+        {'tenantId': tenant_id},
+        {},
+        condition_expression=Attr('tenantId').exists(),
+        increments={'catalogVersion': 1}
+    )
+    return int(tenant['catalogVersion'])
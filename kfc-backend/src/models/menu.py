@@ -0,0 +1,129 @@
+"""Documentos estáticos del menú: JSON pre-serializado y comprimido por versión del catálogo"""
+import gzip
+import threading
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+from ..clients.s3 import put_object, object_exists
+from ..utils.concurrency import Parallel
+from ..utils import codec
+from ..utils.responses import compute_etag
+from .catalog import MenuSnapshot
+
+
+# Los documentos son inmutables: cada versión del catálogo tiene su propia key
+DOCUMENT_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Documentos ya renderizados: tenantId -> (versión, {nombre: bytes gzip})
+_documents: Dict[str, Tuple[int, Dict[str, bytes]]] = {}
+_documents_lock = threading.Lock()
+
+# Versiones que ya se verificó que están publicadas en S3
+_published = set()
+
+
+def document_name(category: Optional[str] = None, available: Optional[bool] = None) -> str:
+    """Nombre del documento para un filtro (available=False no se publica)"""
+    name = f"category-{quote(category, safe='')}" if category else 'all'
+    return f"{name}-available" if available else name
+
+
+def document_key(tenant_id: str, version: int, name: str) -> str:
+    """Key del documento en el bucket de media"""
+    return f"menus/{tenant_id}/v{version}/{name}.json.gz"
+
+
+def document_etag(tenant_id: str, version: int, name: str, encoding: str = 'gzip') -> str:
+    """
+    ETag fuerte: el contenido de un documento solo cambia con la versión
+    
+    Cada codificación (gzip o identity) es una representación distinta y
+    tiene su propio ETag.
+    """
+    return compute_etag('menu', tenant_id, version, name, encoding)
+
+
+def render_document(snapshot: MenuSnapshot, category: Optional[str], available: Optional[bool]) -> bytes:
+    """Serializar y comprimir el resultado de un filtro (mismo body que list_products)"""
+    products = snapshot.select(category=category, available=available)
+    body = codec.dumps_bytes({
+        'success': True,
+        'data': {
+            'products': products,
+            'count': len(products)
+        }
+    })
+    # mtime fijo para que el mismo menú produzca siempre los mismos bytes
+    return gzip.compress(body, mtime=0)
+
+
+def get_document(
+    tenant_id: str,
+    snapshot: MenuSnapshot,
+    category: Optional[str],
+    available: Optional[bool]
+) -> bytes:
+    """Documento comprimido del filtro, renderizado una vez por versión y contenedor"""
+    name = document_name(category, available)
+    
+    with _documents_lock:
+        version, documents = _documents.get(tenant_id, (None, {}))
+        if version == snapshot.version and name in documents:
+            return documents[name]
+    
+    document = render_document(snapshot, category, available)
+    
+    with _documents_lock:
+        version, documents = _documents.get(tenant_id, (None, {}))
+        if version != snapshot.version:
+            documents = {}
+            _documents[tenant_id] = (snapshot.version, documents)
+        documents[name] = document
+    
+    return document
+
+
+def publish_menu_documents(tenant_id: str, snapshot: MenuSnapshot) -> List[str]:
+    """
+    Publicar en S3 los documentos de una versión del menú
+    
+    Un documento por tenant y uno por categoría, con todos los productos
+    y solo los disponibles.
+    
+    Returns:
+        Keys publicadas
+    """
+    filters = [
+        (category, available)
+        for category in [None] + snapshot.categories
+        for available in (None, True)
+    ]
+    
+    def publish(document_filter):
+        category, available = document_filter
+        key = document_key(tenant_id, snapshot.version, document_name(category, available))
+        put_object(
+            key,
+            get_document(tenant_id, snapshot, category, available),
+            content_type='application/json',
+            content_encoding='gzip',
+            cache_control=DOCUMENT_CACHE_CONTROL,
+            metadata={'catalog-version': str(snapshot.version)}
+        )
+        return key
+    
+    keys = Parallel().map(publish, filters)
+    _published.add((tenant_id, snapshot.version))
+    
+    return keys
+
+
+def ensure_published(tenant_id: str, snapshot: MenuSnapshot):
+    """Publicar la versión si todavía no está en S3 (p.ej. catálogos previos)"""
+    if (tenant_id, snapshot.version) in _published:
+        return
+    
+    if object_exists(document_key(tenant_id, snapshot.version, document_name())):
+        _published.add((tenant_id, snapshot.version))
+        return
+    
+    publish_menu_documents(tenant_id, snapshot)
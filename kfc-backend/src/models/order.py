@@ -1,15 +1,293 @@
 """Modelo de datos para Orders"""
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+import os
+import uuid
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Iterable
+from boto3.dynamodb.conditions import Attr
 from ..utils.validators import OrderStatus
 
 
+# Etapas del workflow que se completan desde la UI
+WORKFLOW_STAGES = ['kitchen', 'packaging', 'delivery']
+
+
+class OrderNotFoundError(Exception):
+    """La orden no existe"""
+    
+    def __init__(self, order_id: str):
+        super().__init__(f"Order {order_id} not found")
+        self.order_id = order_id
+
+
+class InvalidTransitionError(Exception):
+    """La orden no está en un estado que permita la transición"""
+    
+    def __init__(
+        self,
+        transition: str,
+        current_status: Optional[str] = None,
+        duplicate: bool = False,
+        order: Optional[Dict[str, Any]] = None
+    ):
+        super().__init__(
+            f"Transition {transition} already applied" if duplicate
+            else f"Transition {transition} not allowed from status {current_status}"
+        )
+        self.transition = transition
+        self.current_status = current_status
+        self.duplicate = duplicate
+        # Orden tal como estaba al rechazar la escritura (si se conoce)
+        self.order = order
+
+
+class OrderTransition:
+    """
+    Transición permitida en la máquina de estados de una orden
+    
+    La condición se compila una sola vez a un ConditionExpression para que
+    cada cambio de estado sea una única escritura condicional en DynamoDB.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        from_statuses: Iterable[OrderStatus],
+        to_status: OrderStatus,
+        requires: Iterable[str] = (),
+        forbids: Iterable[str] = (),
+        marks: Optional[str] = None
+    ):
+        self.name = name
+        self.from_statuses = frozenset(from_statuses)
+        self.to_status = to_status
+        self.requires = tuple(requires)
+        # Una etapa ya marcada como completada no se puede repetir
+        self.forbids = tuple(forbids) + ((marks,) if marks else ())
+        self.marks = marks
+        self.condition = self._compile()
+    
+    def _compile(self):
+        """Compilar la transición a una condición de DynamoDB"""
+        condition = Attr('orderId').exists() & Attr('status').is_in(
+            sorted(status.value for status in self.from_statuses)
+        )
+        for flag in self.requires:
+            condition = condition & Attr(flag).exists()
+        for flag in self.forbids:
+            condition = condition & Attr(flag).not_exists()
+        return condition
+    
+    def updates(self, timestamp: str) -> Dict[str, Any]:
+        """Atributos a escribir cuando se aplica la transición"""
+        updates = {
+            'status': self.to_status.value,
+            'updatedAt': timestamp,
+            'boardUpdatedAt': timestamp
+        }
+        if self.marks:
+            updates[self.marks] = timestamp
+        return updates
+
+
+OPEN_STATUSES = [
+    OrderStatus.PENDING,
+    OrderStatus.KITCHEN,
+    OrderStatus.PACKAGING,
+    OrderStatus.DELIVERY
+]
+
+# Estados finales: la orden ya no cambia y puede archivarse
+TERMINAL_STATUSES = [
+    OrderStatus.DELIVERED,
+    OrderStatus.FAILED,
+    OrderStatus.CANCELLED
+]
+
+# Tabla de transiciones del workflow. Los workers pueden volver a entrar a
+# su etapa mientras no esté completada (reintentos de Step Functions con un
+# task token nuevo); completar una etapa solo es posible una vez.
+ORDER_TRANSITIONS: Dict[str, OrderTransition] = {
+    transition.name: transition
+    for transition in [
+        OrderTransition(
+            'kitchen_started',
+            [OrderStatus.PENDING, OrderStatus.KITCHEN],
+            OrderStatus.KITCHEN,
+            forbids=['kitchenCompletedAt']
+        ),
+        OrderTransition(
+            'kitchen_completed',
+            [OrderStatus.KITCHEN],
+            OrderStatus.KITCHEN,
+            marks='kitchenCompletedAt'
+        ),
+        OrderTransition(
+            'packaging_started',
+            [OrderStatus.KITCHEN, OrderStatus.PACKAGING],
+            OrderStatus.PACKAGING,
+            requires=['kitchenCompletedAt'],
+            forbids=['packagingCompletedAt']
+        ),
+        OrderTransition(
+            'packaging_completed',
+            [OrderStatus.PACKAGING],
+            OrderStatus.PACKAGING,
+            marks='packagingCompletedAt'
+        ),
+        OrderTransition(
+            'delivery_started',
+            [OrderStatus.PACKAGING, OrderStatus.DELIVERY],
+            OrderStatus.DELIVERY,
+            requires=['packagingCompletedAt'],
+            forbids=['deliveryCompletedAt']
+        ),
+        OrderTransition(
+            'delivery_completed',
+            [OrderStatus.DELIVERY],
+            OrderStatus.DELIVERED,
+            marks='deliveryCompletedAt'
+        ),
+        OrderTransition(
+            'order_failed',
+            OPEN_STATUSES,
+            OrderStatus.FAILED
+        ),
+        OrderTransition(
+            'order_cancelled',
+            [OrderStatus.PENDING, OrderStatus.KITCHEN],
+            OrderStatus.CANCELLED
+        )
+    ]
+}
+
+# Estados destino alcanzables desde cada estado
+STATUS_TRANSITIONS: Dict[OrderStatus, frozenset] = {
+    status: frozenset(
+        transition.to_status
+        for transition in ORDER_TRANSITIONS.values()
+        if status in transition.from_statuses
+    )
+    for status in OrderStatus
+}
+
+
+# Códigos de los eventos de la traza. Una entrada compacta es
+# [código, epoch en ms] o [código, epoch en ms, {campos extra}]; los eventos
+# sin código (p.ej. status_changed_*) se guardan con su nombre.
+# Los códigos se persisten: no reutilizar ni renumerar.
+TRACE_EVENT_CODES = {
+    'order_created': 1,
+    'kitchen_started': 2,
+    'kitchen_completed': 3,
+    'packaging_started': 4,
+    'packaging_completed': 5,
+    'delivery_started': 6,
+    'delivery_completed': 7,
+    'order_failed': 8,
+    'order_cancelled': 9
+}
+
+TRACE_EVENT_NAMES = {code: name for name, code in TRACE_EVENT_CODES.items()}
+
+# Entradas que se mantienen en el item de la orden; al superar el máximo
+# las más viejas se mueven a TracesTable dejando solo la cola
+TRACE_INLINE_MAX = int(os.getenv('TRACE_INLINE_MAX', '16'))
+TRACE_INLINE_TAIL = int(os.getenv('TRACE_INLINE_TAIL', '8'))
+
+
+def trace_entry(event: str, timestamp: datetime, **fields: Any) -> List[Any]:
+    """Entrada compacta de la traza (timestamp UTC sin zona; se omiten campos None)"""
+    epoch_ms = int(timestamp.replace(tzinfo=timezone.utc).timestamp() * 1000)
+    extra = {name: value for name, value in fields.items() if value is not None}
+    entry = [TRACE_EVENT_CODES.get(event, event), epoch_ms]
+    return entry + [extra] if extra else entry
+
+
+def _event_status(event: str) -> Optional[str]:
+    """Estado en el que deja la orden un evento con código"""
+    if event == 'order_created':
+        return OrderStatus.PENDING.value
+    transition = ORDER_TRANSITIONS.get(event)
+    return transition.to_status.value if transition else None
+
+
+def expand_trace_entry(entry: Any) -> Dict[str, Any]:
+    """
+    Entrada de la traza en formato legible:
+    {'timestamp': ISO, 'event': nombre, 'status': ..., **campos extra}
+    
+    Las entradas en el formato anterior (dict) se devuelven sin cambios.
+    """
+    if isinstance(entry, dict):
+        return entry
+    
+    code, epoch_ms, *extra = entry
+    event = code if isinstance(code, str) else TRACE_EVENT_NAMES.get(int(code), str(code))
+    timestamp = datetime.fromtimestamp(int(epoch_ms) / 1000, tz=timezone.utc).replace(tzinfo=None)
+    
+    expanded = {'timestamp': timestamp.isoformat(), 'event': event}
+    status = _event_status(event)
+    if status:
+        expanded['status'] = status
+    if extra:
+        expanded.update(extra[0])
+    return expanded
+
+
+# Tramos medidos sobre la traza de una orden: nombre -> (evento inicial, evento final)
+LATENCY_SPANS = {
+    'queue': ('order_created', 'kitchen_started'),
+    'kitchen': ('kitchen_started', 'kitchen_completed'),
+    'packaging': ('packaging_started', 'packaging_completed'),
+    'delivery': ('delivery_started', 'delivery_completed'),
+    'total': ('order_created', 'delivery_completed')
+}
+
+
+def trace_durations(order: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Duración en segundos de cada tramo de la orden
+    
+    Se usa la primera ocurrencia de cada evento (un reintento de una etapa
+    no reinicia su inicio). La creación y los fines de etapa salen de los
+    atributos de la orden, porque el inicio de la traza puede estar en
+    TracesTable; los inicios de etapa salen de la traza inline.
+    """
+    first_seen = {'order_created': order.get('createdAt')}
+    for stage in WORKFLOW_STAGES:
+        first_seen[f'{stage}_completed'] = order.get(f'{stage}CompletedAt')
+    
+    for entry in order.get('trace', []):
+        trace_event = expand_trace_entry(entry)
+        if not first_seen.get(trace_event['event']):
+            first_seen[trace_event['event']] = trace_event['timestamp']
+    
+    durations = {}
+    for span, (start_event, end_event) in LATENCY_SPANS.items():
+        if first_seen.get(start_event) and first_seen.get(end_event):
+            elapsed = (
+                datetime.fromisoformat(first_seen[end_event])
+                - datetime.fromisoformat(first_seen[start_event])
+            )
+            durations[span] = elapsed.total_seconds()
+    
+    return durations
+
+
+def stage_transition(stage: str, phase: str) -> Optional[OrderTransition]:
+    """Transición para iniciar ('started') o completar ('completed') una etapa"""
+    if stage not in WORKFLOW_STAGES:
+        return None
+    return ORDER_TRANSITIONS.get(f'{stage}_{phase}')
+
+
 class Order:
     """Clase para gestionar órdenes"""
     
     def __init__(self, order_data: Dict[str, Any]):
         self.tenant_id = order_data.get('tenantId')
         self.order_id = order_data.get('orderId')
+        self.ticket_number = order_data.get('ticketNumber')
         self.status = order_data.get('status', OrderStatus.PENDING.value)
         self.items = order_data.get('items', [])
         self.customer_name = order_data.get('customerName')
@@ -26,6 +304,7 @@ class Order:
         return {
             'tenantId': self.tenant_id,
             'orderId': self.order_id,
+            'ticketNumber': self.ticket_number,
             'status': self.status,
             'items': self.items,
             'customerName': self.customer_name,
@@ -35,25 +314,26 @@ class Order:
             'totalAmount': self.total_amount,
             'createdAt': self.created_at,
             'updatedAt': self.updated_at,
+            # Clave del índice board-updated-index (sincronización incremental)
+            'boardUpdatedAt': self.updated_at,
             'trace': self.trace
         }
     
     def add_trace_event(self, event_type: str, details: str = None) -> None:
-        """Agregar evento al historial de trazabilidad"""
-        trace_event = {
-            'timestamp': datetime.utcnow().isoformat(),
-            'event': event_type,
-            'status': self.status
-        }
-        if details:
-            trace_event['details'] = details
+        """Agregar evento (compacto) al historial de trazabilidad"""
+        now = datetime.utcnow()
+        # Los eventos sin código no permiten derivar el estado al expandir
+        status = None if event_type in TRACE_EVENT_CODES else self.status
         
-        self.trace.append(trace_event)
-        self.updated_at = datetime.utcnow().isoformat()
+        self.trace.append(trace_entry(event_type, now, status=status, details=details or None))
+        self.updated_at = now.isoformat()
     
     def update_status(self, new_status: str, details: str = None) -> None:
-        """Actualizar estado de la orden"""
+        """Actualizar estado de la orden validando la máquina de estados"""
         old_status = self.status
+        if new_status != old_status and OrderStatus(new_status) not in STATUS_TRANSITIONS[OrderStatus(old_status)]:
+            raise InvalidTransitionError(f'{old_status}_to_{new_status}', old_status)
+        
         self.status = new_status
         self.add_trace_event(
             f'status_changed_{old_status}_to_{new_status}',
@@ -68,3 +348,40 @@ class Order:
         )
         self.total_amount = round(total, 2)
         return self.total_amount
+
+
+def new_order(
+    tenant_id: str,
+    order_request: Any,
+    items: List[Dict[str, Any]],
+    ticket_number: Optional[int] = None
+) -> Order:
+    """
+    Construir una orden nueva a partir de un CreateOrderRequest validado
+    
+    items son los items ya resueltos contra el catálogo (precio y nombre
+    autoritativos, ver models.catalog.resolve_items). ticket_number es el
+    número que se canta en el mostrador (ver models.tickets). Genera el
+    orderId, calcula el total y registra el evento de creación.
+    """
+    now = datetime.utcnow().isoformat()
+    
+    order = Order({
+        'tenantId': tenant_id,
+        'orderId': f"order_{uuid.uuid4().hex[:16]}",
+        'ticketNumber': ticket_number,
+        'status': OrderStatus.PENDING.value,
+        'items': items,
+        'customerName': order_request.customerName,
+        'customerPhone': order_request.customerPhone,
+        'deliveryAddress': order_request.deliveryAddress,
+        'notes': order_request.notes,
+        'createdAt': now,
+        'updatedAt': now,
+        'trace': []
+    })
+    
+    order.calculate_total()
+    order.add_trace_event('order_created', f'Order created by {order_request.customerName}')
+    
+    return order
@@ -0,0 +1,192 @@
+"""Rollups de ventas y latencias por tenant en buckets por hora y por día"""
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from boto3.dynamodb.conditions import Key
+from ..clients.dynamodb import query_items, update_action
+from ..utils.validators import OrderStatus
+from ..utils.histogram import LogHistogram, bucket_index
+from .order import LATENCY_SPANS, trace_durations
+
+
+# Prefijo del sort key de cada granularidad: H#2026-10-19T14, D#2026-10-19
+GRANULARITIES = {
+    'hour': ('H', 13),
+    'day': ('D', 10)
+}
+
+# Rango máximo de un reporte por granularidad (acota la cantidad de buckets)
+MAX_RANGE_DAYS = {
+    'hour': 31,
+    'day': 366
+}
+
+PRODUCT_PREFIX = 'product#'
+
+# Conteos del histograma de cada tramo: latency#<tramo>#<índice de bucket>
+LATENCY_PREFIX = 'latency#'
+
+
+class InvalidReportRangeError(ValueError):
+    """Parámetros de rango de un reporte inválidos"""
+
+
+def report_range(query_params: Dict[str, Any]) -> Tuple[str, str, str]:
+    """
+    Validar granularity, from y to de un reporte (to por defecto igual a from)
+    
+    Raises:
+        InvalidReportRangeError: Granularidad desconocida, fechas inválidas
+            o rango fuera del máximo permitido
+    """
+    granularity = query_params.get('granularity', 'day')
+    start = query_params.get('from')
+    end = query_params.get('to') or start
+    
+    if granularity not in GRANULARITIES:
+        raise InvalidReportRangeError(f"granularity must be one of: {', '.join(GRANULARITIES)}")
+    
+    try:
+        start_date = datetime.strptime(start or '', '%Y-%m-%d')
+        end_date = datetime.strptime(end or '', '%Y-%m-%d')
+    except ValueError:
+        raise InvalidReportRangeError("from and to must be dates in YYYY-MM-DD format")
+    
+    if end_date < start_date or end_date - start_date >= timedelta(days=MAX_RANGE_DAYS[granularity]):
+        raise InvalidReportRangeError(
+            f"Range must be between 1 and {MAX_RANGE_DAYS[granularity]} days for granularity {granularity}"
+        )
+    
+    return granularity, start, end
+
+
+def bucket_id(granularity: str, timestamp: str) -> str:
+    """Bucket de un timestamp ISO (UTC) para la granularidad"""
+    prefix, length = GRANULARITIES[granularity]
+    return f"{prefix}#{timestamp[:length]}"
+
+
+def is_sale(old_image: Optional[Dict[str, Any]], new_image: Optional[Dict[str, Any]]) -> bool:
+    """Una orden cuenta como venta cuando pasa a entregada"""
+    delivered = OrderStatus.DELIVERED.value
+    return bool(new_image) and new_image.get('status') == delivered and (
+        not old_image or old_image.get('status') != delivered
+    )
+
+
+def sale_actions(order: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Updates (ADD) de los buckets de la orden, para transact_write_items
+    
+    La venta se imputa a la hora y el día de creación de la orden. En el
+    mismo update se suman las duraciones de sus tramos (traza) a los
+    histogramas de latencia del bucket.
+    """
+    increments = {
+        'revenue': order.get('totalAmount', 0),
+        'orders': 1,
+        'units': 0
+    }
+    names = {}
+    
+    for item in order.get('items', []):
+        product = f"{PRODUCT_PREFIX}{item['productId']}"
+        quantity = item.get('quantity', 1)
+        increments['units'] += quantity
+        increments[f"{product}#quantity"] = increments.get(f"{product}#quantity", 0) + quantity
+        increments[f"{product}#revenue"] = (
+            increments.get(f"{product}#revenue", 0) + item.get('price', 0) * quantity
+        )
+        names[f"{product}#name"] = item.get('name')
+    
+    for span, seconds in trace_durations(order).items():
+        increments[f"{LATENCY_PREFIX}{span}#{bucket_index(seconds)}"] = 1
+    
+    return [
+        update_action(
+            os.getenv('ROLLUPS_TABLE'),
+            {'tenantId': order['tenantId'], 'bucket': bucket_id(granularity, order['createdAt'])},
+            increments,
+            updates={'granularity': granularity, **names}
+        )
+        for granularity in GRANULARITIES
+    ]
+
+
+def bucket_summary(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Convertir un item de rollup a la forma del reporte"""
+    products = {}
+    for field, value in item.items():
+        if not field.startswith(PRODUCT_PREFIX):
+            continue
+        product_id, _, metric = field[len(PRODUCT_PREFIX):].rpartition('#')
+        products.setdefault(product_id, {'productId': product_id})[metric] = value
+    
+    return {
+        'bucket': item['bucket'].split('#', 1)[1],
+        'revenue': item.get('revenue', 0),
+        'orders': item.get('orders', 0),
+        'units': item.get('units', 0),
+        'products': sorted(products.values(), key=lambda product: product.get('revenue', 0), reverse=True)
+    }
+
+
+def bucket_histograms(item: Dict[str, Any]) -> Dict[str, LogHistogram]:
+    """Histogramas de latencia por tramo guardados en un item de rollup"""
+    histograms = {}
+    for field, value in item.items():
+        if not field.startswith(LATENCY_PREFIX):
+            continue
+        span, _, index = field[len(LATENCY_PREFIX):].rpartition('#')
+        histograms.setdefault(span, LogHistogram()).counts[int(index)] = int(value)
+    return histograms
+
+
+def _query_buckets(tenant_id: str, granularity: str, start: str, end: str) -> List[Dict[str, Any]]:
+    """
+    Items de rollup entre start y end (fechas YYYY-MM-DD, inclusive)
+    
+    Una sola query por rango: el costo depende de la cantidad de buckets,
+    no de la cantidad de órdenes. Los buckets sin ventas no existen.
+    """
+    prefix, _ = GRANULARITIES[granularity]
+    if granularity == 'hour':
+        start, end = f"{start}T00", f"{end}T23"
+    
+    return query_items(
+        os.getenv('ROLLUPS_TABLE'),
+        key_condition_expression=(
+            Key('tenantId').eq(tenant_id) & Key('bucket').between(f"{prefix}#{start}", f"{prefix}#{end}")
+        ),
+        paginate=True
+    )
+
+
+def get_sales_buckets(tenant_id: str, granularity: str, start: str, end: str) -> List[Dict[str, Any]]:
+    """Ventas por bucket en el rango"""
+    return [bucket_summary(item) for item in _query_buckets(tenant_id, granularity, start, end)]
+
+
+def get_latency_buckets(tenant_id: str, granularity: str, start: str, end: str) -> Dict[str, Any]:
+    """
+    Percentiles de latencia por tramo, por bucket y para todo el rango
+    
+    El resumen del rango se obtiene sumando los histogramas de los buckets.
+    """
+    overall = {span: LogHistogram() for span in LATENCY_SPANS}
+    buckets = []
+    
+    for item in _query_buckets(tenant_id, granularity, start, end):
+        histograms = bucket_histograms(item)
+        for span, histogram in histograms.items():
+            overall.setdefault(span, LogHistogram()).merge(histogram)
+        
+        buckets.append({
+            'bucket': item['bucket'].split('#', 1)[1],
+            'spans': {span: histogram.summary() for span, histogram in histograms.items()}
+        })
+    
+    return {
+        'buckets': buckets,
+        'overall': {span: histogram.summary() for span, histogram in overall.items()}
+    }
@@ -0,0 +1,149 @@
+"""Índice de búsqueda de órdenes por teléfono y nombre del cliente (prefijos)"""
+import base64
+import binascii
+import os
+import re
+import unicodedata
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from boto3.dynamodb.conditions import Key
+from ..utils import codec
+from ..clients.dynamodb import query_page
+
+
+# Campos buscables: prefijo del searchKey y largo mínimo del término normalizado
+SEARCH_FIELDS = {
+    'phone': 3,
+    'name': 2
+}
+
+MAX_SEARCH_LIMIT = 50
+
+# Dígitos del número local (Perú): se indexan además del número completo
+# para encontrar "+51 999 888 777" buscando "999-888"
+PHONE_LOCAL_DIGITS = int(os.getenv('PHONE_LOCAL_DIGITS', '9'))
+
+# Las entradas del índice expiran por TTL (las búsquedas son de órdenes recientes)
+SEARCH_TTL_DAYS = int(os.getenv('SEARCH_TTL_DAYS', '90'))
+
+# Datos de la orden copiados en cada entrada (la búsqueda no lee Orders)
+SUMMARY_FIELDS = ('orderId', 'ticketNumber', 'customerName', 'customerPhone', 'totalAmount', 'createdAt')
+
+
+class InvalidSearchError(ValueError):
+    """Parámetros de búsqueda inválidos"""
+
+
+def normalize_phone(phone: Optional[str]) -> str:
+    """Solo los dígitos del teléfono"""
+    return re.sub(r'\D', '', phone or '')
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """Nombre en minúsculas, sin tildes y con espacios simples"""
+    decomposed = unicodedata.normalize('NFKD', name or '')
+    ascii_name = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(re.sub(r'[^\w\s]', ' ', ascii_name.lower()).split())
+
+
+def _index_terms(order: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Términos indexados de cada campo (sin repetidos)"""
+    phone = normalize_phone(order.get('customerPhone'))
+    phones = [phone, phone[-PHONE_LOCAL_DIGITS:]] if phone else []
+    
+    # El nombre completo y desde cada palabra: "perez" encuentra "Juan Pérez"
+    words = normalize_name(order.get('customerName')).split()
+    names = [' '.join(words[index:]) for index in range(len(words))]
+    
+    return {
+        'phone': list(dict.fromkeys(phones)),
+        'name': list(dict.fromkeys(names))
+    }
+
+
+def index_entries(order: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Entradas del índice para una orden nueva
+    
+    searchKey = <campo>#<término>#<createdAt>#<orderId>: una búsqueda es un
+    Query con begins_with sobre <campo>#<prefijo>.
+    """
+    expires_at = int((datetime.utcnow() + timedelta(days=SEARCH_TTL_DAYS)).timestamp())
+    summary = {field: order.get(field) for field in SUMMARY_FIELDS}
+    
+    return [
+        {
+            'tenantId': order['tenantId'],
+            'searchKey': f"{field}#{term}#{order['createdAt']}#{order['orderId']}",
+            'field': field,
+            **summary,
+            'expiresAt': expires_at
+        }
+        for field, terms in _index_terms(order).items()
+        for term in terms
+    ]
+
+
+def _encode_cursor(last_key: Optional[Dict[str, Any]]) -> Optional[str]:
+    if not last_key:
+        return None
+    return base64.urlsafe_b64encode(codec.dumps_bytes(last_key)).decode('ascii')
+
+
+def _decode_cursor(cursor: str, tenant_id: str, prefix: str) -> Dict[str, Any]:
+    """Validar que el cursor sea de esta búsqueda (no permite saltar de tenant)"""
+    try:
+        last_key = codec.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (binascii.Error, UnicodeEncodeError, codec.DecodeError):
+        raise InvalidSearchError("Invalid cursor")
+    
+    if (
+        not isinstance(last_key, dict)
+        or last_key.get('tenantId') != tenant_id
+        or not str(last_key.get('searchKey', '')).startswith(prefix)
+    ):
+        raise InvalidSearchError("Invalid cursor")
+    return last_key
+
+
+def search_orders(
+    tenant_id: str,
+    field: str,
+    query: str,
+    limit: int = 20,
+    cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Órdenes cuyo teléfono o nombre empieza con query
+    
+    Una sola Query por página, acotada a las entradas del prefijo. Una orden
+    aparece una sola vez por página aunque coincida por varios términos; si
+    las entradas quedan en páginas distintas puede repetirse entre páginas.
+    
+    Returns:
+        (resúmenes de órdenes, cursor de la página siguiente o None)
+    
+    Raises:
+        InvalidSearchError: Campo desconocido, término muy corto o cursor inválido
+    """
+    if field not in SEARCH_FIELDS:
+        raise InvalidSearchError(f"Search by one of: {', '.join(SEARCH_FIELDS)}")
+    
+    term = normalize_phone(query) if field == 'phone' else normalize_name(query)
+    if len(term) < SEARCH_FIELDS[field]:
+        raise InvalidSearchError(f"{field} must have at least {SEARCH_FIELDS[field]} characters")
+    
+    prefix = f"{field}#{term}"
+    items, last_key = query_page(
+        os.getenv('SEARCH_TABLE'),
+        Key('tenantId').eq(tenant_id) & Key('searchKey').begins_with(prefix),
+        limit=min(max(limit, 1), MAX_SEARCH_LIMIT),
+        start_key=_decode_cursor(cursor, tenant_id, prefix) if cursor else None
+    )
+    
+    # Una orden que coincide por varios términos ("juan juan", número completo
+    # y local) se devuelve una vez; el cursor sigue en la última entrada leída
+    results = {}
+    for item in items:
+        results.setdefault(item['orderId'], {name: item.get(name) for name in SUMMARY_FIELDS})
+    return list(results.values()), _encode_cursor(last_key)
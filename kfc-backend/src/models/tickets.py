@@ -0,0 +1,71 @@
+"""Números de ticket por tenant asignados desde rangos reservados por contenedor"""
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+from ..clients.dynamodb import update_item
+
+
+# Números reservados por cada ADD sobre el contador del día
+TICKET_BLOCK_SIZE = int(os.getenv('TICKET_BLOCK_SIZE', '50'))
+
+# Desfase horario del día de los tickets (la numeración vuelve a 1 a la
+# medianoche local; por defecto Lima, UTC-5)
+TICKET_DAY_UTC_OFFSET_HOURS = int(os.getenv('TICKET_DAY_UTC_OFFSET_HOURS', '-5'))
+
+# Los contadores de días pasados se eliminan por TTL
+COUNTER_TTL_DAYS = 7
+
+# Rango reservado por (tenantId, día) -> [siguiente número, último número]
+_leases: Dict[Tuple[str, str], List[int]] = {}
+_leases_lock = threading.Lock()
+
+
+def ticket_day() -> str:
+    """Día actual de la numeración (YYYY-MM-DD en la hora local configurada)"""
+    return (datetime.utcnow() + timedelta(hours=TICKET_DAY_UTC_OFFSET_HOURS)).strftime('%Y-%m-%d')
+
+
+def _lease_block(tenant_id: str, day: str, size: int) -> List[int]:
+    """Reservar un rango de números con un único ADD atómico sobre el contador"""
+    expires_at = int((datetime.utcnow() + timedelta(days=COUNTER_TTL_DAYS)).timestamp())
+    counter = update_item(
+        os.getenv('COUNTERS_TABLE'),
+        {'tenantId': tenant_id, 'counterId': f"ticket#{day}"},
+        {'expiresAt': expires_at},
+        increments={'value': size}
+    )
+    last = int(counter['value'])
+    return [last - size + 1, last]
+
+
+def next_ticket_numbers(tenant_id: str, count: int = 1) -> List[int]:
+    """
+    Siguientes números de ticket del tenant para el día
+    
+    Cada contenedor reserva un rango de TICKET_BLOCK_SIZE números y los
+    entrega desde memoria: solo una de cada TICKET_BLOCK_SIZE órdenes hace
+    el ADD, y las escrituras de un tenant no se serializan sobre el item
+    del contador. Los números son únicos en el día pero no consecutivos
+    entre contenedores, y los que no se usan antes de que el contenedor
+    termine quedan sin asignar.
+    """
+    day = ticket_day()
+    numbers = []
+    
+    with _leases_lock:
+        while len(numbers) < count:
+            lease = _leases.get((tenant_id, day))
+            if not lease or lease[0] > lease[1]:
+                # Descartar rangos de días anteriores
+                for key in [key for key in _leases if key[0] == tenant_id]:
+                    del _leases[key]
+                lease = _leases[(tenant_id, day)] = _lease_block(
+                    tenant_id, day, max(TICKET_BLOCK_SIZE, count - len(numbers))
+                )
+            
+            take = min(count - len(numbers), lease[1] - lease[0] + 1)
+            numbers.extend(range(lease[0], lease[0] + take))
+            lease[0] += take
+    
+    return numbers
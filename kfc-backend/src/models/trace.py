@@ -0,0 +1,55 @@
+"""Traza de una orden: cola inline en el item y entradas viejas en TracesTable"""
+import os
+from typing import Any, Dict, List
+from boto3.dynamodb.conditions import Key
+from ..clients.dynamodb import query_items
+from .order import expand_trace_entry
+
+
+# Atributos internos de la traza que no se exponen en las respuestas
+TRACE_FIELDS = ('trace', 'traceSpilled')
+
+
+def trace_chunks(order: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Chunks de la orden en TracesTable (solo se consulta si traceSpilled)"""
+    if not int(order.get('traceSpilled', 0)):
+        return []
+    
+    return query_items(
+        os.getenv('TRACES_TABLE'),
+        key_condition_expression=Key('orderKey').eq(f"{order['tenantId']}#{order['orderId']}"),
+        paginate=True
+    )
+
+
+def full_trace(order: Dict[str, Any], chunks: List[Dict[str, Any]]) -> List[Any]:
+    """
+    Traza compacta completa: entradas movidas a los chunks y la cola inline
+    
+    Cada chunk aporta sus entradas hasta traceSpilled: un chunk re-escrito
+    por un spill que no llegó a aplicarse puede traer entradas que siguen
+    en la cola inline.
+    """
+    spilled = int(order.get('traceSpilled', 0))
+    entries = []
+    
+    for chunk in sorted(chunks, key=lambda chunk: int(chunk['seq'])):
+        seq = int(chunk['seq'])
+        if seq < spilled:
+            entries.extend(chunk['entries'][:spilled - seq])
+    
+    entries.extend(order.get('trace', []))
+    return entries
+
+
+def get_order_trace(order: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Traza completa y expandida de la orden, en orden cronológico"""
+    return [expand_trace_entry(entry) for entry in full_trace(order, trace_chunks(order))]
+
+
+def public_order(order: Dict[str, Any], include_trace: bool = False) -> Dict[str, Any]:
+    """Orden para la respuesta de la API: sin la traza compacta, o con la traza expandida"""
+    view = {field: value for field, value in order.items() if field not in TRACE_FIELDS}
+    if include_trace:
+        view['trace'] = get_order_trace(order)
+    return view
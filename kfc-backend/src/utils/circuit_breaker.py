@@ -0,0 +1,130 @@
+"""Circuit breaker por contenedor para dependencias no críticas"""
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from .logger import logger
+
+
+# Fallos (o llamadas fuera del presupuesto de latencia) consecutivos para abrir
+FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '5'))
+
+# Tiempo abierto antes de dejar pasar una llamada de prueba
+RESET_TIMEOUT_SECONDS = float(os.getenv('CIRCUIT_RESET_TIMEOUT_SECONDS', '30'))
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """El circuito está abierto: la llamada no se intentó"""
+    
+    def __init__(self, name: str):
+        super().__init__(f"Circuit {name} is open")
+        self.name = name
+
+
+class CircuitBreaker:
+    """
+    Corta las llamadas a una dependencia que está fallando
+    
+    Cerrado: las llamadas pasan y se cuentan los fallos consecutivos; una
+    llamada exitosa pero más lenta que latency_budget_ms cuenta como fallo.
+    Abierto: las llamadas fallan de inmediato con CircuitOpenError durante
+    reset_timeout_seconds. Semiabierto: pasa una sola llamada de prueba;
+    si funciona el circuito se cierra y si no vuelve a abrirse.
+    
+    El estado es del contenedor y se comparte entre los threads del pool.
+    is_failure permite no contar errores que no indican una dependencia
+    caída (p.ej. una conexión WebSocket que ya se cerró).
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        reset_timeout_seconds: float = RESET_TIMEOUT_SECONDS,
+        latency_budget_ms: Optional[float] = None,
+        is_failure: Callable[[Exception], bool] = lambda error: True
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self.latency_budget_ms = latency_budget_ms
+        self.is_failure = is_failure
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.lock = threading.Lock()
+    
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Ejecutar func a través del circuito
+        
+        Raises:
+            CircuitOpenError: El circuito está abierto (func no se llamó)
+        """
+        self._acquire()
+        
+        start = time.monotonic()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self._record(failed=self.is_failure(e))
+            raise
+        
+        elapsed_ms = (time.monotonic() - start) * 1000
+        slow = self.latency_budget_ms is not None and elapsed_ms > self.latency_budget_ms
+        if slow:
+            logger.warning(
+                f"Call through circuit {self.name} exceeded its latency budget",
+                elapsed_ms=round(elapsed_ms),
+                budget_ms=self.latency_budget_ms
+            )
+        self._record(failed=slow)
+        
+        return result
+    
+    def _acquire(self) -> None:
+        """Dejar pasar la llamada o fallar rápido si el circuito está abierto"""
+        with self.lock:
+            if self.state == CLOSED:
+                return
+            
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout_seconds:
+                # Pasa solo esta llamada; las demás siguen fallando rápido
+                self.state = HALF_OPEN
+                logger.info(f"Circuit {self.name} half-open, probing")
+                return
+        
+        raise CircuitOpenError(self.name)
+    
+    def _record(self, failed: bool) -> None:
+        with self.lock:
+            if not failed:
+                if self.state != CLOSED:
+                    logger.info(f"Circuit {self.name} closed")
+                self.state = CLOSED
+                self.failures = 0
+                return
+            
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    logger.warning(f"Circuit {self.name} opened", failures=self.failures)
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+
+# Breakers del contenedor por nombre de dependencia
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str, **options: Any) -> CircuitBreaker:
+    """Breaker compartido de una dependencia (options solo aplican al crearlo)"""
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name, **options)
+        return _breakers[name]
@@ -0,0 +1,87 @@
+"""
+Codec JSON central del servicio
+
+Usa orjson si está instalado y json de la stdlib si no. Ambos backends
+producen la misma salida: compacta, UTF-8 sin escapar y con Decimal
+(DynamoDB) y datetime serializados igual.
+"""
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional: sin él se usa la stdlib
+    orjson = None
+
+
+# Error de parseo de ambos backends (orjson.JSONDecodeError hereda de este)
+DecodeError = json.JSONDecodeError
+
+BACKEND = 'orjson' if orjson else 'json'
+
+
+def _default(value: Any) -> Any:
+    """Tipos que ningún backend serializa por sí solo"""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _stdlib_default(value: Any) -> Any:
+    """Igual que _default, más los tipos que orjson ya serializa nativamente"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return _default(value)
+
+
+def _with_fallback(default: Callable, fallback: Optional[Callable]) -> Callable:
+    """Encadenar un default para tipos desconocidos (p.ej. str en los logs)"""
+    if not fallback:
+        return default
+    
+    def chained(value):
+        try:
+            return default(value)
+        except TypeError:
+            return fallback(value)
+    
+    return chained
+
+
+def dumps_bytes(value: Any, fallback: Optional[Callable] = None) -> bytes:
+    """
+    Serializar a JSON (bytes UTF-8)
+    
+    Args:
+        value: Objeto a serializar
+        fallback: Conversión para tipos no soportados (por defecto TypeError)
+    """
+    if orjson:
+        return orjson.dumps(value, default=_with_fallback(_default, fallback))
+    return dumps(value, fallback).encode('utf-8')
+
+
+def dumps(value: Any, fallback: Optional[Callable] = None) -> str:
+    """Serializar a JSON (str)"""
+    if orjson:
+        return dumps_bytes(value, fallback).decode('utf-8')
+    return json.dumps(
+        value,
+        default=_with_fallback(_stdlib_default, fallback),
+        separators=(',', ':'),
+        ensure_ascii=False
+    )
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    Parsear JSON
+    
+    Raises:
+        DecodeError: El documento no es JSON válido
+    """
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,89 @@
+"""Utilidades para ejecutar llamadas de I/O independientes en paralelo"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Iterable, List, Optional
+
+
+# Pool compartido por todas las invocaciones del contenedor
+MAX_WORKERS = int(os.getenv('IO_MAX_WORKERS', '16'))
+
+# Margen reservado para responder antes del timeout de la Lambda
+DEADLINE_MARGIN_MS = int(os.getenv('IO_DEADLINE_MARGIN_MS', '500'))
+
+executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='io')
+
+
+class DeadlineExceeded(TimeoutError):
+    """La llamada no terminó antes del deadline de la invocación"""
+
+
+def remaining_seconds(context: Any, margin_ms: int = DEADLINE_MARGIN_MS) -> Optional[float]:
+    """Segundos disponibles antes del deadline (None si no hay contexto de Lambda)"""
+    if context is None or not hasattr(context, 'get_remaining_time_in_millis'):
+        return None
+    return max(0.0, (context.get_remaining_time_in_millis() - margin_ms) / 1000.0)
+
+
+class Parallel:
+    """
+    Grupo de llamadas independientes dentro de una invocación
+    
+    Las llamadas se ejecutan en el pool compartido y la espera de cada
+    resultado se corta en el deadline derivado de
+    context.get_remaining_time_in_millis().
+    
+    Las funciones enviadas no deben enviar a su vez trabajo al pool y
+    esperarlo (podría agotar los threads).
+    
+    Uso:
+        io = Parallel(context)
+        index = io.submit(batch_write_items, table_name, entries)
+        publish = io.submit(publish_order_created, tenant_id, order_id, data)
+        io.result(index)
+    """
+    
+    def __init__(self, context: Any = None):
+        self.context = context
+    
+    def submit(self, func: Callable, *args, **kwargs) -> Future:
+        """Iniciar una llamada en background"""
+        return executor.submit(func, *args, **kwargs)
+    
+    def result(self, future: Future) -> Any:
+        """
+        Esperar el resultado de una llamada
+        
+        Re-lanza la excepción original de la llamada o DeadlineExceeded
+        si no terminó a tiempo.
+        """
+        try:
+            return future.result(timeout=remaining_seconds(self.context))
+        except FutureTimeoutError:
+            future.cancel()
+            raise DeadlineExceeded("Call did not finish before the invocation deadline")
+    
+    def map(self, func: Callable, items: Iterable[Any]) -> List[Any]:
+        """Aplicar func a cada item en paralelo, preservando el orden"""
+        futures = [self.submit(func, item) for item in items]
+        return [self.result(future) for future in futures]
+
+
+class RateLimiter:
+    """Limita la cantidad de llamadas por segundo entre varios threads"""
+    
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Bloquea hasta que haya un slot disponible"""
+        with self.lock:
+            now = time.monotonic()
+            wait = self.next_slot - now
+            self.next_slot = max(now, self.next_slot) + self.interval
+        
+        if wait > 0:
+            time.sleep(wait)
@@ -1,9 +1,12 @@
 """Decoradores para handlers de Lambda"""
-import json
 import functools
-from typing import Callable, Any
+from typing import Callable, Any, Type
+from pydantic import BaseModel
 from .logger import logger
-from .responses import error_response, validation_error_response
+from .concurrency import Parallel
+from . import codec
+from .responses import error_response, validation_error_response, encode_response
+from ..clients.aws import set_invocation, flush_metrics
 
 
 def with_logging(func: Callable) -> Callable:
@@ -12,6 +15,7 @@ def with_logging(func: Callable) -> Callable:
     def wrapper(event: dict, context: Any) -> dict:
         # Establecer contexto de request
         logger.set_request_context(context.request_id if hasattr(context, 'request_id') else 'unknown')
+        set_invocation(context)
         
         # Log de entrada
         logger.info(
@@ -38,6 +42,27 @@ def with_logging(func: Callable) -> Callable:
                 function=func.__name__
             )
             raise
+        finally:
+            flush_metrics()
+    
+    return wrapper
+
+
+def track_invocation(func: Callable) -> Callable:
+    """
+    Decorador para handlers no HTTP (colas, streams, programados)
+    
+    Registra el contexto de la invocación para los clientes AWS y emite
+    sus métricas de reintentos y throttling al terminar (with_logging ya
+    lo hace para los handlers HTTP).
+    """
+    @functools.wraps(func)
+    def wrapper(event: dict, context: Any) -> Any:
+        set_invocation(context)
+        try:
+            return func(event, context)
+        finally:
+            flush_metrics()
     
     return wrapper
 
@@ -105,14 +130,161 @@ def validate_tenant(func: Callable) -> Callable:
     return wrapper
 
 
+def validate_tenant_and_body(model: Type[BaseModel]) -> Callable:
+    """
+    Decorador que valida el tenant y el body en paralelo
+    
+    La consulta del tenant corre en background mientras se valida el body
+    con el modelo Pydantic. Deja el tenant en event['tenant'] y el request
+    validado en event['validatedBody'].
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(event: dict, context: Any) -> dict:
+            from ..clients.dynamodb import get_tenant
+            
+            # Extraer tenantId del path
+            tenant_id = (event.get('pathParameters') or {}).get('tenantId')
+            
+            if not tenant_id:
+                return error_response(
+                    "Tenant ID is required",
+                    status_code=400,
+                    error_code='MISSING_TENANT_ID'
+                )
+            
+            io = Parallel(context)
+            tenant_future = io.submit(get_tenant, tenant_id)
+            
+            # Validar el body mientras se consulta el tenant
+            validation_error = None
+            try:
+                event['validatedBody'] = model(**(event.get('parsedBody') or {}))
+            except Exception as e:
+                validation_error = e
+            
+            # Verificar que el tenant existe
+            tenant = io.result(tenant_future)
+            if not tenant:
+                return error_response(
+                    f"Tenant {tenant_id} not found",
+                    status_code=404,
+                    error_code='TENANT_NOT_FOUND'
+                )
+            
+            if validation_error:
+                logger.error(f"Validation error: {str(validation_error)}")
+                return error_response(f"Validation error: {str(validation_error)}", status_code=422)
+            
+            event['tenant'] = tenant
+            
+            return func(event, context)
+        
+        return wrapper
+    
+    return decorator
+
+
+def idempotent_request(operation: str) -> Callable:
+    """
+    Decorador que respeta el header Idempotency-Key
+    
+    El primer request con una clave reserva un registro condicional y
+    guarda su respuesta; los reintentos con la misma clave devuelven esa
+    respuesta sin volver a ejecutar el handler. Debe ir después de la
+    validación del tenant.
+    
+    - Misma clave con otro body: 422 IDEMPOTENCY_KEY_REUSED
+    - Misma clave mientras el primero sigue en curso: 409 REQUEST_IN_PROGRESS
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(event: dict, context: Any) -> dict:
+            from .idempotency import COMPLETED, claim, complete, release, request_key, request_fingerprint
+            
+            headers = {name.lower(): value for name, value in (event.get('headers') or {}).items()}
+            idempotency_key = headers.get('idempotency-key')
+            
+            if not idempotency_key:
+                return func(event, context)
+            
+            if len(idempotency_key) > 255:
+                return error_response(
+                    "Idempotency-Key must be at most 255 characters",
+                    status_code=400,
+                    error_code='INVALID_IDEMPOTENCY_KEY'
+                )
+            
+            tenant_id = event['pathParameters']['tenantId']
+            key = request_key(operation, tenant_id, idempotency_key)
+            fingerprint = request_fingerprint(event.get('parsedBody'))
+            
+            existing = claim(key, {'fingerprint': fingerprint})
+            
+            if existing is not None:
+                if existing.get('fingerprint') != fingerprint:
+                    return error_response(
+                        "Idempotency-Key was already used with a different request",
+                        status_code=422,
+                        error_code='IDEMPOTENCY_KEY_REUSED'
+                    )
+                
+                if existing.get('status') != COMPLETED or 'response' not in existing:
+                    return error_response(
+                        "A request with this Idempotency-Key is still in progress",
+                        status_code=409,
+                        error_code='REQUEST_IN_PROGRESS'
+                    )
+                
+                logger.info(f"Replaying stored response for idempotency key", operation=operation)
+                
+                response = existing['response']
+                return {
+                    'statusCode': int(response['statusCode']),
+                    'headers': {**response.get('headers', {}), 'Idempotent-Replayed': 'true'},
+                    'body': response['body']
+                }
+            
+            try:
+                result = func(event, context)
+            except Exception:
+                release(key)
+                raise
+            
+            # Los errores del servidor no se guardan: el reintento vuelve a ejecutar
+            if result.get('statusCode', 200) >= 500:
+                release(key)
+            else:
+                complete(key, {'response': result})
+            
+            return result
+        
+        return wrapper
+    
+    return decorator
+
+
+def compress_response(func: Callable) -> Callable:
+    """Decorador para comprimir respuestas grandes según Accept-Encoding"""
+    @functools.wraps(func)
+    def wrapper(event: dict, context: Any) -> dict:
+        result = func(event, context)
+        
+        headers = {name.lower(): value for name, value in (event.get('headers') or {}).items()}
+        
+        return encode_response(result, headers.get('accept-encoding'))
+    
+    return wrapper
+
+
 def parse_json_body(func: Callable) -> Callable:
     """Decorador para parsear el body JSON automáticamente"""
     @functools.wraps(func)
     def wrapper(event: dict, context: Any) -> dict:
         if 'body' in event and isinstance(event['body'], str):
             try:
-                event['parsedBody'] = json.loads(event['body'])
-            except json.JSONDecodeError:
+                event['parsedBody'] = codec.loads(event['body'])
+            except codec.DecodeError:
                 return error_response(
                     "Invalid JSON in request body",
                     status_code=400,
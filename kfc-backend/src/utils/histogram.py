@@ -0,0 +1,74 @@
+"""Histograma logarítmico de latencias: memoria acotada y mergeable sumando conteos"""
+import math
+from typing import Dict, Iterable, Optional
+
+
+# Sub-buckets por potencia de 2: error relativo máximo de ~4.4%
+SUB_BUCKETS = 8
+
+# Rango representable en segundos; los valores fuera se acotan a los extremos
+MIN_VALUE = 0.1
+MAX_VALUE = 2 * 86400
+
+MIN_INDEX = math.floor(math.log2(MIN_VALUE) * SUB_BUCKETS)
+MAX_INDEX = math.floor(math.log2(MAX_VALUE) * SUB_BUCKETS)
+
+
+def bucket_index(value: float) -> int:
+    """Bucket de un valor (en segundos)"""
+    if value <= MIN_VALUE:
+        return MIN_INDEX
+    return min(math.floor(math.log2(value) * SUB_BUCKETS), MAX_INDEX)
+
+
+def bucket_value(index: int) -> float:
+    """Valor representativo de un bucket (punto medio geométrico)"""
+    return 2 ** ((index + 0.5) / SUB_BUCKETS)
+
+
+class LogHistogram:
+    """
+    Histograma disperso {índice de bucket: conteo}
+    
+    Como los buckets son fijos, dos histogramas se combinan sumando los
+    conteos del mismo índice; por eso se puede acumular con ADD en
+    DynamoDB y unir ventanas de tiempo al leer.
+    """
+    
+    def __init__(self, counts: Optional[Dict[int, int]] = None):
+        self.counts: Dict[int, int] = dict(counts or {})
+    
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+    
+    def record(self, value: float, count: int = 1):
+        """Registrar un valor"""
+        index = bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+    
+    def merge(self, other: 'LogHistogram') -> 'LogHistogram':
+        """Sumar los conteos de otro histograma"""
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        return self
+    
+    def percentile(self, percentile: float) -> Optional[float]:
+        """Valor aproximado del percentil (0-100), None si está vacío"""
+        total = self.total
+        if not total:
+            return None
+        
+        rank = max(math.ceil(total * percentile / 100), 1)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return round(bucket_value(index), 3)
+    
+    def summary(self, percentiles: Iterable[float] = (50, 90, 99)) -> Dict[str, Optional[float]]:
+        """Conteo y percentiles, p.ej. {'count': 10, 'p50': 42.1, ...}"""
+        return {
+            'count': self.total,
+            **{f"p{percentile:g}": self.percentile(percentile) for percentile in percentiles}
+        }
@@ -0,0 +1,230 @@
+"""Deduplicación de mensajes y requests con un registro condicional en DynamoDB"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Optional
+from boto3.dynamodb.conditions import Attr
+from boto3.dynamodb.types import TypeDeserializer
+from botocore.exceptions import ClientError
+from ..clients.dynamodb import put_item, update_item, delete_item
+from .logger import logger
+
+
+# Estados del registro de idempotencia
+IN_PROGRESS = 'IN_PROGRESS'
+COMPLETED = 'COMPLETED'
+
+# Tiempo que se recuerda una clave ya procesada (TTL de DynamoDB)
+RECORD_TTL_SECONDS = int(os.getenv('IDEMPOTENCY_TTL_SECONDS', '86400'))
+
+# Tiempo que una clave queda reservada mientras se procesa
+# (debe cubrir el VisibilityTimeout de las colas)
+LOCK_SECONDS = int(os.getenv('IDEMPOTENCY_LOCK_SECONDS', '120'))
+
+# Cache en memoria del contenedor para claves ya completadas
+CACHE_SIZE = int(os.getenv('IDEMPOTENCY_CACHE_SIZE', '1024'))
+CACHE_TTL_SECONDS = int(os.getenv('IDEMPOTENCY_CACHE_TTL_SECONDS', '300'))
+
+
+class _LocalCache:
+    """Cache LRU con expiración, compartida por los threads del contenedor"""
+    
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            entry = self.items.get(key)
+            if not entry:
+                return None
+            
+            expires, record = entry
+            if expires < time.monotonic():
+                del self.items[key]
+                return None
+            
+            self.items.move_to_end(key)
+            return record
+    
+    def set(self, key: str, record: Dict[str, Any]):
+        with self.lock:
+            self.items[key] = (time.monotonic() + self.ttl_seconds, record)
+            self.items.move_to_end(key)
+            while len(self.items) > self.max_size:
+                self.items.popitem(last=False)
+
+
+_cache = _LocalCache(CACHE_SIZE, CACHE_TTL_SECONDS)
+
+
+def message_key(stage: str, tenant_id: str, order_id: str, token: str) -> str:
+    """
+    Clave de idempotencia para un mensaje de etapa
+    
+    token es el taskToken de Step Functions (o el messageId de SQS si no
+    hay token): un reintento de la tarea trae un token nuevo y se procesa,
+    una re-entrega del mismo mensaje no.
+    """
+    digest = hashlib.sha256(token.encode('utf-8')).hexdigest()[:32]
+    return f"{stage}#{tenant_id}#{order_id}#{digest}"
+
+
+def request_key(operation: str, tenant_id: str, idempotency_key: str) -> str:
+    """Clave de idempotencia para un request HTTP con header Idempotency-Key"""
+    return f"{operation}#{tenant_id}#{idempotency_key}"
+
+
+def request_fingerprint(body: Any) -> str:
+    """Huella del body para detectar una clave reutilizada con otro request"""
+    canonical = json.dumps(body, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def stream_key(consumer: str, event_id: str) -> str:
+    """Clave de idempotencia para un registro de DynamoDB Streams"""
+    return f"{consumer}#{event_id}"
+
+
+def claim_action(key: str, attributes: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Put para transact_write_items que registra la clave como completada
+    
+    La transacción se cancela si la clave ya existe, así el efecto y el
+    registro de idempotencia se escriben juntos (para escrituras que no son
+    idempotentes, como ADD).
+    """
+    now = int(time.time())
+    return {
+        'Put': {
+            'TableName': os.getenv('IDEMPOTENCY_TABLE'),
+            'Item': {
+                'idempotencyKey': key,
+                'status': COMPLETED,
+                'createdAt': datetime.utcnow().isoformat(),
+                'expiresAt': now + RECORD_TTL_SECONDS,
+                **(attributes or {})
+            },
+            'ConditionExpression': 'attribute_not_exists(idempotencyKey)'
+        }
+    }
+
+
+def claim(key: str, attributes: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Reservar una clave con una escritura condicional
+    
+    Returns:
+        None si la clave quedó reservada para este llamador, o el registro
+        existente si la clave ya fue procesada o se está procesando.
+    """
+    cached = _cache.get(key)
+    if cached:
+        return cached
+    
+    now = int(time.time())
+    record = {
+        'idempotencyKey': key,
+        'status': IN_PROGRESS,
+        'createdAt': datetime.utcnow().isoformat(),
+        'lockedUntil': now + LOCK_SECONDS,
+        'expiresAt': now + RECORD_TTL_SECONDS,
+        **(attributes or {})
+    }
+    
+    # Libre si no existe, si el TTL venció (DynamoDB borra con retraso)
+    # o si quedó en curso de un procesamiento que no terminó
+    condition = (
+        Attr('idempotencyKey').not_exists()
+        | Attr('expiresAt').lt(now)
+        | (Attr('status').eq(IN_PROGRESS) & Attr('lockedUntil').lt(now))
+    )
+    
+    try:
+        put_item(
+            os.getenv('IDEMPOTENCY_TABLE'),
+            record,
+            condition_expression=condition,
+            return_values_on_condition_check_failure='ALL_OLD'
+        )
+        return None
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            raise
+        
+        # El item de error viene en formato DynamoDB JSON
+        deserializer = TypeDeserializer()
+        existing = {
+            name: deserializer.deserialize(value)
+            for name, value in e.response.get('Item', {}).items()
+        }
+        
+        if existing.get('status') == COMPLETED:
+            _cache.set(key, existing)
+        
+        return existing
+
+
+def complete(key: str, attributes: Optional[Dict[str, Any]] = None):
+    """Marcar una clave como procesada"""
+    updates = {
+        'status': COMPLETED,
+        'completedAt': datetime.utcnow().isoformat(),
+        'expiresAt': int(time.time()) + RECORD_TTL_SECONDS,
+        **(attributes or {})
+    }
+    
+    try:
+        record = update_item(
+            os.getenv('IDEMPOTENCY_TABLE'),
+            {'idempotencyKey': key},
+            updates
+        )
+        _cache.set(key, record)
+    except Exception as e:
+        # El trabajo ya se hizo: un fallo aquí solo permite un duplicado
+        # cuando venza el lock
+        logger.error(f"Failed to complete idempotency record: {str(e)}", key=key)
+
+
+def release(key: str):
+    """Liberar una clave reservada para que un reintento pueda procesarla"""
+    try:
+        delete_item(os.getenv('IDEMPOTENCY_TABLE'), {'idempotencyKey': key})
+    except Exception as e:
+        logger.error(f"Failed to release idempotency record: {str(e)}", key=key)
+
+
+@contextmanager
+def idempotent(key: str, attributes: Optional[Dict[str, Any]] = None):
+    """
+    Ejecutar un bloque como máximo una vez por clave
+    
+    Entrega True si la clave ya fue procesada (el bloque debe saltarse
+    el trabajo). Si el bloque lanza una excepción la clave se libera
+    para que el reintento la procese; si termina, se marca completada.
+    
+    Uso:
+        with idempotent(key) as duplicate:
+            if duplicate:
+                continue
+            ...
+    """
+    if claim(key, attributes) is not None:
+        yield True
+        return
+    
+    try:
+        yield False
+    except BaseException:
+        release(key)
+        raise
+    
+    complete(key)
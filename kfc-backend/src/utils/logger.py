@@ -1,8 +1,8 @@
 """Logger estructurado para Lambda"""
 import logging
-import json
 import os
 from typing import Any, Dict
+from . import codec
 
 
 class StructuredLogger:
@@ -35,7 +35,7 @@ class StructuredLogger:
         
         self.logger.log(
             getattr(logging, level.upper()),
-            json.dumps(log_entry)
+            codec.dumps(log_entry, fallback=str)
         )
     
     def debug(self, message: str, **kwargs):
@@ -1,6 +1,23 @@
 """Utilidades para respuestas HTTP estandarizadas"""
-import json
-from typing import Any, Dict, Optional
+import base64
+import gzip
+import hashlib
+import os
+from typing import Any, Dict, Iterable, Optional
+from . import codec
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él solo se usa gzip
+    brotli = None
+
+
+# Bodies más chicos no se comprimen (el ahorro no compensa el CPU)
+COMPRESSION_MIN_BYTES = int(os.getenv('COMPRESSION_MIN_BYTES', '1024'))
+
+# Niveles elegidos con benchmarks/bench_compression.py sobre páginas de órdenes
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
 
 
 def success_response(
@@ -21,7 +38,7 @@ def success_response(
     return {
         'statusCode': status_code,
         'headers': default_headers,
-        'body': json.dumps({
+        'body': codec.dumps({
             'success': True,
             'data': data
         })
@@ -55,7 +72,7 @@ def error_response(
     return {
         'statusCode': status_code,
         'headers': default_headers,
-        'body': json.dumps(error_body)
+        'body': codec.dumps(error_body)
     }
 
 
@@ -87,7 +104,7 @@ def validation_error_response(errors: Any) -> Dict[str, Any]:
             'Content-Type': 'application/json',
             'Access-Control-Allow-Origin': '*'
         },
-        'body': json.dumps({
+        'body': codec.dumps({
             'success': False,
             'error': {
                 'message': 'Validation error',
@@ -96,3 +113,174 @@ def validation_error_response(errors: Any) -> Dict[str, Any]:
             }
         })
     }
+
+
+def gzip_json_response(
+    compressed_body: bytes,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
+    """Respuesta con un body JSON ya comprimido con gzip"""
+    default_headers = {
+        'Content-Type': 'application/json',
+        'Content-Encoding': 'gzip',
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Credentials': 'true'
+    }
+    
+    if headers:
+        default_headers.update(headers)
+    
+    return {
+        'statusCode': status_code,
+        'headers': default_headers,
+        'body': base64.b64encode(compressed_body).decode('ascii'),
+        'isBase64Encoded': True
+    }
+
+
+def redirect_response(location: str, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Respuesta 302 hacia otra URL"""
+    default_headers = {
+        'Location': location,
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Credentials': 'true'
+    }
+    
+    if headers:
+        default_headers.update(headers)
+    
+    return {
+        'statusCode': 302,
+        'headers': default_headers,
+        'body': ''
+    }
+
+
+def compute_etag(*parts: Any) -> str:
+    """ETag fuerte a partir de valores baratos (IDs, updatedAt, versiones)"""
+    digest = hashlib.sha256('\x1f'.join(str(part) for part in parts).encode('utf-8')).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def _item_version(item: Dict[str, Any]) -> Any:
+    """Atributo que cambia con cada escritura del item"""
+    return item.get('version', item.get('updatedAt'))
+
+
+def item_etag(item: Dict[str, Any], *parts: Any) -> str:
+    """ETag de un item a partir de su version o updatedAt"""
+    return compute_etag(*parts, _item_version(item))
+
+
+def collection_etag(items: Iterable[Dict[str, Any]], key_field: str, *parts: Any) -> str:
+    """ETag de una lista de items (IDs y versiones, en orden)"""
+    return compute_etag(*parts, *(
+        f"{item.get(key_field)}:{_item_version(item)}" for item in items
+    ))
+
+
+def etag_matches(event: Dict[str, Any], etag: str) -> bool:
+    """Verificar si el If-None-Match del request coincide con el ETag"""
+    headers = {name.lower(): value for name, value in (event.get('headers') or {}).items()}
+    if_none_match = headers.get('if-none-match')
+    
+    if not if_none_match:
+        return False
+    
+    if if_none_match.strip() == '*':
+        return True
+    
+    # Aceptar la forma débil (W/) que agregan algunos proxies al comprimir
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return any(tag == etag or tag == f'W/{etag}' for tag in candidates)
+
+
+def not_modified_response(etag: str, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Respuesta 304 sin body para un GET condicional"""
+    default_headers = {
+        'ETag': etag,
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Credentials': 'true'
+    }
+    
+    if headers:
+        default_headers.update(headers)
+    
+    return {
+        'statusCode': 304,
+        'headers': default_headers,
+        'body': ''
+    }
+
+
+def _accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    """Parsear Accept-Encoding a {encoding: q}"""
+    encodings = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            encodings[name.strip().lower()] = quality
+    return encodings
+
+
+def accepts_encoding(accept_encoding: Optional[str], encoding: str) -> bool:
+    """Verificar si el Accept-Encoding admite la codificación (q > 0, incluido *)"""
+    if not accept_encoding:
+        return False
+    accepted = _accepted_encodings(accept_encoding)
+    return accepted.get(encoding, accepted.get('*', 0.0)) > 0
+
+
+def encode_response(
+    response: Dict[str, Any],
+    accept_encoding: Optional[str],
+    min_size: int = COMPRESSION_MIN_BYTES
+) -> Dict[str, Any]:
+    """
+    Comprimir el body de una respuesta según el Accept-Encoding del cliente
+    
+    Usa brotli si está instalado y el cliente lo acepta, si no gzip. Los
+    bodies menores a min_size, ya codificados o que no se reducen se
+    devuelven sin cambios. El ETag pasa a débil: la representación
+    comprimida no es idéntica byte a byte.
+    """
+    body = response.get('body')
+    headers = response.get('headers') or {}
+    
+    if not accept_encoding or not body or response.get('isBase64Encoded') or 'Content-Encoding' in headers:
+        return response
+    
+    raw = body.encode('utf-8')
+    if len(raw) < min_size:
+        return response
+    
+    if brotli and accepts_encoding(accept_encoding, 'br'):
+        encoding = 'br'
+        compressed = brotli.compress(raw, quality=BROTLI_QUALITY)
+    elif accepts_encoding(accept_encoding, 'gzip'):
+        encoding = 'gzip'
+        compressed = gzip.compress(raw, compresslevel=GZIP_LEVEL, mtime=0)
+    else:
+        return response
+    
+    if len(compressed) >= len(raw):
+        return response
+    
+    headers = {**headers, 'Content-Encoding': encoding, 'Vary': 'Accept-Encoding'}
+    if 'ETag' in headers and not headers['ETag'].startswith('W/'):
+        headers['ETag'] = f"W/{headers['ETag']}"
+    
+    return {
+        **response,
+        'headers': headers,
+        'body': base64.b64encode(compressed).decode('ascii'),
+        'isBase64Encoded': True
+    }
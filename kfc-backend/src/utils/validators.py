@@ -25,19 +25,22 @@ class UserRole(str, Enum):
 
 
 class OrderItem(BaseModel):
-    """Item de una orden"""
+    """
+    Item de una orden
+    
+    price y name se aceptan por compatibilidad con clientes existentes pero
+    se ignoran: el precio y el nombre se toman del catálogo del tenant.
+    """
     productId: str = Field(..., min_length=1)
     quantity: int = Field(..., gt=0)
-    price: float = Field(..., gt=0)
-    name: str = Field(..., min_length=1)
+    price: Optional[float] = Field(None, gt=0)
+    name: Optional[str] = Field(None, min_length=1)
     
     class Config:
         json_schema_extra = {
             "example": {
                 "productId": "prod_123",
-                "quantity": 2,
-                "price": 15.99,
-                "name": "Bucket Original"
+                "quantity": 2
             }
         }
 
@@ -62,9 +65,7 @@ class CreateOrderRequest(BaseModel):
                 "items": [
                     {
                         "productId": "prod_123",
-                        "quantity": 2,
-                        "price": 15.99,
-                        "name": "Bucket Original"
+                        "quantity": 2
                     }
                 ],
                 "customerName": "Juan Pérez",
@@ -75,6 +76,58 @@ class CreateOrderRequest(BaseModel):
         }
 
 
+class CreateOrdersBatchRequest(BaseModel):
+    """
+    Request para crear varias órdenes a la vez (sincronización offline del POS)
+    
+    Cada orden se valida por separado con CreateOrderRequest para
+    reportar el resultado por orden.
+    """
+    orders: List[Dict[str, Any]] = Field(..., min_length=1, max_length=100)
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "orders": [
+                    {
+                        "items": [
+                            {
+                                "productId": "prod_123",
+                                "quantity": 2
+                            }
+                        ],
+                        "customerName": "Juan Pérez"
+                    }
+                ]
+            }
+        }
+
+
+class CompleteStagesRequest(BaseModel):
+    """Request para completar una etapa en varias órdenes a la vez"""
+    orderIds: List[str] = Field(..., min_length=1, max_length=50)
+    notes: Optional[str] = Field(None, max_length=1000)
+    taskTokens: Optional[Dict[str, str]] = None
+    
+    @validator('orderIds')
+    def validate_order_ids(cls, v):
+        if any(not order_id for order_id in v):
+            raise ValueError("Order IDs must not be empty")
+        # Eliminar duplicados preservando el orden
+        return list(dict.fromkeys(v))
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "orderIds": ["order_1a2b3c4d5e6f7a8b", "order_9f8e7d6c5b4a3f2e"],
+                "notes": "Rack completo",
+                "taskTokens": {
+                    "order_1a2b3c4d5e6f7a8b": "..."
+                }
+            }
+        }
+
+
 class CreateTenantRequest(BaseModel):
     """Request para crear un tenant"""
     name: str = Field(..., min_length=1, max_length=200)